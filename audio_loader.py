@@ -0,0 +1,108 @@
+import hashlib
+import os
+import threading
+
+import pygame
+
+from game_logging import get_logger
+from persistence import atomic_write_bytes
+
+logger = get_logger("audio_loader")
+
+# Decoded sounds are cached here as raw PCM in the mixer's sample format
+CACHE_DIR_NAME = ".cache"
+
+class NullSound:
+    """Placeholder that stands in for a sound until it has been loaded"""
+    def play(self, loops=0, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_volume(self):
+        return 0.0
+
+    def get_length(self):
+        return 0.0
+
+class AudioLoader:
+    """
+    Loads sound files on a background thread.
+    Decoded samples are cached on disk as raw PCM, keyed by a hash of the
+    source file and the mixer format, so later launches skip decoding.
+    """
+    def __init__(self, sound_dir):
+        self.sound_dir = sound_dir
+        self.cache_dir = os.path.join(sound_dir, CACHE_DIR_NAME)
+        self.thread = None
+        self.done = threading.Event()
+        self.done.set()
+
+        # Statistics
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def load_async(self, sound_files, on_loaded):
+        """Load {name: filename} in the background, calling on_loaded(name, sound) for each"""
+        self.done.clear()
+        self.thread = threading.Thread(target=self.run, args=(dict(sound_files), on_loaded),
+                                       name="AudioLoader", daemon=True)
+        self.thread.start()
+
+    def run(self, sound_files, on_loaded):
+        """Loader thread: decode or read each sound from the cache"""
+        try:
+            for sound_name, filename in sound_files.items():
+                sound = self.load(filename)
+                if sound is not None:
+                    on_loaded(sound_name, sound)
+        finally:
+            self.done.set()
+
+    def wait(self, timeout=None):
+        """Wait until the background loading is finished"""
+        return self.done.wait(timeout)
+
+    def cache_path(self, filepath):
+        """Get the cache file for a sound file in the current mixer format"""
+        digest = hashlib.sha1()
+        with open(filepath, "rb") as f:
+            digest.update(f.read())
+        frequency, size, channels = pygame.mixer.get_init()
+        digest.update(f"{frequency}:{size}:{channels}".encode())
+        return os.path.join(self.cache_dir, digest.hexdigest() + ".pcm")
+
+    def load(self, filename):
+        """Load a sound, using the decoded cache when possible"""
+        filepath = os.path.join(self.sound_dir, filename)
+        if not os.path.exists(filepath):
+            logger.warning("Sound file not found: %s", filepath)
+            return None
+
+        try:
+            cache_path = self.cache_path(filepath)
+            if os.path.exists(cache_path):
+                with open(cache_path, "rb") as f:
+                    sound = pygame.mixer.Sound(buffer=f.read())
+                self.cache_hits += 1
+                return sound
+
+            sound = pygame.mixer.Sound(filepath)
+            self.cache_misses += 1
+            self.write_cache(cache_path, sound.get_raw())
+            return sound
+        except (pygame.error, IOError, OSError) as e:
+            logger.warning("Could not load sound: %s (%s)", filepath, e)
+            return None
+
+    def write_cache(self, cache_path, raw):
+        """Write decoded samples to the cache atomically"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write_bytes(cache_path, raw)
+        except OSError as e:
+            logger.warning("Could not write sound cache %s: %s", cache_path, e)
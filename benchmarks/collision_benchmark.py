@@ -0,0 +1,87 @@
+"""
+Benchmark bounding box against pixel-accurate (mask) collision checks.
+
+Scatters enemy cars and orbs over the road around the player, as in a
+frame of the game, and times one frame of player collision checks in
+both modes for several entity counts. Also reports how many entities
+pass the bounding box test (only those reach the mask test) and how many
+of them the masks reject as near misses.
+
+    python benchmarks/collision_benchmark.py [--frames 2000] [--counts 10,50,200,1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def populate(world, count, rng):
+    """Enemy cars and orbs spread over the road (one orb for every two cars)"""
+    from game_objects import spawn_enemy, spawn_orb
+
+    world.pools["enemies"].clear()
+    world.pools["orbs"].clear()
+    for i in range(count):
+        if i % 3 == 2:
+            spawn_orb(world, rng.randint(230, 570), rng.randint(0, 600))
+        else:
+            spawn_enemy(world, rng.randint(200, 560), rng.randint(-60, 600))
+
+def check(world, box, mask, pixel_perfect):
+    """Player collisions against the enemies and orbs, returns the number of hits"""
+    from game_objects import find_collisions
+
+    return (len(find_collisions(world.pools["enemies"], box, mask, pixel_perfect))
+            + len(find_collisions(world.pools["orbs"], box, mask, pixel_perfect)))
+
+def time_checks(world, box, mask, frames, pixel_perfect):
+    """Seconds per frame to check the player against every entity"""
+    start = time.perf_counter()
+    for _ in range(frames):
+        check(world, box, mask, pixel_perfect)
+    return (time.perf_counter() - start) / frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--counts", default="10,50,200,1000")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+    from game_objects import create_world, spawn_player, entity_box, SPRITES
+
+    rng = random.Random(1)
+    world = create_world(seed=1)
+    spawn_player(world, 380, 500)
+    player = world.pools["player"]
+    mask = SPRITES.mask(player.get("sprite")["id"][0])
+    x, _, width, height = entity_box(player, 0)
+
+    print(f"frames: {args.frames}")
+    print(f"{'entities':>8} {'rect us':>9} {'mask us':>9} {'added us':>9} {'overlaps':>9} {'near misses':>12}")
+    for count in (int(c) for c in args.counts.split(",")):
+        populate(world, count, rng)
+        # Sweep the player over the screen, so every entity is passed once
+        overlaps = near_misses = 0
+        for y in range(-60, 600, 4):
+            box = (x, y, width, height)
+            boxes = check(world, box, mask, False)
+            overlaps += boxes
+            near_misses += boxes - check(world, box, mask, True)
+
+        box = (x, 500, width, height)
+        rect_time = time_checks(world, box, mask, args.frames, False)
+        mask_time = time_checks(world, box, mask, args.frames, True)
+        print(f"{count:>8} {rect_time * 1e6:>9.1f} {mask_time * 1e6:>9.1f} "
+              f"{(mask_time - rect_time) * 1e6:>9.1f} {overlaps:>9} {near_misses:>12}")
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark serial against pipelined rendering.
+
+Runs the game uncapped for a fixed number of frames in each mode and
+reports throughput (frames per second) and latency (time from taking a
+frame snapshot to the end of its flip). Uses the dummy SDL drivers unless
+a real display is requested with --display.
+
+    python benchmarks/pipeline_benchmark.py [--frames 600] [--render-scale 1.0] [--display]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+def run_mode(game, frames, pipelined):
+    """Run frames in one mode, returns (frames per second, average latency ms, max latency ms)"""
+    from render_pipeline import RenderPipeline
+
+    game.pacer.set_fps_cap(0)
+    game.pacer.reset()
+    pipeline = RenderPipeline(game.render_frame) if pipelined else None
+    latencies = []
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.handle_events()
+        for dt in game.pacer.steps():
+            game.update(dt)
+        # Keep the road busy whatever happens in the simulation
+        game.game_over = False
+        if pipeline:
+            pipeline.submit(game.capture_snapshot(game.pacer.alpha, detach=True))
+        else:
+            snapshot = game.capture_snapshot(game.pacer.alpha)
+            game.render_frame(snapshot)
+            latencies.append(time.perf_counter() - snapshot.captured_at)
+        game.pacer.tick()
+
+    if pipeline:
+        pipeline.close()
+        elapsed = time.perf_counter() - start
+        stats = pipeline.get_stats()
+        return frames / elapsed, stats["average_latency_ms"], stats["max_latency_ms"]
+
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, sum(latencies) / len(latencies) * 1000, max(latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--render-scale", type=float, default=1.0)
+    parser.add_argument("--display", action="store_true", help="use the real display and audio drivers")
+    args = parser.parse_args()
+
+    if not args.display:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import pygame
+    pygame.init()
+    pygame.mixer.init()
+    screen = pygame.display.set_mode((800, 600))
+    clock = pygame.time.Clock()
+
+    from sound_manager import SoundManager
+    from improved_game import Game
+    from render_target import RenderTarget
+
+    random.seed(1)
+    game = Game(screen, clock, SoundManager())
+    game.render_target = RenderTarget(screen, args.render_scale)
+
+    # Warm up so both modes draw a populated road
+    for _ in range(300):
+        game.update(1 / 60)
+        game.game_over = False
+
+    print(f"CPUs: {os.cpu_count()}, frames: {args.frames}, render scale: {game.render_target.scale}")
+    print(f"{'mode':<10} {'fps':>8} {'avg latency':>12} {'max latency':>12}")
+    for pipelined in (False, True):
+        fps, average_latency, max_latency = run_mode(game, args.frames, pipelined)
+        mode = "pipelined" if pipelined else "serial"
+        print(f"{mode:<10} {fps:8.1f} {average_latency:9.2f} ms {max_latency:9.2f} ms")
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import time
+
+import pygame
+
+# Priority classes, a higher value wins when channels run out
+PRIORITY_UI = 0
+PRIORITY_PICKUP = 1
+PRIORITY_CRASH = 2
+
+# Priority of each sound effect
+SOUND_PRIORITIES = {
+    "crash": PRIORITY_CRASH,
+    "pickup": PRIORITY_PICKUP,
+    "click": PRIORITY_UI,
+    "hover": PRIORITY_UI
+}
+
+# Maximum number of simultaneous voices of the same sound
+MAX_INSTANCES = {
+    "pickup": 3,
+    "click": 2,
+    "hover": 1
+}
+DEFAULT_MAX_INSTANCES = 2
+
+# Mixer channels, the first ones are reserved for the sounds in RESERVED_SOUNDS
+# (the procedural engine crossfades between the two engine channels)
+NUM_CHANNELS = 16
+RESERVED_SOUNDS = ("engine", "engine_crossfade")
+
+class ChannelManager:
+    """
+    Allocates mixer channels to sound effects.
+    Looping sounds get a reserved channel. Other sounds are played on a
+    free channel; when none is free the oldest voice with a lower (or equal)
+    priority is stolen, and the sound is dropped if every voice outranks it.
+    Repeats of the same sound are limited by restarting its oldest voice.
+    """
+    def __init__(self, num_channels=NUM_CHANNELS, reserved_sounds=RESERVED_SOUNDS):
+        pygame.mixer.set_num_channels(num_channels)
+        pygame.mixer.set_reserved(len(reserved_sounds))
+
+        self.reserved = {name: pygame.mixer.Channel(i) for i, name in enumerate(reserved_sounds)}
+        self.channels = [pygame.mixer.Channel(i) for i in range(len(reserved_sounds), num_channels)]
+        # Voice playing on each shared channel: [sound name, priority, start time] or None
+        self.voices = [None] * len(self.channels)
+
+        # Statistics
+        self.played = 0
+        self.dropped = 0
+        self.stolen = 0
+        self.limited = 0
+
+    def play(self, name, sound, loops=0):
+        """Play a sound on a suitable channel, returns the channel or None if it was dropped"""
+        channel = self.reserved.get(name)
+        if channel is not None:
+            channel.play(sound, loops)
+            self.played += 1
+            return channel
+
+        priority = SOUND_PRIORITIES.get(name, PRIORITY_UI)
+        max_instances = MAX_INSTANCES.get(name, DEFAULT_MAX_INSTANCES)
+        now = time.monotonic()
+
+        free_index = None
+        same_sound = []
+        steal_index = None
+        for i, channel in enumerate(self.channels):
+            voice = self.voices[i]
+            if voice is None or not channel.get_busy():
+                self.voices[i] = None
+                if free_index is None:
+                    free_index = i
+                continue
+
+            if voice[0] == name:
+                same_sound.append(i)
+            # Lowest priority first, then oldest
+            if voice[1] <= priority:
+                if steal_index is None or (voice[1], voice[2]) < tuple(self.voices[steal_index][1:]):
+                    steal_index = i
+
+        if len(same_sound) >= max_instances:
+            # Too many repeats: restart the oldest voice of this sound
+            index = min(same_sound, key=lambda i: self.voices[i][2])
+            self.limited += 1
+        elif free_index is not None:
+            index = free_index
+        elif steal_index is not None:
+            index = steal_index
+            self.stolen += 1
+        else:
+            self.dropped += 1
+            return None
+
+        channel = self.channels[index]
+        channel.play(sound, loops)
+        self.voices[index] = [name, priority, now]
+        self.played += 1
+        return channel
+
+    def stop(self, name):
+        """Stop every voice of a sound"""
+        channel = self.reserved.get(name)
+        if channel is not None:
+            channel.stop()
+            return
+
+        for i, voice in enumerate(self.voices):
+            if voice is not None and voice[0] == name:
+                self.channels[i].stop()
+                self.voices[i] = None
+
+    def get_stats(self):
+        """Get voice allocation statistics"""
+        return {
+            "played": self.played,
+            "dropped": self.dropped,
+            "stolen": self.stolen,
+            "limited": self.limited,
+            "busy_channels": sum(1 for channel in self.channels if channel.get_busy())
+        }
@@ -0,0 +1,51 @@
+import numpy as np
+import pygame
+
+# Collision masks, one per sprite type (not per entity): key -> Mask
+_masks = {}
+
+# Filled masks for rectangular obstacles, by size
+_rect_masks = {}
+
+def cached_mask(key, sprite, threshold=127):
+    """
+    Get the collision mask of a sprite type.
+    The mask is built from the first sprite seen with the key, so sprites
+    sharing a key must share a shape (car colors may differ).
+    """
+    mask = _masks.get(key)
+    if mask is None:
+        mask = pygame.mask.from_surface(sprite, threshold)
+        _masks[key] = mask
+    return mask
+
+def rect_mask(size):
+    """Get a filled mask of a size"""
+    mask = _rect_masks.get(size)
+    if mask is None:
+        mask = pygame.mask.Mask(size, fill=True)
+        _rect_masks[size] = mask
+    return mask
+
+def broadphase(box, xs, ys, widths, heights):
+    """
+    Rows whose boxes overlap a box (x, y, width, height), tested on whole
+    arrays of box coordinates at once. Returns the row indices.
+    """
+    x, y, width, height = box
+    return np.flatnonzero((xs < x + width) & (xs + widths > x) & (ys < y + height) & (ys + heights > y))
+
+def masks_overlap(mask, position, other_mask, other_position):
+    """Check if two masks at integer positions share a pixel"""
+    offset = (other_position[0] - position[0], other_position[1] - position[1])
+    return mask.overlap(other_mask, offset) is not None
+
+def collide_rect(box, mask, rect, pixel_perfect=True):
+    """Check if a box with a mask collides with a solid rect (such as a lane closure)"""
+    box = pygame.Rect(box)
+    overlap = box.clip(rect)
+    if not overlap:
+        return False
+    if not pixel_perfect:
+        return True
+    return masks_overlap(mask, box.topleft, rect_mask(overlap.size), overlap.topleft)
@@ -0,0 +1,216 @@
+import copy
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from game_logging import get_logger
+from persistence import get_writer
+
+logger = get_logger("config_store")
+
+# Schemas for the configuration files. Each key lists its accepted types,
+# its default and optional numeric bounds.
+GAME_SETTINGS_SCHEMA = {
+    "sound_enabled": {"type": bool, "default": True},
+    "music_enabled": {"type": bool, "default": True},
+    "sound_volume": {"type": (int, float), "default": 0.7, "min": 0.0, "max": 1.0},
+    "music_volume": {"type": (int, float), "default": 0.5, "min": 0.0, "max": 1.0},
+    # Also record scores and sessions in the SQLite score database
+    "score_database": {"type": bool, "default": False},
+    # Render frame rate cap (0 = uncapped) and busy-wait pacing for precise frame times
+    "fps_cap": {"type": int, "default": 60, "min": 0, "max": 360},
+    "precise_pacing": {"type": bool, "default": True},
+    # Internal resolution of the game world as a fraction of 800x600: 1.0, 0.5 or 0.25
+    "render_scale": {"type": (int, float), "default": 1.0, "min": 0.25, "max": 1.0},
+    # Scaled fullscreen display
+    "fullscreen": {"type": bool, "default": False},
+    # Draw and flip frames on a render thread while the next frame is simulated
+    "pipelined_rendering": {"type": bool, "default": False},
+    # Mask-based collisions that ignore the transparent corners of the sprites
+    "pixel_collision": {"type": bool, "default": True},
+    # Freeze the objects loaded before a game and raise the GC thresholds while playing
+    "gc_tuning": {"type": bool, "default": True},
+    # Save the running game every few seconds and offer to resume it after a power loss
+    "autosave": {"type": bool, "default": True},
+    # Seconds of game time kept for rewinding (0 = off) and the memory they may use
+    "rewind_seconds": {"type": (int, float), "default": 10, "min": 0, "max": 60},
+    "rewind_memory_kb": {"type": int, "default": 4096, "min": 256, "max": 65536},
+    # Record per-second gameplay and performance telemetry to telemetry/*.jsonl.gz
+    "telemetry": {"type": bool, "default": False}
+}
+
+DIFFICULTY_SETTINGS_SCHEMA = {
+    "difficulty": {"type": str, "default": "medium"},
+    "presets": {"type": dict, "default": {}}
+}
+
+# Configuration files known to the store: name -> (file, schema)
+CONFIG_FILES = {
+    "game_settings": ("game_settings.json", GAME_SETTINGS_SCHEMA),
+    "difficulty_settings": ("difficulty_settings.json", DIFFICULTY_SETTINGS_SCHEMA)
+}
+
+def freeze(value):
+    """Return a read-only copy of a JSON value (dicts become mapping proxies, lists tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def thaw(value):
+    """Return a plain, mutable JSON copy of a value returned by freeze()"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+def validate(data, schema):
+    """
+    Validate configuration data against a schema.
+    Unknown keys are dropped and invalid values fall back to the default.
+    Returns the validated data and a list of problems found.
+    """
+    validated = {}
+    problems = []
+
+    if not isinstance(data, dict):
+        problems.append("configuration is not a JSON object")
+        data = {}
+
+    for key in data:
+        if key not in schema:
+            problems.append(f"unknown key '{key}'")
+
+    for key, rule in schema.items():
+        if key not in data:
+            validated[key] = copy.deepcopy(rule["default"])
+            continue
+
+        value = data[key]
+        types = rule["type"]
+        # bool is an int subclass, only accept it where bool is expected
+        is_bool_mismatch = isinstance(value, bool) and bool not in (types if isinstance(types, tuple) else (types,))
+        if not isinstance(value, types) or is_bool_mismatch:
+            problems.append(f"invalid value for '{key}': {value!r}")
+            validated[key] = copy.deepcopy(rule["default"])
+            continue
+
+        if "min" in rule:
+            value = max(rule["min"], value)
+        if "max" in rule:
+            value = min(rule["max"], value)
+        validated[key] = value
+
+    return validated, problems
+
+class ConfigStore:
+    """
+    Process-wide store for the game's JSON configuration files.
+    Each file is read and validated once, then handed out as a read-only
+    view. Changes go through update(), which notifies subscribers.
+    """
+    def __init__(self, config_files=None):
+        self.config_files = dict(CONFIG_FILES if config_files is None else config_files)
+        self.data = {}
+        self.views = {}
+        self.subscribers = {}
+        self.lock = threading.RLock()
+        self.writer = get_writer()
+
+    def load(self, name):
+        """Load and validate a configuration file (only reads the file the first time)"""
+        with self.lock:
+            if name in self.data:
+                return self.views[name]
+
+            path, schema = self.config_files[name]
+            raw = {}
+            try:
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        raw = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning("Could not load %s: %s. Using defaults.", path, e)
+
+            data, problems = validate(raw, schema)
+            for problem in problems:
+                logger.warning("%s: %s", path, problem)
+
+            self.data[name] = data
+            self.views[name] = freeze(data)
+            return self.views[name]
+
+    def get(self, name):
+        """Get a read-only view of a configuration"""
+        view = self.views.get(name)
+        if view is None:
+            view = self.load(name)
+        return view
+
+    def update(self, name, changes, save=True):
+        """Apply changes to a configuration, notify subscribers and optionally save it"""
+        with self.lock:
+            self.load(name)
+            path, schema = self.config_files[name]
+
+            merged = dict(self.data[name])
+            merged.update(thaw(changes))
+            data, problems = validate(merged, schema)
+            if problems:
+                raise ValueError(f"Invalid {name} update: {'; '.join(problems)}")
+
+            changed = [key for key in data if data[key] != self.data[name].get(key)]
+            if not changed:
+                return self.views[name]
+
+            self.data[name] = data
+            self.views[name] = freeze(data)
+            view = self.views[name]
+            callbacks = list(self.subscribers.get(name, []))
+
+        if save:
+            self.save(name)
+
+        for callback in callbacks:
+            callback(name, view, changed)
+        return view
+
+    def save(self, name):
+        """Schedule a configuration to be written back to its file"""
+        with self.lock:
+            path = self.config_files[name][0]
+            data = copy.deepcopy(self.data[name])
+        # Writes are coalesced and done atomically on a background thread
+        self.writer.schedule(path, data)
+
+    def flush(self):
+        """Write any pending configuration changes to disk now"""
+        self.writer.flush()
+
+    def subscribe(self, name, callback):
+        """Register callback(name, view, changed_keys) to be called when a configuration changes"""
+        with self.lock:
+            self.subscribers.setdefault(name, []).append(callback)
+
+    def unsubscribe(self, name, callback):
+        """Remove a callback registered with subscribe()"""
+        with self.lock:
+            callbacks = self.subscribers.get(name, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+# Shared store instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_config_store():
+    """Get the process-wide configuration store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConfigStore()
+    return _store
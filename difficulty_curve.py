@@ -0,0 +1,96 @@
+import bisect
+import math
+
+# Game-time resolution of the precomputed tables (seconds)
+TABLE_STEP = 0.25
+
+# Names of the values driven by difficulty curves
+CURVE_NAMES = ("enemy_speed", "scroll_speed", "enemy_spawn_rate", "orb_spawn_rate")
+
+# Built curves shared between difficulty managers, keyed by control points
+_curve_cache = {}
+
+class DifficultyCurve:
+    """
+    Piecewise-linear difficulty curve over game time.
+    The curve is sampled into a lookup table once, so reading a value
+    during the game is an index and a lerp. Values before the first
+    control point and after the last one hold the nearest endpoint.
+    """
+    def __init__(self, points, step=TABLE_STEP):
+        self.points = normalize_points(points)
+        self.step = step
+
+        # Tabulate up to the last control point, the curve is flat after it
+        last_time = self.points[-1][0]
+        count = int(math.ceil(last_time / step)) + 1
+        self.table = [self._evaluate(i * step) for i in range(count)]
+        self.last_index = count - 1
+
+        self.initial_value = self.table[0]
+        self.min_value = min(self.table)
+        self.max_value = max(self.table)
+
+    def _evaluate(self, t):
+        """Evaluate the control points directly (used to build the table)"""
+        times = [p[0] for p in self.points]
+        index = bisect.bisect_right(times, t)
+        if index == 0:
+            return self.points[0][1]
+        if index == len(self.points):
+            return self.points[-1][1]
+
+        t0, v0 = self.points[index - 1]
+        t1, v1 = self.points[index]
+        if t1 == t0:
+            return v1
+        return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+
+    def value_at(self, t):
+        """Get the curve value at game time t (seconds)"""
+        position = t / self.step
+        index = int(position)
+        if index >= self.last_index:
+            return self.table[-1]
+        if index < 0:
+            return self.table[0]
+
+        value = self.table[index]
+        return value + (self.table[index + 1] - value) * (position - index)
+
+def normalize_points(points):
+    """Validate control points and return them as sorted (time, value) tuples"""
+    if isinstance(points, (int, float)):
+        # A bare number is a flat curve
+        points = [[0, points]]
+
+    normalized = []
+    for point in points:
+        if len(point) != 2:
+            raise ValueError(f"Curve point must be [time, value], got {point!r}")
+        t, value = float(point[0]), float(point[1])
+        if t < 0:
+            raise ValueError(f"Curve point time must not be negative, got {t}")
+        normalized.append((t, value))
+
+    if not normalized:
+        raise ValueError("Curve needs at least one control point")
+
+    normalized.sort(key=lambda p: p[0])
+    return tuple(normalized)
+
+def get_curve(points):
+    """Get a built curve for the given control points, reusing cached tables"""
+    key = normalize_points(points)
+    curve = _curve_cache.get(key)
+    if curve is None:
+        curve = DifficultyCurve(key)
+        _curve_cache[key] = curve
+    return curve
+
+def build_curve_set(curves):
+    """Build a curve for every name in CURVE_NAMES from a preset's curve definitions"""
+    missing = [name for name in CURVE_NAMES if name not in curves]
+    if missing:
+        raise ValueError(f"Missing difficulty curves: {', '.join(missing)}")
+    return {name: get_curve(curves[name]) for name in CURVE_NAMES}
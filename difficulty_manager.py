@@ -1,78 +1,70 @@
-import math
+from difficulty_curve import build_curve_set
+
+from game_logging import get_logger
+
+logger = get_logger("difficulty_manager")
+
+# Fallback curves (medium difficulty), as [game_time, value] control points
+DEFAULT_CURVES = {
+    "enemy_speed": [[0, 3.0], [262.5, 10.0]],
+    "scroll_speed": [[0, 5.0], [262.5, 12.0]],
+    "enemy_spawn_rate": [[0, 0.03]],
+    "orb_spawn_rate": [[0, 0.02]]
+}
 
 class DifficultyManager:
     """
     Manages game difficulty progression over time.
-    Controls enemy spawn rate, speed, and other difficulty parameters.
+    Controls enemy spawn rate, speed, and other difficulty parameters
+    by reading them from precomputed difficulty curves.
     """
     def __init__(self):
-        # Base settings (medium difficulty by default)
-        self.initial_enemy_speed = 3.0
-        self.initial_scroll_speed = 5.0
-        self.initial_enemy_spawn_rate = 0.03
-        self.initial_orb_spawn_rate = 0.02
-        
-        # Current settings
-        self.enemy_speed = self.initial_enemy_speed
-        self.scroll_speed = self.initial_scroll_speed
-        self.enemy_spawn_rate = self.initial_enemy_spawn_rate
-        self.orb_spawn_rate = self.initial_orb_spawn_rate
-        
-        # Progression rates
-        self.speed_increase_rate = 0.0001
-        self.spawn_rate_increase = 0.00005
-        
-        # Difficulty caps
-        self.max_enemy_speed = 12.0
-        self.max_scroll_speed = 15.0
-        self.max_enemy_spawn_rate = 0.08
-        self.max_orb_spawn_rate = 0.04
-        
         # Game time tracking
         self.game_time = 0
-        
+
         # Current difficulty level
         self.difficulty_level = "medium"
-        
+
+        # Base settings (medium difficulty by default)
+        self.set_curves(DEFAULT_CURVES)
+
         # Try to load difficulty settings
         try:
-            from difficulty_settings import DifficultySettings
-            self.difficulty_settings = DifficultySettings()
+            from difficulty_settings import get_difficulty_settings
+            self.difficulty_settings = get_difficulty_settings()
             # Apply saved difficulty settings
             self.difficulty_settings.apply_to_difficulty_manager(self)
         except ImportError:
-            print("Difficulty settings module not found, using default settings")
+            logger.warning("Difficulty settings module not found, using default settings")
             self.difficulty_settings = None
-        
+
+    def set_curves(self, curves):
+        """Set the difficulty curves and derive initial and maximum values from them"""
+        self.curves = build_curve_set(curves)
+
+        self.initial_enemy_speed = self.curves["enemy_speed"].initial_value
+        self.initial_scroll_speed = self.curves["scroll_speed"].initial_value
+        self.initial_enemy_spawn_rate = self.curves["enemy_spawn_rate"].initial_value
+        self.initial_orb_spawn_rate = self.curves["orb_spawn_rate"].initial_value
+
+        self.max_enemy_speed = self.curves["enemy_speed"].max_value
+        self.max_scroll_speed = self.curves["scroll_speed"].max_value
+        self.max_enemy_spawn_rate = self.curves["enemy_spawn_rate"].max_value
+        self.max_orb_spawn_rate = self.curves["orb_spawn_rate"].max_value
+
+        self.reset()
+
     def update(self, dt):
         """Update difficulty based on elapsed time"""
         self.game_time += dt
-        
-        # Calculate difficulty factor (increases over time but with diminishing returns)
-        difficulty_factor = 1.0 + math.log(1 + self.game_time / 60)
-        
-        # Update speeds with caps
-        self.scroll_speed = min(
-            self.max_scroll_speed,
-            self.initial_scroll_speed + (self.speed_increase_rate * dt * 6000 * difficulty_factor)
-        )
-        
-        self.enemy_speed = min(
-            self.max_enemy_speed,
-            self.initial_enemy_speed + (self.speed_increase_rate * dt * 6000 * difficulty_factor)
-        )
-        
-        # Update spawn rates with caps
-        self.enemy_spawn_rate = min(
-            self.max_enemy_spawn_rate,
-            self.initial_enemy_spawn_rate + (self.spawn_rate_increase * dt * 60 * difficulty_factor)
-        )
-        
-        self.orb_spawn_rate = min(
-            self.max_orb_spawn_rate,
-            self.initial_orb_spawn_rate + (self.spawn_rate_increase * dt * 60 * 0.5 * difficulty_factor)
-        )
-    
+
+        # Table lookups, the curves were precomputed when they were set
+        curves = self.curves
+        self.enemy_speed = curves["enemy_speed"].value_at(self.game_time)
+        self.scroll_speed = curves["scroll_speed"].value_at(self.game_time)
+        self.enemy_spawn_rate = curves["enemy_spawn_rate"].value_at(self.game_time)
+        self.orb_spawn_rate = curves["orb_spawn_rate"].value_at(self.game_time)
+
     def reset(self):
         """Reset difficulty to initial values"""
         self.enemy_speed = self.initial_enemy_speed
@@ -80,9 +72,12 @@ class DifficultyManager:
         self.enemy_spawn_rate = self.initial_enemy_spawn_rate
         self.orb_spawn_rate = self.initial_orb_spawn_rate
         self.game_time = 0
-    
+
     def get_difficulty_percentage(self):
         """Returns current difficulty as a percentage (0-100)"""
         # Base it on scroll speed as a representative value
-        speed_percent = (self.scroll_speed - self.initial_scroll_speed) / (self.max_scroll_speed - self.initial_scroll_speed)
-        return min(100, int(speed_percent * 100))
\ No newline at end of file
+        speed_range = self.max_scroll_speed - self.initial_scroll_speed
+        if speed_range <= 0:
+            return 0
+        speed_percent = (self.scroll_speed - self.initial_scroll_speed) / speed_range
+        return min(100, int(speed_percent * 100))
@@ -1,98 +1,122 @@
-import json
-import os
+import threading
+
+from config_store import get_config_store
+from difficulty_curve import build_curve_set
+from game_logging import get_logger
+
+logger = get_logger("difficulty_settings")
+
+# Default difficulty settings
+# Each preset defines piecewise-linear curves over game time as
+# [seconds, value] control points. Values hold after the last point.
+DEFAULT_DIFFICULTY_PRESETS = {
+    "easy": {
+        "name": "EASY",
+        "curves": {
+            # Slower game speed with a slow increase
+            "enemy_speed": [[0, 1.5], [540, 6.0]],
+            "scroll_speed": [[0, 2.5], [660, 8.0]],
+            # Fewer enemies
+            "enemy_spawn_rate": [[0, 0.015]],
+            # More orbs for points
+            "orb_spawn_rate": [[0, 0.035]]
+        }
+    },
+    "medium": {
+        "name": "MEDIUM",
+        "curves": {
+            # Balanced game speed with a medium increase
+            "enemy_speed": [[0, 3.0], [262.5, 10.0]],
+            "scroll_speed": [[0, 5.0], [262.5, 12.0]],
+            # Moderate enemy count
+            "enemy_spawn_rate": [[0, 0.03]],
+            # Balanced orb spawning
+            "orb_spawn_rate": [[0, 0.02]]
+        }
+    },
+    "hard": {
+        "name": "HARD",
+        "curves": {
+            # Fast game speed from the start with a fast increase
+            "enemy_speed": [[0, 7.0], [100, 15.0]],
+            "scroll_speed": [[0, 9.0], [112.5, 18.0]],
+            # Many enemies
+            "enemy_spawn_rate": [[0, 0.05]],
+            # Fewer orbs
+            "orb_spawn_rate": [[0, 0.01]]
+        }
+    }
+}
+
+# Merged presets for the last seen preset overrides: (overrides view, presets)
+_presets_cache = (None, None)
+
+def merge_difficulty_presets(overrides):
+    """Merge designer-defined presets from the settings file into the defaults"""
+    presets = dict(DEFAULT_DIFFICULTY_PRESETS)
+    for difficulty, preset in overrides.items():
+        base = presets.get(difficulty, {"name": difficulty.upper(), "curves": {}})
+        curves = dict(base["curves"])
+        curves.update(preset.get("curves", {}))
+        
+        # Validate the merged preset before using it
+        try:
+            build_curve_set(curves)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring invalid difficulty preset '%s': %s", difficulty, e)
+            continue
+        
+        presets[difficulty] = {
+            "name": preset.get("name", base["name"]),
+            "curves": curves
+        }
+    return presets
+
+def get_difficulty_presets(overrides):
+    """Get the merged difficulty presets, merging only when the overrides changed"""
+    global _presets_cache
+    cached_overrides, presets = _presets_cache
+    if cached_overrides is not overrides:
+        presets = merge_difficulty_presets(overrides)
+        _presets_cache = (overrides, presets)
+    return presets
 
 class DifficultySettings:
     """
     Manages difficulty settings for the game.
     Provides easy, medium, and hard difficulty presets.
+    Settings live in the shared configuration store; the game uses the
+    one instance returned by get_difficulty_settings().
     """
     def __init__(self):
         self.settings_file = "difficulty_settings.json"
-        
-        # Default difficulty settings
-        self.difficulty_presets = {
-            "easy": {
-                "name": "EASY",
-                # Slower game speed
-                "initial_enemy_speed": 1.5,
-                "initial_scroll_speed": 2.5,
-                # Fewer enemies
-                "initial_enemy_spawn_rate": 0.015,
-                # More orbs for points
-                "initial_orb_spawn_rate": 0.035,
-                # Very slow progression
-                "speed_increase_rate": 0.001,
-                "spawn_rate_increase": 0.000005,
-                # Lower maximum speeds
-                "max_enemy_speed": 6.0,
-                "max_scroll_speed": 8.0,
-                "max_enemy_spawn_rate": 0.04,
-                "max_orb_spawn_rate": 0.07
-            },
-            "medium": {
-                "name": "MEDIUM",
-                # Balanced game speed
-                "initial_enemy_speed": 3.0,
-                "initial_scroll_speed": 5.0,
-                # Moderate enemy count
-                "initial_enemy_spawn_rate": 0.03,
-                # Balanced orb spawning
-                "initial_orb_spawn_rate": 0.02,
-                # Standard progression
-                "speed_increase_rate": 0.002,
-                "spawn_rate_increase": 0.00002,
-                # Moderate maximum speeds
-                "max_enemy_speed": 10.0,
-                "max_scroll_speed": 12.0,
-                "max_enemy_spawn_rate": 0.08,
-                "max_orb_spawn_rate": 0.04
-            },
-            "hard": {
-                "name": "HARD",
-                # Fast game speed from the start
-                "initial_enemy_speed": 7.0,
-                "initial_scroll_speed": 9.0,
-                # Many enemies
-                "initial_enemy_spawn_rate": 0.05,
-                # Fewer orbs
-                "initial_orb_spawn_rate": 0.01,
-                # Rapid progression
-                "speed_increase_rate": 0.004,
-                "spawn_rate_increase": 0.0002,
-                # High maximum speeds
-                "max_enemy_speed": 15.0,
-                "max_scroll_speed": 18.0,
-                "max_enemy_spawn_rate": 0.15,
-                "max_orb_spawn_rate": 0.025
-            }
-        }
-        
-        # Current difficulty level
-        self.current_difficulty = "medium"
-        
-        # Load saved settings if available
-        self.load_settings()
+        self.store = get_config_store()
+    
+    @property
+    def difficulty_presets(self):
+        """Difficulty presets, including overrides from the settings file"""
+        return get_difficulty_presets(self.preset_overrides)
+    
+    @property
+    def preset_overrides(self):
+        """Designer-defined presets from the settings file"""
+        return self.store.get("difficulty_settings")["presets"]
+    
+    @property
+    def current_difficulty(self):
+        """Current difficulty level"""
+        difficulty = self.store.get("difficulty_settings")["difficulty"]
+        if difficulty not in self.difficulty_presets:
+            return "medium"
+        return difficulty
     
     def load_settings(self):
-        """Load difficulty settings from file"""
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, "r") as f:
-                    data = json.load(f)
-                    if "difficulty" in data:
-                        self.current_difficulty = data["difficulty"]
-                        print(f"Loaded difficulty setting: {self.current_difficulty}")
-        except Exception as e:
-            print(f"Error loading difficulty settings: {e}")
+        """Load difficulty settings from file (only read once per process)"""
+        self.store.load("difficulty_settings")
     
     def save_settings(self):
-        """Save current difficulty settings to file"""
-        try:
-            with open(self.settings_file, "w") as f:
-                json.dump({"difficulty": self.current_difficulty}, f)
-                print(f"Saved difficulty setting: {self.current_difficulty}")
-        except Exception as e:
-            print(f"Error saving difficulty settings: {e}")
+        """Schedule the current difficulty settings to be saved to file"""
+        self.store.save("difficulty_settings")
     
     def get_current_settings(self):
         """Get the current difficulty settings"""
@@ -101,8 +125,7 @@ class DifficultySettings:
     def set_difficulty(self, difficulty):
         """Set the current difficulty level"""
         if difficulty in self.difficulty_presets:
-            self.current_difficulty = difficulty
-            self.save_settings()
+            self.store.update("difficulty_settings", {"difficulty": difficulty})
             return True
         return False
     
@@ -114,29 +137,24 @@ class DifficultySettings:
         """Apply current settings to a difficulty manager instance"""
         settings = self.get_current_settings()
         
-        # Apply all settings
-        difficulty_manager.initial_enemy_speed = settings["initial_enemy_speed"]
-        difficulty_manager.initial_scroll_speed = settings["initial_scroll_speed"]
-        difficulty_manager.initial_enemy_spawn_rate = settings["initial_enemy_spawn_rate"]
-        difficulty_manager.initial_orb_spawn_rate = settings["initial_orb_spawn_rate"]
-        difficulty_manager.speed_increase_rate = settings["speed_increase_rate"]
-        difficulty_manager.spawn_rate_increase = settings["spawn_rate_increase"]
-        difficulty_manager.max_enemy_speed = settings["max_enemy_speed"]
-        difficulty_manager.max_scroll_speed = settings["max_scroll_speed"]
-        difficulty_manager.max_enemy_spawn_rate = settings["max_enemy_spawn_rate"]
-        difficulty_manager.max_orb_spawn_rate = settings["max_orb_spawn_rate"]
-        
-        # Set current values to initial values
-        difficulty_manager.enemy_speed = settings["initial_enemy_speed"]
-        difficulty_manager.scroll_speed = settings["initial_scroll_speed"]
-        difficulty_manager.enemy_spawn_rate = settings["initial_enemy_spawn_rate"]
-        difficulty_manager.orb_spawn_rate = settings["initial_orb_spawn_rate"]
+        # Apply the difficulty curves (this also resets the difficulty manager)
+        difficulty_manager.set_curves(settings["curves"])
         
         # Set difficulty level
         difficulty_manager.difficulty_level = self.current_difficulty
         
-        # Reset the difficulty manager
-        difficulty_manager.game_time = 0
-        
-        print(f"Applied {self.current_difficulty} difficulty settings to difficulty manager")
-        return settings
\ No newline at end of file
+        logger.debug("Applied %s difficulty settings to difficulty manager", self.current_difficulty)
+        return settings
+
+# Shared settings instance
+_settings = None
+_settings_lock = threading.Lock()
+
+def get_difficulty_settings():
+    """Get the process-wide difficulty settings"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = DifficultySettings()
+    return _settings
@@ -0,0 +1,171 @@
+import time
+
+import numpy as np
+
+class EntityPool:
+    """
+    Dense storage for one kind of entity (an archetype).
+    Each component is a typed numpy array indexed by the entity's row, and
+    rows 0..count-1 are the live entities, so systems work on whole
+    columns at once. Removing entities keeps the order of the others
+    (which is also the draw order) without allocating per component: the
+    kept rows are gathered into a spare array of each component, which
+    then swaps with the live one, through an index buffer preallocated
+    with the storage.
+    """
+    __slots__ = ("name", "components", "capacity", "count", "arrays", "spare", "rows", "row_numbers")
+
+    def __init__(self, name, components, capacity=32):
+        self.name = name
+        self.components = components
+        self.capacity = capacity
+        self.count = 0
+        self.arrays = {component: np.zeros(capacity, dtype) for component, dtype in components.items()}
+        self.allocate_buffers()
+
+    def allocate_buffers(self):
+        """Allocate the spare arrays and index buffers used by remove() for the capacity"""
+        self.spare = {component: np.empty_like(array) for component, array in self.arrays.items()}
+        self.rows = np.empty(self.capacity, np.intp)
+        self.row_numbers = np.arange(self.capacity, dtype=np.intp)
+
+    def __len__(self):
+        return self.count
+
+    def has(self, *components):
+        """Check if the pool stores all the components"""
+        return all(component in self.arrays for component in components)
+
+    def get(self, component):
+        """Live rows of a component (a view, writes go to the pool)"""
+        return self.arrays[component][:self.count]
+
+    def add(self, **values):
+        """Add an entity, returns its row. Components not given are zeroed."""
+        if self.count == self.capacity:
+            self.grow()
+        row = self.count
+        for component, array in self.arrays.items():
+            array[row] = values.get(component, 0)
+        self.count += 1
+        return row
+
+    def grow(self):
+        """Double the capacity"""
+        self.capacity *= 2
+        for component, array in self.arrays.items():
+            grown = np.zeros(self.capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[component] = grown
+        self.allocate_buffers()
+
+    def remove(self, dead):
+        """Remove the rows where the boolean array dead is true"""
+        count = self.count - int(np.count_nonzero(dead))
+        if count == self.count:
+            return
+        if self.spare is None:
+            self.allocate_buffers()
+        # Row to take for each kept position: every removed row shifts the rest by one
+        rows = self.rows[:count]
+        rows[:] = self.row_numbers[:count]
+        for removed, row in enumerate(np.flatnonzero(dead)):
+            rows[row - removed:] += 1
+        for component, array in self.arrays.items():
+            spare = self.spare[component]
+            # mode="clip" writes straight into out (with "raise" numpy buffers the result)
+            np.take(array, rows, out=spare[:count], mode="clip")
+            self.arrays[component] = spare
+            self.spare[component] = array
+        self.count = count
+
+    def clear(self):
+        """Remove every entity (the storage is kept)"""
+        self.count = 0
+
+    def resize(self, count):
+        """Set the number of live rows, growing the storage if needed (new rows are not cleared)"""
+        while self.capacity < count:
+            self.grow()
+        self.count = count
+
+    def copy(self):
+        """Detached copy of the live rows"""
+        pool = EntityPool.__new__(EntityPool)
+        pool.name = self.name
+        pool.components = self.components
+        pool.capacity = self.count
+        pool.count = self.count
+        pool.arrays = {component: array[:self.count].copy() for component, array in self.arrays.items()}
+        # Copies are usually only read, remove() allocates the buffers if needed
+        pool.spare = None
+        return pool
+
+class World:
+    """
+    Entity pools and the systems that run over them.
+    Systems are functions called as system(world, *args), registered by
+    phase ("update", "render") and run in registration order. Every run
+    is timed, so get_stats() shows where a step or frame goes.
+    """
+    __slots__ = ("pools", "queries", "systems", "timings", "rng")
+
+    def __init__(self, seed=None):
+        self.pools = {}
+        self.queries = {}
+        self.systems = {}
+        self.timings = {}
+        # Random numbers for the simulation systems
+        self.rng = np.random.default_rng(seed)
+
+    def add_pool(self, name, components, capacity=32):
+        """Create an entity pool with the given {component: dtype}"""
+        pool = EntityPool(name, components, capacity)
+        self.pools[name] = pool
+        self.queries.clear()
+        return pool
+
+    def query(self, *components):
+        """Non-empty pools that store all the components"""
+        matching = self.queries.get(components)
+        if matching is None:
+            matching = [pool for pool in self.pools.values() if pool.has(*components)]
+            self.queries[components] = matching
+        return [pool for pool in matching if pool.count]
+
+    def add_system(self, name, system, phase="update"):
+        """Register a system to run in a phase"""
+        self.systems.setdefault(phase, []).append((name, system))
+        self.timings[name] = [0, 0.0, 0.0]  # runs, total seconds, longest run
+
+    def run(self, phase, *args):
+        """Run the systems of a phase in order"""
+        for name, system in self.systems.get(phase, ()):
+            start = time.perf_counter()
+            system(self, *args)
+            elapsed = time.perf_counter() - start
+            timing = self.timings[name]
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    def clear(self):
+        """Remove every entity"""
+        for pool in self.pools.values():
+            pool.clear()
+
+    def snapshot(self):
+        """Detached copies of all the pools (safe to draw on another thread)"""
+        return {name: pool.copy() for name, pool in self.pools.items()}
+
+    def get_stats(self):
+        """Get per-system timing statistics"""
+        return {
+            name: {
+                "runs": runs,
+                "average_us": round(total / max(1, runs) * 1e6, 1),
+                "max_us": round(longest * 1e6, 1)
+            }
+            for name, (runs, total, longest) in self.timings.items()
+        }
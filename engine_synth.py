@@ -0,0 +1,201 @@
+import threading
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from game_logging import get_logger
+
+logger = get_logger("engine_synth")
+
+# Number of pre-synthesized pitch steps between idle and top speed
+PITCH_STEPS = 16
+
+# Engine firing frequency (Hz) at the lowest and highest speed
+MIN_FREQUENCY = 38.0
+MAX_FREQUENCY = 150.0
+
+# Approximate length of each looped buffer (seconds)
+BUFFER_DURATION = 0.5
+
+# Time to crossfade between two pitch steps (seconds)
+CROSSFADE_TIME = 0.12
+
+# Scroll speeds mapped to the lowest and highest pitch
+MIN_SPEED = 2.0
+MAX_SPEED = 18.0
+
+# Overall engine loudness relative to the sound effect volume
+ENGINE_LEVEL = 0.5
+
+# Sample types of the mixer formats, by pygame.mixer.get_init() size (negative:
+# signed). pygame only opens 32-bit audio as float, which it reports as -32.
+SAMPLE_TYPES = {
+    8: "u1", -8: "i1",
+    16: "u2", -16: "i2",
+    -32: "f4"
+}
+
+def is_available():
+    """Procedural engine audio needs NumPy and an initialized mixer with a supported sample format"""
+    if np is None:
+        return False
+    mixer = pygame.mixer.get_init()
+    if mixer is None:
+        return False
+    if mixer[1] not in SAMPLE_TYPES:
+        logger.warning("Mixer sample format %d is not supported, using the engine sample", mixer[1])
+        return False
+    return True
+
+def synthesize_step(fraction, sample_rate):
+    """
+    Synthesize one loopable engine buffer (float samples in -1..1).
+    Pitch rises with fraction (0..1), and so does the timbre: higher
+    harmonics get louder and the exhaust rumble gets rougher.
+    """
+    frequency = MIN_FREQUENCY + (MAX_FREQUENCY - MIN_FREQUENCY) * fraction
+
+    # Whole number of periods so the buffer loops without a click
+    periods = max(1, int(round(frequency * BUFFER_DURATION)))
+    length = int(round(periods * sample_rate / frequency))
+    phase = np.arange(length, dtype=np.float64) * (2.0 * np.pi * periods / length)
+
+    # Harmonic series, brighter at speed
+    wave = np.zeros(length)
+    brightness = 0.35 + 0.5 * fraction
+    for harmonic in range(1, 9):
+        wave += (brightness ** (harmonic - 1)) / harmonic * np.sin(harmonic * phase)
+
+    # Firing pulses: a sharp bump once per period
+    wave += (0.6 - 0.3 * fraction) * np.maximum(0.0, np.sin(phase)) ** 8
+
+    # Periodic rumble noise (same noise every period, so the loop stays seamless)
+    rng = np.random.default_rng(int(fraction * 1000))
+    period_length = max(1, length // periods)
+    noise = np.tile(rng.standard_normal(period_length), periods + 1)[:length]
+    wave += (0.08 + 0.12 * fraction) * noise
+
+    # Soft clip and normalize
+    wave = np.tanh(1.5 * wave)
+    wave /= max(1e-6, np.max(np.abs(wave)))
+    return wave
+
+def to_sound(wave):
+    """Convert float samples to a pygame Sound in the mixer's format"""
+    frequency, size, channels = pygame.mixer.get_init()
+    if size not in SAMPLE_TYPES:
+        raise ValueError(f"unsupported mixer sample format {size}")
+    sample_type = np.dtype(SAMPLE_TYPES[size])
+    bits = sample_type.itemsize * 8
+    if sample_type.kind == "f":
+        samples = (wave * 0.9).astype(sample_type)
+    elif sample_type.kind == "i":
+        samples = (wave * (2 ** (bits - 1) - 1) * 0.9).astype(sample_type)
+    else:
+        samples = ((wave * 0.45 + 0.5) * (2 ** bits - 1)).astype(sample_type)
+
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+
+class EngineSynth:
+    """
+    Procedural engine sound that follows the scroll speed.
+    Pitch steps are synthesized once on a background thread. While
+    driving, update() picks the step for the current speed and crossfades
+    to it on the second reserved channel, so the main thread only
+    starts loops and sets channel volumes.
+    """
+    def __init__(self, channel_a, channel_b, steps=PITCH_STEPS):
+        self.channels = [channel_a, channel_b]
+        self.step_count = steps
+        self.sounds = []
+        self.ready = threading.Event()
+        self.volume = 1.0
+
+        # Playback state
+        self.playing = False
+        self.active = 0  # Index of the channel currently fading in
+        self.current_step = None
+        self.fade = 1.0
+
+        threading.Thread(target=self.build, name="EngineSynth", daemon=True).start()
+
+    def build(self):
+        """Synthesize every pitch step (runs on a background thread)"""
+        try:
+            sample_rate = pygame.mixer.get_init()[0]
+            sounds = []
+            for step in range(self.step_count):
+                fraction = step / max(1, self.step_count - 1)
+                sounds.append(to_sound(synthesize_step(fraction, sample_rate)))
+            self.sounds = sounds
+            logger.debug("Synthesized %d engine pitch steps", len(sounds))
+        except (pygame.error, ValueError, MemoryError) as e:
+            logger.warning("Could not synthesize engine sound: %s", e)
+        finally:
+            self.ready.set()
+
+    def is_ready(self):
+        """True once the pitch steps are available"""
+        return self.ready.is_set() and bool(self.sounds)
+
+    def set_volume(self, volume):
+        """Set the engine volume (0.0 to 1.0)"""
+        self.volume = volume * ENGINE_LEVEL
+        if self.playing:
+            self.apply_volumes()
+
+    def start(self, speed=MIN_SPEED):
+        """Start the engine loop at a speed"""
+        if not self.is_ready():
+            return False
+        self.playing = True
+        self.current_step = None
+        self.fade = 1.0
+        self.update(speed, 0)
+        return True
+
+    def stop(self):
+        """Stop the engine loop"""
+        self.playing = False
+        self.current_step = None
+        for channel in self.channels:
+            channel.stop()
+
+    def step_for_speed(self, speed):
+        """Pitch step index for a scroll speed"""
+        fraction = (speed - MIN_SPEED) / (MAX_SPEED - MIN_SPEED)
+        fraction = max(0.0, min(1.0, fraction))
+        return int(round(fraction * (self.step_count - 1)))
+
+    def update(self, speed, dt):
+        """Follow the scroll speed, crossfading between pitch steps"""
+        if not self.playing:
+            return
+
+        step = self.step_for_speed(speed)
+        if step != self.current_step and self.fade >= 1.0:
+            # Start the new step on the other channel and fade over to it
+            if self.current_step is not None:
+                self.active = 1 - self.active
+                self.fade = 0.0
+            self.current_step = step
+            self.channels[self.active].set_volume(0.0 if self.fade < 1.0 else self.volume)
+            self.channels[self.active].play(self.sounds[step], -1)
+
+        if self.fade < 1.0:
+            self.fade = min(1.0, self.fade + dt / CROSSFADE_TIME)
+            if self.fade >= 1.0:
+                self.channels[1 - self.active].stop()
+            self.apply_volumes()
+
+    def apply_volumes(self):
+        """Set the channel volumes for the current crossfade position"""
+        self.channels[self.active].set_volume(self.volume * self.fade)
+        if self.fade < 1.0:
+            self.channels[1 - self.active].set_volume(self.volume * (1.0 - self.fade))
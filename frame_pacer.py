@@ -0,0 +1,109 @@
+import time
+
+from game_logging import get_logger
+
+logger = get_logger("frame_pacer")
+
+# Fixed simulation rate. Movement speeds in the game are tuned as pixels
+# per 1/60 s step, so the simulation keeps running at 60 Hz whatever the
+# render rate is.
+SIM_RATE = 60
+SIM_DT = 1.0 / SIM_RATE
+
+# Frame rate caps that can be selected ("fps_cap" in game_settings.json, 0 = uncapped)
+FPS_CAPS = (0, 60, 120, 144)
+
+# Most simulation steps run per rendered frame. After a longer stall the
+# remaining time is dropped instead of fast-forwarding the game.
+MAX_STEPS_PER_FRAME = 5
+
+# A frame missed its deadline when it took longer than this many frame intervals
+MISSED_DEADLINE_FACTOR = 1.5
+
+class FramePacer:
+    """
+    Paces rendering independently of the fixed-rate simulation.
+    Each frame, steps() yields as many fixed simulation steps as the
+    elapsed time covers (the accumulator carries the remainder), and alpha
+    tells the renderer how far it is between the last two simulation
+    states. tick() then waits for the frame cap, with tick_busy_loop()
+    when precise pacing is enabled, and counts missed deadlines.
+    """
+    def __init__(self, clock, fps_cap=60, precise=True, sim_rate=SIM_RATE):
+        self.clock = clock
+        self.precise = precise
+        self.sim_dt = 1.0 / sim_rate
+        self.set_fps_cap(fps_cap)
+
+        self.accumulator = 0.0
+        self.last_time = None
+
+        # Statistics
+        self.frames = 0
+        self.sim_steps = 0
+        self.missed_deadlines = 0
+        self.dropped_time = 0.0
+        self.worst_frame_time = 0.0
+
+    def set_fps_cap(self, fps_cap):
+        """Set the render frame rate cap (0 renders as fast as possible)"""
+        self.fps_cap = max(0, int(fps_cap))
+        # Uncapped frames are held to the simulation rate for deadline statistics
+        self.frame_interval = 1.0 / (self.fps_cap or 1.0 / self.sim_dt)
+
+    def reset(self):
+        """Forget the accumulated time (after a pause or a long load)"""
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def steps(self):
+        """Yield once for every simulation step that is due this frame"""
+        now = time.perf_counter()
+        if self.last_time is not None:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = 0
+        while self.accumulator >= self.sim_dt:
+            if steps >= MAX_STEPS_PER_FRAME:
+                # Too far behind: drop the rest rather than spiral
+                self.dropped_time += self.accumulator
+                self.accumulator = 0.0
+                break
+            self.accumulator -= self.sim_dt
+            steps += 1
+            self.sim_steps += 1
+            yield self.sim_dt
+
+    @property
+    def alpha(self):
+        """Position between the previous and the current simulation state (0..1)"""
+        return min(1.0, self.accumulator / self.sim_dt)
+
+    def tick(self):
+        """Wait for the frame cap, returns the frame time in seconds"""
+        if self.fps_cap and self.precise:
+            elapsed_ms = self.clock.tick_busy_loop(self.fps_cap)
+        else:
+            elapsed_ms = self.clock.tick(self.fps_cap)
+
+        frame_time = elapsed_ms / 1000.0
+        self.frames += 1
+        # The first frame also covers setup, so it is not counted
+        if self.frames > 1:
+            self.worst_frame_time = max(self.worst_frame_time, frame_time)
+            if frame_time > self.frame_interval * MISSED_DEADLINE_FACTOR:
+                self.missed_deadlines += 1
+        return frame_time
+
+    def get_stats(self):
+        """Get pacing statistics"""
+        return {
+            "fps_cap": self.fps_cap,
+            "frames": self.frames,
+            "sim_steps": self.sim_steps,
+            "missed_deadlines": self.missed_deadlines,
+            "dropped_ms": round(self.dropped_time * 1000, 1),
+            "worst_frame_ms": round(self.worst_frame_time * 1000, 1),
+            "fps": round(self.clock.get_fps(), 1)
+        }
@@ -0,0 +1,113 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# All game loggers live under this name
+ROOT_LOGGER_NAME = "qautogame"
+
+# Level that disables game logging completely
+OFF = logging.CRITICAL + 10
+
+# Levels that can be selected by name (QAUTO_LOG_LEVEL or set_log_level)
+LEVELS = {
+    "off": OFF,
+    "critical": logging.CRITICAL,
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "debug": logging.DEBUG
+}
+
+# Order used when cycling the level at runtime
+CYCLE_ORDER = ["off", "warning", "info", "debug"]
+
+# Logging is off until configured, and never falls through to the root logger
+_root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+_root_logger.setLevel(OFF)
+_root_logger.propagate = False
+_root_logger.addHandler(logging.NullHandler())
+
+_listener = None
+
+def get_logger(name):
+    """Get the logger for a game module"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def parse_level(level):
+    """Convert a level name or number to a logging level"""
+    if isinstance(level, int):
+        return level
+    return LEVELS[str(level).lower()]
+
+def setup_logging(level=None, log_file=None):
+    """
+    Configure game logging.
+    Records are put on a queue by the calling thread and written to stderr
+    (and optionally a file) by a background listener thread, so logging
+    never blocks the game loop on console I/O. The level defaults to the
+    QAUTO_LOG_LEVEL environment variable, or off.
+    """
+    global _listener
+    if _listener is not None:
+        if level is not None:
+            set_log_level(level)
+        return
+
+    if level is None:
+        level = os.environ.get("QAUTO_LOG_LEVEL", "off")
+    if log_file is None:
+        log_file = os.environ.get("QAUTO_LOG_FILE")
+
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    for handler in list(_root_logger.handlers):
+        _root_logger.removeHandler(handler)
+    _root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    try:
+        set_log_level(level)
+    except KeyError:
+        set_log_level("off")
+        _root_logger.setLevel(logging.WARNING)
+        _root_logger.warning("Unknown log level %r, logging is off", level)
+        set_log_level("off")
+
+def set_log_level(level):
+    """Change the game log level at runtime ("off", "warning", "info", "debug", ...)"""
+    _root_logger.setLevel(parse_level(level))
+
+def get_log_level_name():
+    """Get the name of the current game log level"""
+    level = _root_logger.level
+    for name, value in LEVELS.items():
+        if value == level:
+            return name
+    return logging.getLevelName(level).lower()
+
+def cycle_log_level():
+    """Switch to the next level in CYCLE_ORDER and return its name"""
+    current = get_log_level_name()
+    index = CYCLE_ORDER.index(current) if current in CYCLE_ORDER else -1
+    name = CYCLE_ORDER[(index + 1) % len(CYCLE_ORDER)]
+    set_log_level(name)
+    return name
+
+def shutdown_logging():
+    """Write queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,13 +1,19 @@
 import pygame
 import sys
-import os
-import json
-from pygame.locals import *
 
-# Import game components
-from improved_game import Game
+# Start timing before the game modules are imported
+from startup_profiler import StartupProfiler, warm_up_async
+startup_profiler = StartupProfiler()
+
+# Import game components (screen modules are imported when first needed,
+# and preloaded in the background after the first menu frame)
 from main_menu import MainMenu
 from sound_manager import SoundManager
+from score_store import ScoreStore
+from screen_registry import ScreenRegistry
+from game_logging import setup_logging
+from config_store import get_config_store
+from render_target import create_display
 
 # Constants
 SCREEN_WIDTH = 800
@@ -28,60 +34,99 @@ class GameManager:
     - Settings
     """
     def __init__(self):
+        profiler = startup_profiler
+        profiler.mark("modules imported")
+        
+        # Set up logging (off unless QAUTO_LOG_LEVEL is set)
+        with profiler.phase("logging"):
+            setup_logging()
+        
         # Initialize pygame
-        pygame.init()
-        pygame.mixer.init()
+        with profiler.phase("pygame.init"):
+            pygame.init()
+        with profiler.phase("mixer.init"):
+            pygame.mixer.init()
         
         # Set up display
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("QAutoGame")
-        self.clock = pygame.time.Clock()
+        with profiler.phase("display"):
+            self.screen = create_display((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                         get_config_store().get("game_settings")["fullscreen"])
+            pygame.display.set_caption("QAutoGame")
+            self.clock = pygame.time.Clock()
         
         # Initialize sound manager
-        self.sound_manager = SoundManager()
+        with profiler.phase("SoundManager"):
+            self.sound_manager = SoundManager()
         
         # Initialize settings manager and apply settings
-        from settings_manager import SettingsManager
-        self.settings_manager = SettingsManager()
-        self.settings_manager.apply_settings_to_sound_manager(self.sound_manager)
-        
-        # Initialize difficulty settings
-        try:
-            from difficulty_settings import DifficultySettings
-            self.difficulty_settings = DifficultySettings()
-        except ImportError:
-            self.difficulty_settings = None
+        with profiler.phase("SettingsManager"):
+            from settings_manager import SettingsManager
+            self.settings_manager = SettingsManager()
+            self.settings_manager.apply_settings_to_sound_manager(self.sound_manager)
         
         # Game state
         self.running = True
         self.current_state = "menu"
-        self.high_scores = self.load_high_scores()
-    
-    def load_high_scores(self):
-        """Load high scores from file"""
-        try:
-            with open("high_scores.json", "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # Return default high scores if file doesn't exist or is invalid
-            return {"scores": []}
+        with profiler.phase("ScoreStore"):
+            self.score_store = ScoreStore()
+        
+        # Screens are built on first use and kept alive between visits
+        self.screens = ScreenRegistry()
+        self.screens.register("menu", self.build_menu)
+        self.screens.register("high_scores", self.build_high_scores)
+        self.screens.register("instructions", self.build_instructions)
+        self.screens.register("settings", self.build_settings)
+        
+        # Optional SQLite score database (enabled with "score_database" in game_settings.json)
+        self.score_database = None
+        if self.settings_manager.get_setting("score_database"):
+            with profiler.phase("ScoreDatabase"):
+                from score_database import ScoreDatabase
+                self.score_database = ScoreDatabase()
+                self.score_database.migrate_json(self.score_store.index_file, self.score_store.log_file)
+                self.score_database.start_session()
     
-    def save_high_scores(self):
-        """Save high scores to file"""
-        with open("high_scores.json", "w") as f:
-            json.dump(self.high_scores, f)
+    def on_first_menu_frame(self):
+        """Called once the first menu frame is on screen"""
+        startup_profiler.mark("first menu frame")
+        startup_profiler.report()
+        
+        # Preload the other screens while the player looks at the menu
+        warm_up_async()
     
-    def add_high_score(self, score):
+    def add_high_score(self, score, difficulty=None, duration=0, orbs=0):
         """Add a new high score"""
-        self.high_scores["scores"].append(score)
-        self.high_scores["scores"].sort(reverse=True)
-        self.high_scores["scores"] = self.high_scores["scores"][:10]  # Keep only top 10
-        self.save_high_scores()
+        log_offset = self.score_store.add_score(score, difficulty, duration, orbs)
+        if self.score_database:
+            self.score_database.record_score(score, difficulty, duration, orbs, log_offset)
+    
+    def build_menu(self):
+        """Build the main menu (once, the registry keeps it)"""
+        return MainMenu(self.screen, self.clock, self.sound_manager)
+    
+    def build_high_scores(self):
+        """Build the high scores screen (once, the registry keeps it)"""
+        from high_scores import HighScores
+        return HighScores(self.screen, self.clock, self.sound_manager, self.score_store)
+    
+    def build_instructions(self):
+        """Build the instructions screen (once, the registry keeps it)"""
+        from instructions import Instructions
+        return Instructions(self.screen, self.clock, self.sound_manager)
+    
+    def build_settings(self):
+        """Build the settings screen (once, the registry keeps it)"""
+        from settings import Settings
+        return Settings(self.screen, self.clock, self.sound_manager)
     
     def run_menu(self):
         """Run the main menu"""
-        menu = MainMenu(self.screen, self.clock, self.sound_manager)
-        selection = menu.run()
+        if startup_profiler.reported:
+            selection = self.screens.run("menu")
+        else:
+            with startup_profiler.phase("MainMenu"):
+                self.screens.get("menu")
+            selection = self.screens.run("menu", on_first_frame=self.on_first_menu_frame)
         
         if selection == "start":
             self.current_state = "game"
@@ -99,16 +144,18 @@ class GameManager:
         # Stop menu music before starting game
         self.sound_manager.stop_music()
         
-        # Create game instance
+        from improved_game import Game
+        
+        # Create game instance (it applies the current difficulty settings
+        # from the shared configuration store)
         game = Game(self.screen, self.clock, self.sound_manager)
         
-        # Apply difficulty settings if available
-        if self.difficulty_settings and hasattr(game, 'difficulty'):
-            self.difficulty_settings.apply_to_difficulty_manager(game.difficulty)
-            print(f"Applied {self.difficulty_settings.current_difficulty} difficulty to game")
+        # Pick up a run that was cut short (power loss), paused
+        game.resume_autosave()
         
         # Run the game
         result = game.run()
+        self.screens.begin_transition()
         
         # Process game result
         if result["action"] == "quit":
@@ -117,19 +164,15 @@ class GameManager:
             self.current_state = "menu"
             # Add score to high scores if game was completed
             if "score" in result:
-                self.add_high_score(result["score"])
+                self.add_high_score(result["score"], result.get("difficulty"),
+                                    result.get("duration", 0), result.get("orbs", 0))
         
-        # Restart menu music when returning to menu
-        if self.current_state == "menu":
-            # Make sure engine sound is stopped
-            self.sound_manager.stop("engine")
-            self.sound_manager.play_music("menu_music.mp3")
+        # The menu's enter hook stops the engine and restarts the menu music
+        # when the player comes back
     
     def run_high_scores(self):
         """Show high scores screen"""
-        from high_scores import HighScores
-        high_scores_screen = HighScores(self.screen, self.clock, self.sound_manager, self.high_scores)
-        result = high_scores_screen.run()
+        result = self.screens.run("high_scores")
         
         if result == "exit":
             self.running = False
@@ -138,9 +181,7 @@ class GameManager:
     
     def run_instructions(self):
         """Show instructions screen"""
-        from instructions import Instructions
-        instructions_screen = Instructions(self.screen, self.clock, self.sound_manager)
-        result = instructions_screen.run()
+        result = self.screens.run("instructions")
         
         if result == "exit":
             self.running = False
@@ -149,9 +190,7 @@ class GameManager:
     
     def run_settings(self):
         """Show settings screen"""
-        from settings import Settings
-        settings_screen = Settings(self.screen, self.clock, self.sound_manager)
-        result = settings_screen.run()
+        result = self.screens.run("settings")
         
         # Save settings when returning from settings screen
         self.settings_manager.update_from_sound_manager(self.sound_manager)
@@ -176,6 +215,10 @@ class GameManager:
                 self.run_settings()
         
         # Clean up
+        self.score_store.close()
+        if self.score_database:
+            self.score_database.close()
+        self.settings_manager.store.flush()
         pygame.quit()
         sys.exit()
 
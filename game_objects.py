@@ -1,7 +1,11 @@
 import pygame
-import math
-import random
 import os
+import threading
+
+import numpy as np
+
+from collision import cached_mask, broadphase, masks_overlap
+from ecs import World
 
 # Constants
 SCREEN_WIDTH = 800
@@ -73,118 +77,301 @@ def create_orb_sprite(radius=15):
     
     return sprite
 
-def create_road_segment(width, height):
-    """Create a road segment with lane markings"""
-    segment = pygame.Surface((width, height))
-    segment.fill((50, 50, 50))  # Dark gray road
-    
-    # Add lane markings
-    lane_width = width // LANE_COUNT
-    for lane in range(1, LANE_COUNT):
-        x = lane * lane_width
-        pygame.draw.line(segment, (255, 255, 255), (x, 0), (x, height), 2)
-    
-    return segment
-
-def create_stripe(width, height):
-    """Create a road stripe for the sides"""
-    stripe = pygame.Surface((width, height))
-    stripe.fill((255, 255, 255))
-    return stripe
-
-class Car:
-    def __init__(self, x, y, color=NEON_BLUE, is_player=False):
-        self.x = x
-        self.y = y
-        self.width = 40
-        self.height = 60
-        self.color = color
-        self.is_player = is_player
-        self.speed = PLAYER_SPEED if is_player else INITIAL_ENEMY_SPEED
-        self.sprite = create_car_sprite(color, self.width, self.height)
-        self.rect = pygame.Rect(x, y, self.width, self.height)
-        
-        # Animation variables
-        self.frame = 0
-        self.exhaust_particles = []
-    
-    def update(self, dt=1.0):
-        self.rect.x = self.x
-        self.rect.y = self.y
-        
-        # Add exhaust particles for player
-        if self.is_player and random.random() < 0.2:
-            self.exhaust_particles.append({
-                'x': self.x + self.width // 2,
-                'y': self.y + self.height,
-                'size': random.uniform(2, 5),
-                'life': random.randint(10, 20),
-                'vx': random.uniform(-0.5, 0.5),
-                'vy': random.uniform(1, 2)
-            })
-        
-        # Update exhaust particles
-        new_particles = []
-        for p in self.exhaust_particles:
-            p['x'] += p['vx']
-            p['y'] += p['vy']
-            p['life'] -= 1
-            p['size'] *= 0.9
-            
-            if p['life'] > 0 and p['size'] > 0.5:
-                new_particles.append(p)
-        
-        self.exhaust_particles = new_particles
-        
-        # Animation frame
-        self.frame += 1
-    
-    def draw(self, surface):
-        # Draw exhaust particles
-        for p in self.exhaust_particles:
-            alpha = min(255, int(p['life'] * 10))
-            pygame.draw.circle(surface, (100, 100, 100, alpha), 
-                             (int(p['x']), int(p['y'])), 
-                             int(p['size']))
-        
-        # Draw car with slight animation
-        y_offset = math.sin(self.frame * 0.2) * 2 if self.is_player else 0
-        surface.blit(self.sprite, (self.x, self.y + y_offset))
-        
-        # Draw headlight glow for player
-        if self.is_player:
-            glow_size = 10 + math.sin(self.frame * 0.1) * 2
-            glow_surf = pygame.Surface((int(glow_size*2), int(glow_size*2)), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surf, (255, 255, 200, 50), (int(glow_size), int(glow_size)), int(glow_size))
-            surface.blit(glow_surf, (self.x + 8 - glow_size, self.y + 5 - glow_size))
-            surface.blit(glow_surf, (self.x + self.width - 8 - glow_size, self.y + 5 - glow_size))
-
-class Orb:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 15
-        self.sprite = create_orb_sprite(self.radius)
-        self.rect = pygame.Rect(x - self.radius, y - self.radius, self.radius*2, self.radius*2)
-        self.collected = False
-        
-        # Animation variables
-        self.frame = random.randint(0, 100)
-    
-    def update(self, scroll_speed):
-        self.y += scroll_speed
-        self.rect.x = self.x - self.radius
-        self.rect.y = self.y - self.radius
-        self.frame += 1
-    
-    def draw(self, surface):
-        # Pulsating effect
-        scale = 1.0 + math.sin(self.frame * 0.1) * 0.2
-        scaled_sprite = pygame.transform.scale(
-            self.sprite, 
-            (int(self.radius*2*scale), int(self.radius*2*scale))
-        )
-        surface.blit(
-            scaled_sprite, 
-            (self.x - int(self.radius*scale), self.y - int(self.radius*scale))
-        )
\ No newline at end of file
+# Entities leave the game once they are this far below the screen
+CULL_MARGIN = 100
+
+# Enemy car colors
+ENEMY_COLORS = [NEON_GREEN, NEON_BLUE, NEON_PURPLE, NEON_YELLOW, NEON_ORANGE]
+
+# Component types (speeds are in pixels per 1/60 s simulation step)
+POSITION = np.dtype([("x", "f8"), ("y", "f8")])
+COMPONENTS = {
+    "position": POSITION,                                   # top left corner
+    "previous": POSITION,                                   # position before the last step (interpolation)
+    "velocity": np.dtype([("vx", "f8"), ("vy", "f8")]),
+    "body": np.dtype([("w", "i4"), ("h", "i4")]),           # sprite and collision box size
+    "sprite": np.dtype([("id", "i4")]),                     # id in SPRITES
+    "animation": np.dtype([("frame", "i4")]),
+    "emitter": np.dtype([("rate", "f8")]),                  # chance per step to emit an exhaust particle
+    "particle": np.dtype([("size", "f8"), ("life", "i4")]),
+    "cull": np.dtype([("bottom", "f8")]),                   # removed once y reaches bottom
+    "bob": np.dtype([("amplitude", "f8")]),                 # bobbing while driving (player)
+    "pulse": np.dtype([("amount", "f8")]),                  # size pulsation (orbs)
+    "headlights": np.dtype([("radius", "f8")])              # headlight glow (player)
+}
+
+# Entity kinds and their components, in draw order
+ARCHETYPES = {
+    "orbs": ("position", "previous", "velocity", "body", "sprite", "animation", "pulse", "cull"),
+    "enemies": ("position", "previous", "velocity", "body", "sprite", "animation", "cull"),
+    "particles": ("position", "velocity", "particle"),
+    "player": ("position", "previous", "velocity", "body", "sprite", "animation", "emitter", "bob", "headlights")
+}
+
+class SpriteTable:
+    """
+    Sprites shared by all the entities that look alike.
+    Entities store a sprite id. Resized copies (render scale, orb pulse)
+    and collision masks are cached per id. Resized copies are added while
+    drawing, on the render thread in pipelined mode, so adding them and
+    listing them (resized_sprites()) hold a lock.
+    """
+    __slots__ = ("ids", "keys", "sprites", "masks", "resized", "lock")
+
+    def __init__(self):
+        self.ids = {}
+        self.keys = []
+        self.sprites = []
+        self.masks = []
+        self.resized = {}
+        self.lock = threading.Lock()
+
+    def register(self, key, create, mask_key=None, mask_threshold=127):
+        """Get the id of a sprite, creating it on first use"""
+        sprite_id = self.ids.get(key)
+        if sprite_id is None:
+            sprite = create()
+            sprite_id = len(self.sprites)
+            self.sprites.append(sprite)
+            self.masks.append(cached_mask(mask_key or key, sprite, mask_threshold))
+            self.ids[key] = sprite_id
+            self.keys.append(key)
+        return sprite_id
+
+    def get(self, sprite_id, width, height):
+        """Get a sprite at a size in pixels"""
+        sprite = self.sprites[sprite_id]
+        if sprite.get_width() == width and sprite.get_height() == height:
+            return sprite
+        key = (sprite_id, width, height)
+        resized = self.resized.get(key)
+        if resized is None:
+            resized = pygame.transform.scale(sprite, (max(1, width), max(1, height)))
+            with self.lock:
+                self.resized[key] = resized
+        return resized
+
+    def resized_sprites(self):
+        """List of the cached resized sprites (safe while another thread draws)"""
+        with self.lock:
+            return list(self.resized.values())
+
+    def mask(self, sprite_id):
+        """Get the collision mask of a sprite"""
+        return self.masks[sprite_id]
+
+SPRITES = SpriteTable()
+
+# Headlight glow surfaces, by radius in pixels
+_glows = {}
+
+def car_sprite(color):
+    """Sprite id of a car color (all cars share one collision mask)"""
+    return SPRITES.register(("car", color), lambda: create_car_sprite(color), mask_key=("car", 40, 60))
+
+def orb_sprite(radius):
+    """Sprite id of an orb (the glow fades towards the center, so every visible pixel collides)"""
+    return SPRITES.register(("orb", radius), lambda: create_orb_sprite(radius), mask_threshold=1)
+
+def sprite_for_key(key):
+    """Sprite id for a SpriteTable key (after loading a saved game)"""
+    kind, value = key
+    if kind == "car":
+        return car_sprite(tuple(value))
+    if kind == "orb":
+        return orb_sprite(value)
+    raise ValueError(f"Unknown sprite {key!r}")
+
+def create_world(seed=None):
+    """Create a world with a pool for each entity kind"""
+    world = World(seed)
+    for name, components in ARCHETYPES.items():
+        world.add_pool(name, {component: COMPONENTS[component] for component in components})
+    return world
+
+def spawn_player(world, x, y):
+    """Add the player's car with its top left corner at x, y"""
+    return world.pools["player"].add(
+        position=(x, y), previous=(x, y), body=(40, 60), sprite=car_sprite(NEON_PINK),
+        emitter=0.2, bob=2.0, headlights=10.0)
+
+def spawn_enemy(world, x, y, color=None):
+    """Add an enemy car with its top left corner at x, y"""
+    if color is None:
+        color = ENEMY_COLORS[world.rng.integers(len(ENEMY_COLORS))]
+    return world.pools["enemies"].add(
+        position=(x, y), previous=(x, y), body=(40, 60), sprite=car_sprite(color),
+        cull=SCREEN_HEIGHT + CULL_MARGIN)
+
+def spawn_orb(world, x, y, radius=15):
+    """Add an orb centered on x, y"""
+    return world.pools["orbs"].add(
+        position=(x - radius, y - radius), previous=(x - radius, y - radius),
+        body=(radius * 2, radius * 2), sprite=orb_sprite(radius),
+        animation=world.rng.integers(0, 101), pulse=0.2,
+        cull=SCREEN_HEIGHT + CULL_MARGIN - radius)
+
+def entity_box(pool, row):
+    """Collision box (x, y, width, height) of an entity, in whole pixels"""
+    position = pool.get("position")[row]
+    body = pool.get("body")[row]
+    return (int(position["x"]), int(position["y"]), int(body["w"]), int(body["h"]))
+
+def find_collisions(pool, box, mask, pixel_perfect=True):
+    """
+    Rows of a pool whose entities collide with a box (x, y, width, height)
+    that has a mask. The boxes of the whole pool are tested at once, and
+    the masks only for the rows whose boxes overlap.
+    """
+    if not pool.count:
+        return np.empty(0, dtype=np.int64)
+    position = pool.get("position")
+    body = pool.get("body")
+    xs = position["x"].astype(np.int64)
+    ys = position["y"].astype(np.int64)
+    rows = broadphase(box, xs, ys, body["w"], body["h"])
+    if not pixel_perfect or not len(rows):
+        return rows
+    sprites = pool.get("sprite")["id"]
+    hits = [masks_overlap(mask, box[:2], SPRITES.mask(sprites[row]), (xs[row], ys[row])) for row in rows]
+    return rows[np.array(hits, dtype=bool)]
+
+def count_passing(pool, box, distance):
+    """
+    Number of entities of a pool that passed a box (x, y, width, height)
+    this step, moving down past its bottom edge less than distance pixels
+    to its side (near misses)
+    """
+    if not pool.count:
+        return 0
+    x, y, width, height = box
+    bottom = y + height
+    ys = pool.get("position")["y"]
+    passed = (pool.get("previous")["y"] < bottom) & (ys >= bottom)
+    if not passed.any():
+        return 0
+    xs = pool.get("position")["x"]
+    gap = np.maximum(xs - (x + width), x - (xs + pool.get("body")["w"]))
+    return int(np.count_nonzero(passed & (gap < distance)))
+
+# Update systems
+
+def history_system(world, dt):
+    """Remember positions before a step (the renderer interpolates from them)"""
+    for pool in world.query("position", "previous"):
+        pool.get("previous")[:] = pool.get("position")
+
+def emitter_system(world, dt):
+    """Emit exhaust particles behind the entities with an emitter"""
+    rng = world.rng
+    particles = world.pools["particles"]
+    for pool in world.query("emitter", "position", "body"):
+        emitting = rng.random(pool.count) < pool.get("emitter")["rate"]
+        if not emitting.any():
+            continue
+        position = pool.get("position")[emitting].tolist()
+        body = pool.get("body")[emitting].tolist()
+        # Per particle: sideways drift, fall speed, size and life
+        for (x, y), (width, height), (drift, fall, size, life) in zip(position, body, rng.random((len(body), 4)).tolist()):
+            particles.add(
+                position=(x + width // 2, y + height),
+                velocity=(drift - 0.5, 1 + fall),
+                particle=(2 + size * 3, 10 + int(life * 11)))
+
+def movement_system(world, dt):
+    """Move every entity by its velocity"""
+    for pool in world.query("position", "velocity"):
+        position = pool.get("position")
+        velocity = pool.get("velocity")
+        position["x"] += velocity["vx"]
+        position["y"] += velocity["vy"]
+
+def particle_system(world, dt):
+    """Shrink and age particles, removing the faded ones"""
+    for pool in world.query("particle"):
+        particle = pool.get("particle")
+        particle["life"] -= 1
+        particle["size"] *= 0.9
+        pool.remove((particle["life"] <= 0) | (particle["size"] <= 0.5))
+
+def animation_system(world, dt):
+    """Advance animation frames"""
+    for pool in world.query("animation"):
+        pool.get("animation")["frame"] += 1
+
+def cull_system(world, dt):
+    """Remove the entities that have left the bottom of the screen"""
+    for pool in world.query("position", "cull"):
+        pool.remove(pool.get("position")["y"] >= pool.get("cull")["bottom"])
+
+# Render systems
+
+def render_system(world, surface, pools, alpha, scale):
+    """
+    Draw entity pools (the live pools or snapshot copies) in pool order,
+    interpolating alpha of the way from the previous step, with game
+    coordinates multiplied by scale.
+    """
+    for pool in pools.values():
+        if not pool.count:
+            continue
+        if pool.has("particle"):
+            draw_particles(surface, pool, scale)
+        elif pool.has("sprite"):
+            draw_sprites(surface, pool, alpha, scale)
+
+def draw_sprites(surface, pool, alpha, scale):
+    """Blit the sprites of a pool in one batch"""
+    position = pool.get("position")
+    previous = pool.get("previous")
+    body = pool.get("body")
+    x = previous["x"] + (position["x"] - previous["x"]) * alpha
+    y = previous["y"] + (position["y"] - previous["y"]) * alpha
+    frames = pool.get("animation")["frame"] if pool.has("animation") else np.zeros(pool.count)
+
+    if pool.has("pulse"):
+        # Pulsating around the center (the render scale is applied in the same resize)
+        factor = (1.0 + np.sin(frames * 0.1) * pool.get("pulse")["amount"]) * scale
+        widths = np.maximum(1, (body["w"] * factor).astype(np.int64))
+        heights = np.maximum(1, (body["h"] * factor).astype(np.int64))
+        left = (x + body["w"] / 2) * scale - (body["w"] / 2 * factor).astype(np.int64)
+        top = (y + body["h"] / 2) * scale - (body["h"] / 2 * factor).astype(np.int64)
+    else:
+        widths = np.maximum(1, np.round(body["w"] * scale).astype(np.int64))
+        heights = np.maximum(1, np.round(body["h"] * scale).astype(np.int64))
+        left = x * scale
+        top = y * scale
+        if pool.has("bob"):
+            top = top + np.sin(frames * 0.2) * pool.get("bob")["amplitude"] * scale
+
+    get = SPRITES.get
+    surface.blits([(get(sprite_id, width, height), (sprite_x, sprite_y))
+                   for sprite_id, width, height, sprite_x, sprite_y in zip(
+                       pool.get("sprite")["id"].tolist(), widths.tolist(), heights.tolist(),
+                       left.tolist(), top.tolist())], False)
+
+    if pool.has("headlights"):
+        draw_headlights(surface, pool, x, y, frames, scale)
+
+def draw_headlights(surface, pool, x, y, frames, scale):
+    """Draw the headlight glow at the front corners of the cars"""
+    glow_sizes = (pool.get("headlights")["radius"] + np.sin(frames * 0.1) * 2) * scale
+    for left, top, width, glow_size in zip(x.tolist(), y.tolist(), pool.get("body")["w"].tolist(),
+                                           glow_sizes.tolist()):
+        radius = int(glow_size)
+        glow_surf = _glows.get(radius)
+        if glow_surf is None:
+            glow_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surf, (255, 255, 200, 50), (radius, radius), radius)
+            _glows[radius] = glow_surf
+        surface.blit(glow_surf, ((left + 8) * scale - glow_size, (top + 5) * scale - glow_size))
+        surface.blit(glow_surf, ((left + width - 8) * scale - glow_size, (top + 5) * scale - glow_size))
+
+def draw_particles(surface, pool, scale):
+    """Draw exhaust particles"""
+    position = pool.get("position")
+    particle = pool.get("particle")
+    for x, y, size, life in zip(position["x"].tolist(), position["y"].tolist(),
+                                particle["size"].tolist(), particle["life"].tolist()):
+        pygame.draw.circle(surface, (100, 100, 100, min(255, life * 10)),
+                           (int(x * scale), int(y * scale)), max(1, int(size * scale)))
@@ -0,0 +1,248 @@
+import ast
+import math
+import os
+import random
+import struct
+
+import numpy as np
+
+from game_logging import get_logger
+from game_objects import SPRITES, sprite_for_key
+from spawn_scheduler import SpawnEvent, ENEMY, ORB
+from track_generator import CHUNK_HEIGHT, ACTIVE_CHUNKS
+
+logger = get_logger("game_state")
+
+# Autosave file, written from the background writer while a game runs
+AUTOSAVE_FILE = os.path.join(os.path.dirname(__file__), "autosave.bin")
+
+# Binary format: a header, then the sections in the order written below
+MAGIC = b"QASV"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH")
+GAME = struct.Struct("<qqqdddQ")        # score, orbs, high score, game time, track distance (now, previous), track seed
+DIFFICULTY = struct.Struct("<ddddd")    # game time, enemy speed, scroll speed, spawn rates
+TRACK = struct.Struct("<q")             # first active chunk
+SPAWNER = struct.Struct("<dddb")        # next enemy time, next orb time, fill time, last lane (-1 = none)
+GENERATOR = struct.Struct("<16s16sBI")  # PCG64 state, increment, has_uint32, uinteger
+RANDOM = struct.Struct("<Bd")           # has gauss_next, gauss_next
+COUNT = struct.Struct("<I")
+
+# Scheduled spawns: kind 0 = enemy, 1 = orb, lane -1 for orbs
+SPAWN_EVENT = np.dtype([("time", "<f8"), ("kind", "u1"), ("lane", "i1"), ("x", "<f8")])
+SPAWN_KINDS = (ENEMY, ORB)
+
+class StateWriter:
+    """Collects binary sections into one buffer"""
+    __slots__ = ("parts",)
+
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, layout, *values):
+        self.parts.append(layout.pack(*values))
+
+    def string(self, text):
+        data = text.encode("utf-8")
+        self.pack(COUNT, len(data))
+        self.parts.append(data)
+
+    def array(self, array):
+        """Raw array data, prefixed by its length in bytes"""
+        data = array.tobytes()
+        self.pack(COUNT, len(data))
+        self.parts.append(data)
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+class StateReader:
+    """Reads back the sections written by StateWriter"""
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def raw(self):
+        size, = self.unpack(COUNT)
+        if self.offset + size > len(self.data):
+            raise ValueError("Truncated game state")
+        data = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return data
+
+    def string(self):
+        return bytes(self.raw()).decode("utf-8")
+
+    def array(self, dtype):
+        return np.frombuffer(self.raw(), dtype=dtype)
+
+def save_game_state(game):
+    """Pack the full state of a running game into bytes"""
+    writer = StateWriter()
+    writer.pack(HEADER, MAGIC, FORMAT_VERSION)
+    writer.pack(GAME, game.score, game.orbs_collected, game.high_score, game.game_time,
+                game.track_distance, game.prev_track_distance, game.track_seed)
+
+    difficulty = game.difficulty
+    writer.string(difficulty.difficulty_level)
+    writer.pack(DIFFICULTY, difficulty.game_time, difficulty.enemy_speed, difficulty.scroll_speed,
+                difficulty.enemy_spawn_rate, difficulty.orb_spawn_rate)
+
+    writer.pack(TRACK, game.track.active[0].index)
+
+    # Spawn schedule and its random generator
+    spawner = game.spawner
+    events = spawner.upcoming()
+    schedule = np.array([(event.time, SPAWN_KINDS.index(event.kind),
+                          -1 if event.lane is None else event.lane, event.x) for event in events],
+                        dtype=SPAWN_EVENT)
+    writer.pack(SPAWNER, spawner.next_time[ENEMY], spawner.next_time[ORB], spawner.fill_time,
+                -1 if spawner.last_lane is None else spawner.last_lane)
+    writer.array(schedule)
+    write_random(writer, spawner.rng)
+
+    # Entities: sprite keys (ids differ between runs), then every pool's arrays
+    writer.string(repr(SPRITES.keys))
+    write_generator(writer, game.world.rng)
+    writer.pack(COUNT, len(game.world.pools))
+    for name, pool in game.world.pools.items():
+        writer.string(name)
+        writer.pack(COUNT, pool.count)
+        for component in pool.arrays:
+            writer.array(pool.get(component))
+
+    return writer.getvalue()
+
+def load_game_state(game, data):
+    """
+    Restore a game from bytes packed by save_game_state(), so the run
+    continues exactly where it was saved. Raises ValueError if the data
+    is invalid or was saved for another difficulty level; the game is
+    only changed once all of it has been read and checked.
+    """
+    reader = StateReader(data)
+    try:
+        magic, version = reader.unpack(HEADER)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a saved game, or an incompatible version")
+        game_values = reader.unpack(GAME)
+
+        difficulty_level = reader.string()
+        if difficulty_level != game.difficulty.difficulty_level:
+            raise ValueError(f"Saved game is for difficulty {difficulty_level}")
+        difficulty_values = reader.unpack(DIFFICULTY)
+        first_chunk, = reader.unpack(TRACK)
+        # The first active chunk is at most ACTIVE_CHUNKS behind the track distance
+        track_distance = game_values[4]
+        if not (math.isfinite(track_distance)
+                and 0 <= track_distance / CHUNK_HEIGHT - first_chunk <= ACTIVE_CHUNKS):
+            raise ValueError("Track position out of range")
+
+        next_enemy, next_orb, fill_time, last_lane = reader.unpack(SPAWNER)
+        schedule = reader.array(SPAWN_EVENT)
+        if len(schedule) and (schedule["kind"] >= len(SPAWN_KINDS)).any():
+            raise ValueError("Unknown spawn kind")
+        events = [SpawnEvent(float(event["time"]), SPAWN_KINDS[event["kind"]],
+                             None if event["lane"] < 0 else int(event["lane"]), float(event["x"]))
+                  for event in schedule]
+        random_state = read_random(reader)
+        # setstate() checks the state, try it on a scratch generator
+        random.Random().setstate(random_state)
+
+        sprite_keys = ast.literal_eval(reader.string())
+        if not isinstance(sprite_keys, list):
+            raise ValueError("Sprite keys are not a list")
+        remap = np.array([sprite_for_key(key) for key in sprite_keys] or [0], dtype=np.int32)
+        generator_state = read_generator(reader)
+        np.random.PCG64().state = generator_state
+
+        pool_count, = reader.unpack(COUNT)
+        pools = {}
+        for _ in range(pool_count):
+            name = reader.string()
+            count, = reader.unpack(COUNT)
+            arrays = []
+            for component, array in game.world.pools[name].arrays.items():
+                data = np.frombuffer(reader.raw(), dtype=array.dtype)
+                if len(data) != count:
+                    raise ValueError(f"Wrong component size in pool {name}")
+                if component == "sprite" and count and ((data["id"] < 0) | (data["id"] >= len(sprite_keys))).any():
+                    raise ValueError(f"Unknown sprite id in pool {name}")
+                arrays.append(data)
+            pools[name] = (count, arrays)
+    except (struct.error, KeyError, IndexError, TypeError, SyntaxError, UnicodeDecodeError,
+            MemoryError, RecursionError) as e:
+        raise ValueError(f"Corrupt game state: {e}")
+
+    # Everything was read and checked, now apply it
+    (game.score, game.orbs_collected, game.high_score, game.game_time,
+     game.track_distance, game.prev_track_distance, game.track_seed) = game_values
+
+    difficulty = game.difficulty
+    (difficulty.game_time, difficulty.enemy_speed, difficulty.scroll_speed,
+     difficulty.enemy_spawn_rate, difficulty.orb_spawn_rate) = difficulty_values
+
+    game.spawner.restore(events, {ENEMY: next_enemy, ORB: next_orb}, None if last_lane < 0 else last_lane, fill_time)
+    game.spawner.rng.setstate(random_state)
+
+    world = game.world
+    world.rng.bit_generator.state = generator_state
+    for name, (count, arrays) in pools.items():
+        pool = world.pools[name]
+        pool.resize(count)
+        for array, data in zip(pool.arrays.values(), arrays):
+            array[:count] = data
+        if pool.has("sprite"):
+            sprites = pool.get("sprite")
+            sprites["id"] = remap[sprites["id"]]
+
+    # The track chunks are regenerated from the seed, their content is already in the pools
+    game.resume_track(first_chunk)
+
+def write_random(writer, rng):
+    """Pack the state of a random.Random"""
+    version, internal, gauss_next = rng.getstate()
+    writer.array(np.array(internal, dtype="<u4"))
+    writer.pack(RANDOM, gauss_next is not None, gauss_next or 0.0)
+
+def read_random(reader):
+    """State for random.Random.setstate()"""
+    internal = tuple(int(value) for value in reader.array("<u4"))
+    has_gauss, gauss_next = reader.unpack(RANDOM)
+    return (3, internal, gauss_next if has_gauss else None)
+
+def write_generator(writer, rng):
+    """Pack the state of a numpy PCG64 generator"""
+    state = rng.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        raise ValueError(f"Unsupported bit generator {state['bit_generator']}")
+    writer.pack(GENERATOR, state["state"]["state"].to_bytes(16, "little"),
+                state["state"]["inc"].to_bytes(16, "little"), state["has_uint32"], state["uinteger"])
+
+def read_generator(reader):
+    """State for a numpy PCG64 bit generator"""
+    state, inc, has_uint32, uinteger = reader.unpack(GENERATOR)
+    return {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(inc, "little")},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger
+    }
+
+def read_autosave():
+    """Get the autosave data, or None if there is none"""
+    try:
+        with open(AUTOSAVE_FILE, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except (IOError, OSError) as e:
+        logger.warning("Could not read the autosave: %s", e)
+        return None
@@ -3,9 +3,10 @@ import sys
 import math
 import random
 import os
-import json
 from pygame.locals import *
 from button import Button
+from ui_cache import crop_to_content
+from screen_registry import FirstFrameHook
 
 # Constants
 SCREEN_WIDTH = 800
@@ -23,16 +24,19 @@ NEON_YELLOW = (255, 255, 0)
 NEON_ORANGE = (255, 165, 0)
 NEON_CYAN = (0, 255, 255)
 
-class HighScores:
+class HighScores(FirstFrameHook):
     """High scores screen to display top player scores"""
     
-    def __init__(self, screen, clock, sound_manager, scores_data):
+    def __init__(self, screen, clock, sound_manager, score_store):
         # Current selected button for keyboard navigation
         self.selected_button = 0
         self.screen = screen
         self.clock = clock
         self.sound_manager = sound_manager
-        self.scores_data = scores_data
+        self.score_store = score_store
+        # Leaderboards that can be shown, switched with LEFT/RIGHT
+        self.leaderboards = ["all", "easy", "medium", "hard"]
+        self.leaderboard_index = 0
         self.running = True
         self.animation_time = 0
         self.stars = []
@@ -78,6 +82,108 @@ class HighScores:
             sound_manager=self.sound_manager
         )
     
+        # Prerendered page content, rebuilt when the shown leaderboard or
+        # the score store version changes (see get_static_content())
+        self.title_cache = {}
+        self.content_surface = None
+        self.content_key = None
+    
+    def on_enter(self):
+        """Reset per-visit state when the screen is shown again"""
+        self.running = True
+        self.selected_button = 0
+        # Scores may have been added since the last visit
+        self.get_static_content()
+    
+    def get_title_surfaces(self, leaderboard):
+        """Get the title and its glow layers for a leaderboard (rendered once)"""
+        surfaces = self.title_cache.get(leaderboard)
+        if surfaces is None:
+            title_text = f"HIGH SCORES - {leaderboard.upper()}"
+            surfaces = [
+                self.title_font.render(title_text, True, (*NEON_YELLOW[:3], 25 * i))
+                for i in range(6, 0, -2)
+            ]
+            surfaces.append(self.title_font.render(title_text, True, NEON_YELLOW))
+            self.title_cache[leaderboard] = surfaces
+        return surfaces
+    
+    def get_static_content(self):
+        """Get the score table (surface, position), rebuilding it if the scores changed"""
+        leaderboard = self.leaderboards[self.leaderboard_index]
+        key = (leaderboard, self.score_store.version)
+        if key != self.content_key:
+            self.content_surface = self.build_static_content(leaderboard)
+            self.content_key = key
+        return self.content_surface
+    
+    def build_static_content(self, leaderboard):
+        """Render the score table and navigation text into one surface"""
+        content = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        content.fill(BLACK)
+        
+        # Leaderboards are kept sorted by the score store
+        scores = self.score_store.leaderboard(leaderboard)
+        if not scores:
+            # No scores yet
+            no_scores_text = "NO HIGH SCORES YET!"
+            no_scores_surface = self.subtitle_font.render(no_scores_text, True, NEON_PINK)
+            no_scores_rect = no_scores_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+            content.blit(no_scores_surface, no_scores_rect)
+            
+            play_text = "PLAY THE GAME TO SET A SCORE"
+            play_surface = self.text_font.render(play_text, True, NEON_CYAN)
+            play_rect = play_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+            content.blit(play_surface, play_rect)
+        else:
+            # Draw scores table
+            # Draw table header
+            header_text = "RANK       SCORE"
+            header_surface = self.subtitle_font.render(header_text, True, NEON_CYAN)
+            content.blit(header_surface, (SCREEN_WIDTH // 2 - 150, 120))
+            
+            # Draw horizontal line
+            pygame.draw.line(content, NEON_CYAN, 
+                           (SCREEN_WIDTH // 2 - 200, 160), 
+                           (SCREEN_WIDTH // 2 + 200, 160), 2)
+            
+            # Draw scores
+            y_pos = 180
+            for i, record in enumerate(scores):
+                # Determine color based on rank
+                if i == 0:
+                    color = NEON_YELLOW  # Gold for 1st place
+                elif i == 1:
+                    color = (200, 200, 200)  # Silver for 2nd place
+                elif i == 2:
+                    color = (205, 127, 50)  # Bronze for 3rd place
+                else:
+                    color = WHITE
+                
+                # Draw rank with right alignment
+                rank_text = f"{i+1}."
+                rank_surface = self.text_font.render(rank_text, True, color)
+                content.blit(rank_surface, (SCREEN_WIDTH // 2 - 150, y_pos))
+                
+                # Draw score with left alignment
+                score_text = f"{record['score']}"
+                score_surface = self.text_font.render(score_text, True, color)
+                content.blit(score_surface, (SCREEN_WIDTH // 2 + 50, y_pos))
+                
+                y_pos += 30
+        
+        # Draw keyboard navigation instructions
+        nav_text = "UP/DOWN: Switch Buttons, LEFT/RIGHT: Difficulty, ENTER: Select"
+        nav_surface = self.small_font.render(nav_text, True, (200, 200, 200))
+        nav_rect = nav_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 200))
+        content.blit(nav_surface, nav_rect)
+        
+        return crop_to_content(content)
+    
+    def on_exit(self):
+        """Called when the screen is left"""
+        pass
+    
     def get_font(self, size):
         """Get a font of specified size"""
         font_dir = os.path.join(os.path.dirname(__file__), "assets", "fonts")
@@ -96,6 +202,11 @@ class HighScores:
                 if event.key == K_ESCAPE:
                     self.running = False
                     return "menu"
+                elif event.key == K_LEFT or event.key == K_RIGHT:
+                    # Switch between the overall and per-difficulty leaderboards
+                    step = 1 if event.key == K_RIGHT else -1
+                    self.leaderboard_index = (self.leaderboard_index + step) % len(self.leaderboards)
+                    self.sound_manager.play("hover")
                 elif event.key == K_UP or event.key == K_DOWN:
                     # Toggle between back and reset buttons
                     self.selected_button = 1 - self.selected_button
@@ -107,11 +218,7 @@ class HighScores:
                         self.running = False
                         return "menu"
                     elif self.selected_button == 1:  # Reset button
-                        # Reset high scores
-                        self.scores_data["scores"] = []
-                        # Save the empty scores
-                        with open("high_scores.json", "w") as f:
-                            json.dump(self.scores_data, f)
+                        self.reset_high_scores()
             
             # Check button clicks
             if self.back_button.is_clicked(event):
@@ -119,16 +226,14 @@ class HighScores:
                 return "menu"
             
             if self.reset_button.is_clicked(event):
-                # Reset high scores
-                self.scores_data["scores"] = []
-                self.save_high_scores()
+                self.reset_high_scores()
         
         return None
     
-    def save_high_scores(self):
-        """Save high scores to file"""
-        with open("high_scores.json", "w") as f:
-            json.dump(self.scores_data, f)
+    def reset_high_scores(self):
+        """Clear the leaderboards"""
+        self.score_store.reset()
+        self.get_static_content()
     
     def update(self):
         """Update screen elements"""
@@ -162,14 +267,12 @@ class HighScores:
                              (int(star['x']), int(star['y'])), 
                              int(star['size']))
         
-        # Draw title
-        title_text = "HIGH SCORES"
-        title_surface = self.title_font.render(title_text, True, NEON_YELLOW)
+        # Draw title with glow effect (surfaces are prerendered)
+        leaderboard = self.leaderboards[self.leaderboard_index]
+        title_surfaces = self.get_title_surfaces(leaderboard)
+        title_surface = title_surfaces[-1]
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
-        
-        # Add glow effect to title
-        for i in range(6, 0, -2):
-            glow_surface = self.title_font.render(title_text, True, (*NEON_YELLOW[:3], 25 * i))
+        for i, glow_surface in zip(range(6, 0, -2), title_surfaces):
             glow_rect = glow_surface.get_rect(center=(
                 title_rect.centerx + random.randint(-i, i),
                 title_rect.centery + random.randint(-i, i)
@@ -179,62 +282,8 @@ class HighScores:
         # Draw main title
         self.screen.blit(title_surface, title_rect)
         
-        # Draw high scores
-        if not self.scores_data["scores"]:
-            # No scores yet
-            no_scores_text = "NO HIGH SCORES YET!"
-            no_scores_surface = self.subtitle_font.render(no_scores_text, True, NEON_PINK)
-            no_scores_rect = no_scores_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(no_scores_surface, no_scores_rect)
-            
-            play_text = "PLAY THE GAME TO SET A SCORE"
-            play_surface = self.text_font.render(play_text, True, NEON_CYAN)
-            play_rect = play_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-            self.screen.blit(play_surface, play_rect)
-        else:
-            # Draw scores table
-            scores = sorted(self.scores_data["scores"], reverse=True)[:10]  # Top 10 scores
-            
-            # Draw table header
-            header_text = "RANK       SCORE"
-            header_surface = self.subtitle_font.render(header_text, True, NEON_CYAN)
-            self.screen.blit(header_surface, (SCREEN_WIDTH // 2 - 150, 120))
-            
-            # Draw horizontal line
-            pygame.draw.line(self.screen, NEON_CYAN, 
-                           (SCREEN_WIDTH // 2 - 200, 160), 
-                           (SCREEN_WIDTH // 2 + 200, 160), 2)
-            
-            # Draw scores
-            y_pos = 180
-            for i, score in enumerate(scores):
-                # Determine color based on rank
-                if i == 0:
-                    color = NEON_YELLOW  # Gold for 1st place
-                elif i == 1:
-                    color = (200, 200, 200)  # Silver for 2nd place
-                elif i == 2:
-                    color = (205, 127, 50)  # Bronze for 3rd place
-                else:
-                    color = WHITE
-                
-                # Draw rank with right alignment
-                rank_text = f"{i+1}."
-                rank_surface = self.text_font.render(rank_text, True, color)
-                self.screen.blit(rank_surface, (SCREEN_WIDTH // 2 - 150, y_pos))
-                
-                # Draw score with left alignment
-                score_text = f"{score}"
-                score_surface = self.text_font.render(score_text, True, color)
-                self.screen.blit(score_surface, (SCREEN_WIDTH // 2 + 50, y_pos))
-                
-                y_pos += 30
-        
-        # Draw keyboard navigation instructions
-        nav_text = "Use UP/DOWN to Switch Buttons, ENTER to Select"
-        nav_surface = self.small_font.render(nav_text, True, (200, 200, 200))
-        nav_rect = nav_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 200))
-        self.screen.blit(nav_surface, nav_rect)
+        # Draw the score table (rebuilt only when the scores change)
+        self.screen.blit(*self.get_static_content())
         
         # Draw buttons
         self.back_button.draw(self.screen)
@@ -252,6 +301,8 @@ class HighScores:
                 
             self.update()
             self.draw()
+            self.first_frame_drawn()
+            
             self.clock.tick(FPS)
         
         return "menu"  # Default return to menu
\ No newline at end of file
@@ -3,12 +3,32 @@ import sys
 import math
 import random
 import os
+import time
 from pygame.locals import *
 
 # Import game modules
-from game_objects import Car, Orb, create_road_segment, create_stripe
+import numpy as np
+
+from game_objects import (create_world, spawn_player, spawn_enemy, spawn_orb, entity_box, find_collisions, count_passing,
+                          history_system, emitter_system, movement_system, particle_system,
+                          animation_system, cull_system, render_system, SPRITES, PLAYER_SPEED)
 from difficulty_manager import DifficultyManager
 from button import Button
+from game_logging import get_logger, cycle_log_level
+from frame_pacer import FramePacer
+from render_target import RenderTarget, create_display
+from render_pipeline import FrameSnapshot, RenderPipeline
+from spawn_scheduler import SpawnScheduler, ENEMY, LANE_X
+from track_generator import TrackStreamer, CHUNK_X
+from config_store import get_config_store
+from persistence import get_writer
+from game_state import save_game_state, load_game_state, read_autosave, AUTOSAVE_FILE
+from collision import collide_rect
+from memory_tuning import AllocationMonitor, get_memory_reporter, tune_gc, restore_gc
+from rewind import RewindBuffer
+from telemetry import TelemetryWriter, SessionTelemetry, NEAR_MISS_DISTANCE
+
+logger = get_logger("game")
 
 # Constants
 SCREEN_WIDTH = 800
@@ -32,6 +52,15 @@ ROAD_WIDTH = 400
 LANE_COUNT = 3
 LANE_WIDTH = ROAD_WIDTH // LANE_COUNT
 
+# Random enemy speed variation by difficulty (0.1 = +-10%)
+SPEED_VARIATION = {"easy": 0.0, "medium": 0.1, "hard": 0.2}
+
+# Points per orb by difficulty
+ORB_POINTS = {"easy": 1, "medium": 2, "hard": 3}
+
+# Seconds of game time between autosaves
+AUTOSAVE_INTERVAL = 5.0
+
 # Asset paths
 ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
 FONT_DIR = os.path.join(ASSET_DIR, "fonts")
@@ -39,6 +68,10 @@ FONT_DIR = os.path.join(ASSET_DIR, "fonts")
 # Create directories if they don't exist
 os.makedirs(FONT_DIR, exist_ok=True)
 
+def surface_bytes(surface):
+    """Pixel memory of a surface"""
+    return surface.get_pitch() * surface.get_height()
+
 # Create pixel fonts
 def get_font(size):
     try:
@@ -51,7 +84,8 @@ class Game:
         # Use provided screen and clock or create new ones
         if screen is None:
             pygame.init()
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.screen = create_display((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                         get_config_store().get("game_settings")["fullscreen"])
             pygame.display.set_caption(TITLE)
         else:
             self.screen = screen
@@ -72,44 +106,85 @@ class Game:
         self.game_over = False
         self.paused = False
         self.score = 0
+        self.orbs_collected = 0
         self.high_score = 0
-        self.player = Car(SCREEN_WIDTH // 2 - 20, SCREEN_HEIGHT - 100, NEON_PINK, True)
-        self.enemies = []
-        self.orbs = []
-        self.road_segments = []
-        self.stripes = []
         self.game_time = 0
         
+        # Entities live in the world's pools and are updated by its systems, in this order
+        self.world = create_world()
+        for name, system in (("history", history_system),
+                             ("input", self.input_system),
+                             ("traffic", self.traffic_system),
+                             ("emitters", emitter_system),
+                             ("movement", movement_system),
+                             ("particles", particle_system),
+                             ("animation", animation_system),
+                             ("collisions", self.collision_system),
+                             ("cull", cull_system)):
+            self.world.add_system(name, system)
+        self.world.add_system("render", render_system, "render")
+        spawn_player(self.world, SCREEN_WIDTH // 2 - 20, SCREEN_HEIGHT - 100)
+        
+        # Rendering is paced separately from the fixed-rate simulation
+        game_settings = get_config_store().get("game_settings")
+        self.pacer = FramePacer(self.clock, game_settings["fps_cap"], game_settings["precise_pacing"])
+        
+        # The world is drawn at the internal render scale and stretched to the display
+        self.render_target = RenderTarget(self.screen, game_settings["render_scale"])
+        
+        # Optionally draw frames on a render thread while the next one is simulated
+        self.pipelined = game_settings["pipelined_rendering"]
+        
+        # The HUD is created here rather than on the first frame, which may be drawn on the render thread
+        try:
+            from game_hud import GameHUD
+            self.hud = GameHUD(self.screen, get_font)
+        except ImportError:
+            self.hud = None
+        
+        # Pixel-accurate collisions (masks) after the bounding box test
+        self.pixel_collision = game_settings["pixel_collision"]
+        
+        # Freeze the loaded objects and raise the GC thresholds while playing
+        self.gc_tuning = game_settings["gc_tuning"]
+        
+        # Memory accounting reports (F10, or every QAUTO_MEMORY_REPORT seconds)
+        self.memory_reporter = get_memory_reporter()
+        
+        # Save the running game regularly, so it can be resumed after a power loss
+        self.autosave = game_settings["autosave"]
+        self.next_autosave = AUTOSAVE_INTERVAL
+        self.autosave_count = 0
+        self.autosave_time = 0.0
+        self.autosave_max_time = 0.0
+        
+        # Recent states for rewinding (hold R), in a fixed amount of memory
+        self.rewind = None
+        if game_settings["rewind_seconds"] > 0:
+            self.rewind = RewindBuffer(game_settings["rewind_memory_kb"] * 1024, game_settings["rewind_seconds"])
+        
         # Initialize difficulty manager
         self.difficulty = DifficultyManager()
         
-        # Try to load difficulty settings
-        try:
-            from difficulty_settings import DifficultySettings
-            self.difficulty_settings = DifficultySettings()
-            # Apply saved difficulty settings
-            self.difficulty_settings.apply_to_difficulty_manager(self.difficulty)
-            print(f"Applied {self.difficulty_settings.current_difficulty} difficulty to game")
-        except ImportError:
-            print("Difficulty settings module not found, using default settings")
-            self.difficulty_settings = None
-        
-        # Create road segments
-        segment_height = 100
-        for i in range(SCREEN_HEIGHT // segment_height + 2):
-            self.road_segments.append({
-                'y': i * segment_height - segment_height,
-                'sprite': create_road_segment(ROAD_WIDTH, segment_height)
-            })
-        
-        # Create road stripes
-        stripe_height = 30
-        stripe_gap = 40
-        for i in range(SCREEN_HEIGHT // (stripe_height + stripe_gap) * 2):
-            self.stripes.append({
-                'y': i * (stripe_height + stripe_gap) - stripe_height,
-                'sprite': create_stripe(10, stripe_height)
-            })
+        # The difficulty manager applies the saved difficulty settings itself
+        self.difficulty_settings = self.difficulty.difficulty_settings
+        
+        # Per-second telemetry, written to compressed files by a background writer
+        self.telemetry = None
+        if game_settings["telemetry"]:
+            self.telemetry_writer = TelemetryWriter()
+            self.telemetry = SessionTelemetry(self.telemetry_writer, self.difficulty.difficulty_level)
+            self.telemetry.start_run()
+        
+        # Spawn times and lanes are sampled ahead from the difficulty curves
+        self.spawner = SpawnScheduler(
+            self.difficulty.difficulty_level,
+            self.difficulty.curves["enemy_spawn_rate"].value_at,
+            self.difficulty.curves["orb_spawn_rate"].value_at
+        )
+        
+        # The road is streamed in generated chunks as it scrolls
+        self.start_track()
         
         # Create pause menu buttons
         button_width = 250
@@ -159,7 +234,7 @@ class Game:
                 if event.key == K_ESCAPE:
                     if self.game_over:
                         self.running = False
-                        return {"action": "menu", "score": self.score}
+                        return self.get_result()
                     else:
                         self.paused = not self.paused
                         # Stop engine sound when pausing
@@ -168,6 +243,13 @@ class Game:
                         else:
                             self.sound_manager.play("engine", -1)
                         
+                elif event.key == K_F9:
+                    # Switch the log level at runtime (off -> warning -> info -> debug)
+                    logger.warning("Log level set to %s", cycle_log_level())
+                
+                elif event.key == K_F10:
+                    self.memory_reporter.report(self.memory_stores(), f"(game time {self.game_time:.1f} s)")
+                        
                 elif event.key == K_SPACE and self.game_over:
                     self.reset()
                     
@@ -192,7 +274,7 @@ class Game:
                         elif i == 2:  # Main Menu
                             self.sound_manager.stop("engine")
                             self.running = False
-                            return {"action": "menu", "score": self.score}
+                            return self.get_result()
             
             # Handle game over button clicks
             if self.game_over:
@@ -203,30 +285,197 @@ class Game:
                         elif i == 1:  # Main Menu
                             self.sound_manager.stop("engine")
                             self.running = False
-                            return {"action": "menu", "score": self.score}
-        
-        # Skip other input processing if paused or game over
-        if self.paused or self.game_over:
-            return None
+                            return self.get_result()
         
-        # Continuous movement
+        return None
+    
+    def input_system(self, world, dt):
+        """Continuous movement of the player, applied once per simulation step"""
         keys = pygame.key.get_pressed()
+        player = world.pools["player"]
+        x = player.get("position")["x"]
+        steering = 0
         if keys[K_LEFT] or keys[K_a]:
-            self.player.x -= self.player.speed
+            x -= PLAYER_SPEED
+            steering -= 1
         if keys[K_RIGHT] or keys[K_d]:
-            self.player.x += self.player.speed
+            x += PLAYER_SPEED
+            steering += 1
+        if self.telemetry:
+            self.telemetry.input(steering)
         
         # Keep player within road boundaries
         road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
         road_right = road_left + ROAD_WIDTH
-        self.player.x = max(road_left + 5, min(road_right - self.player.width - 5, self.player.x))
-        
-        return None
+        np.clip(x, road_left + 5, road_right - player.get("body")["w"] - 5, out=x)
     
-    def update(self):
+    def traffic_system(self, world, dt):
+        """Set the enemy and orb speeds from the difficulty"""
+        enemies = world.pools["enemies"]
+        if enemies.count:
+            speed = self.difficulty.enemy_speed
+            variation = SPEED_VARIATION.get(self.difficulty.difficulty_level, 0.0)
+            velocity = enemies.get("velocity")
+            if variation:
+                # Each enemy gets its own random speed factor every step
+                velocity["vy"] = speed * (1.0 - variation + world.rng.random(enemies.count) * 2 * variation)
+            else:
+                velocity["vy"] = speed
+        world.pools["orbs"].get("velocity")["vy"] = self.difficulty.scroll_speed
+    
+    def collision_system(self, world, dt):
+        """Crash into enemies and lane closures, collect orbs"""
+        player = world.pools["player"]
+        box = entity_box(player, 0)
+        mask = SPRITES.mask(player.get("sprite")["id"][0])
+        
+        # Driving into a lane closure or an enemy ends the game
+        if any(collide_rect(box, mask, rect, self.pixel_collision) for rect in self.closures):
+            self.crash("closure")
+        elif len(find_collisions(world.pools["enemies"], box, mask, self.pixel_collision)):
+            self.crash("enemy")
+        elif self.telemetry:
+            self.telemetry.near_miss(count_passing(world.pools["enemies"], box, NEAR_MISS_DISTANCE))
+        
+        orbs = world.pools["orbs"]
+        collected = find_collisions(orbs, box, mask, self.pixel_collision)
+        if len(collected):
+            dead = np.zeros(orbs.count, dtype=bool)
+            dead[collected] = True
+            orbs.remove(dead)
+            
+            # Points vary by difficulty
+            self.score += ORB_POINTS.get(self.difficulty.difficulty_level, 1) * len(collected)
+            self.orbs_collected += len(collected)
+            self.sound_manager.play("pickup")
+    
+    def crash(self, cause="enemy"):
+        """End the game (cause: what the player crashed into)"""
+        self.game_over = True
+        self.sound_manager.stop("engine")
+        self.sound_manager.play("crash")
+        self.discard_autosave()
+        if self.telemetry:
+            self.telemetry.end_run(self, cause, self.player_lane())
+    
+    def player_lane(self):
+        """Lane the center of the player's car is in"""
+        x, _, width, _ = entity_box(self.world.pools["player"], 0)
+        lane = (x + width // 2 - (SCREEN_WIDTH - ROAD_WIDTH) // 2) // LANE_WIDTH
+        return min(max(lane, 0), LANE_COUNT - 1)
+    
+    def save_autosave(self):
+        """Save the game state; the file is written by the background writer"""
+        start = time.perf_counter()
+        data = save_game_state(self)
+        elapsed = time.perf_counter() - start
+        get_writer().schedule(AUTOSAVE_FILE, data)
+        self.autosave_count += 1
+        self.autosave_time += elapsed
+        self.autosave_max_time = max(self.autosave_max_time, elapsed)
+        self.autosave_size = len(data)
+    
+    def discard_autosave(self):
+        """Forget the autosave (the run is over)"""
+        if self.autosave:
+            get_writer().remove(AUTOSAVE_FILE)
+    
+    def resume_autosave(self):
+        """Resume the autosaved game, if there is one. The game starts paused."""
+        if not self.autosave:
+            return False
+        data = read_autosave()
+        if data is None:
+            return False
+        try:
+            load_game_state(self, data)
+        except ValueError as e:
+            # A damaged autosave would fail again on every start
+            logger.warning("Could not resume the autosaved game: %s", e)
+            self.discard_autosave()
+            return False
+        
+        self.next_autosave = self.game_time + AUTOSAVE_INTERVAL
+        if self.telemetry:
+            self.telemetry.seek(self.game_time)
+        self.paused = True
+        self.sound_manager.stop("engine")
+        logger.info("Resumed the autosaved game at %.1f s", self.game_time)
+        return True
+    
+    def rewind_step(self):
+        """Go back one simulation step, returns False if there is nothing left to rewind"""
+        # The latest state is the current one
+        data = self.rewind.pop(before=self.game_time)
+        if data is None:
+            return False
+        load_game_state(self, data)
+        if self.telemetry:
+            self.telemetry.seek(self.game_time)
+        if self.game_over:
+            # Rewinding past a crash continues the run
+            self.game_over = False
+            self.sound_manager.play("engine", -1)
+        return True
+    
+    def start_track(self):
+        """Start streaming a new track (a new seed every game)"""
+        self.track_seed = int(self.world.rng.integers(2 ** 32))
+        self.track_distance = 0.0
+        self.prev_track_distance = 0.0
+        self.restart_track()
+        self.spawn_track_content()
+    
+    def restart_track(self, first_chunk=0):
+        """Stream the track of the current seed from a chunk on"""
+        if getattr(self, 'track', None):
+            self.track.close()
+        self.track = TrackStreamer(self.track_seed, self.difficulty.difficulty_level,
+                                   self.render_target.scale, first_chunk)
+        self.closures = []
+    
+    def resume_track(self, first_chunk):
+        """Stream the track of a restored game (the content of the active chunks is already spawned)"""
+        if self.track.seed != self.track_seed:
+            # Another game's track: stream it from the first active chunk
+            self.restart_track(first_chunk)
+            self.track.advance(self.track_distance)
+        else:
+            self.track.seek(first_chunk, self.track_distance)
+        self.update_closures()
+    
+    def spawn_track_content(self):
+        """Activate the chunks coming up and add their enemies and orbs"""
+        for chunk in self.track.advance(self.track_distance):
+            top = SCREEN_HEIGHT - (chunk.track_end - self.track_distance)
+            for lane, offset in chunk.formation:
+                spawn_enemy(self.world, LANE_X[lane], top + offset)
+            for x, offset in chunk.orbs:
+                spawn_orb(self.world, x, top + offset)
+        self.update_closures()
+    
+    def update_closures(self):
+        """Screen rects of the lane closures on the active chunks"""
+        self.closures = []
+        for chunk, top in self.track.visible(self.track_distance):
+            self.closures.extend(chunk.closure_rects(top))
+    
+    def lane_closed(self, lane, y, height):
+        """True if a lane closure overlaps a lane between y and y + height"""
+        x = (SCREEN_WIDTH - ROAD_WIDTH) // 2 + lane * LANE_WIDTH
+        return any(rect.x == x and rect.top < y + height and rect.bottom > y for rect in self.closures)
+    
+    def update(self, dt=None):
+        """Advance the game by one simulation step of dt seconds"""
+        if dt is None:
+            dt = self.clock.get_time() / 1000.0  # Delta time in seconds
+        
+        if self.rewind is not None and not self.paused and pygame.key.get_pressed()[K_r]:
+            if self.rewind_step():
+                return
+        
         if self.game_over or self.paused:
             # Update buttons even when paused
-            dt = self.clock.get_time() / 1000.0
             
             if self.paused:
                 for button in self.pause_buttons:
@@ -238,220 +487,143 @@ class Game:
                     
             return
         
-        dt = self.clock.get_time() / 1000.0  # Delta time in seconds
         self.game_time += dt
         
-        # Update difficulty
+        # Update difficulty (speeds and spawn rates come from the difficulty curves)
         self.difficulty.update(dt)
 
-        # Direct speed control based on difficulty level
-        if self.difficulty.difficulty_level == "easy":
-            self.difficulty.enemy_speed = 1.5 + (self.game_time / 60.0) * 0.5  # Slow increase
-            self.difficulty.scroll_speed = 2.5 + (self.game_time / 60.0) * 0.5
-        elif self.difficulty.difficulty_level == "medium":
-            self.difficulty.enemy_speed = 3.0 + (self.game_time / 30.0) * 0.8  # Medium increase
-            self.difficulty.scroll_speed = 5.0 + (self.game_time / 30.0) * 0.8
-        elif self.difficulty.difficulty_level == "hard":
-            self.difficulty.enemy_speed = 7.0 + (self.game_time / 15.0) * 1.2  # Fast increase
-            self.difficulty.scroll_speed = 9.0 + (self.game_time / 15.0) * 1.2
-
-        # Cap speeds at maximum values
-        self.difficulty.enemy_speed = min(self.difficulty.enemy_speed, self.difficulty.max_enemy_speed)
-        self.difficulty.scroll_speed = min(self.difficulty.scroll_speed, self.difficulty.max_scroll_speed)
-        
-        # Update player
-        self.player.update(dt)
-        
-        # Update road segments
-        for segment in self.road_segments:
-            segment['y'] += self.difficulty.scroll_speed
-            if segment['y'] > SCREEN_HEIGHT:
-                segment['y'] -= len(self.road_segments) * segment['sprite'].get_height()
-        
-        # Update stripes
-        for stripe in self.stripes:
-            stripe['y'] += self.difficulty.scroll_speed
-            if stripe['y'] > SCREEN_HEIGHT:
-                stripe['y'] -= len(self.stripes) * (stripe['sprite'].get_height() + 40)
-        
-        # Update enemies
-        for enemy in self.enemies:
-            # Apply difficulty-based speed variations to make enemies more dynamic
-            difficulty_factor = 1.0
-            if hasattr(self.difficulty, 'difficulty_level'):
-                if self.difficulty.difficulty_level == "easy":
-                    # Enemies move at consistent speed in easy mode
-                    difficulty_factor = 1.0
-                elif self.difficulty.difficulty_level == "medium":
-                    # Some speed variation in medium mode
-                    difficulty_factor = 0.9 + random.random() * 0.2
-                elif self.difficulty.difficulty_level == "hard":
-                    # High speed variation in hard mode
-                    difficulty_factor = 0.8 + random.random() * 0.4
-            
-            # Update enemy position with difficulty-based speed
-            enemy.y += self.difficulty.enemy_speed * difficulty_factor
-            enemy.update(dt)
-            
-            # Check for collision with player
-            if enemy.rect.colliderect(self.player.rect):
-                self.game_over = True
-                self.sound_manager.stop("engine")
-                self.sound_manager.play("crash")
-        
-        # Remove enemies that are off screen
-        self.enemies = [e for e in self.enemies if e.y < SCREEN_HEIGHT + 100]
-        
-        # Update orbs
-        for orb in self.orbs:
-            orb.update(self.difficulty.scroll_speed)
-            
-            # Check for collision with player
-            if not orb.collected and orb.rect.colliderect(self.player.rect):
-                orb.collected = True
-                
-                # Points vary by difficulty
-                points = 1
-                if hasattr(self.difficulty, 'difficulty_level'):
-                    if self.difficulty.difficulty_level == "easy":
-                        points = 1
-                    elif self.difficulty.difficulty_level == "medium":
-                        points = 2
-                    elif self.difficulty.difficulty_level == "hard":
-                        points = 3
-                
-                self.score += points
-                self.sound_manager.play("pickup")
-        
-        # Remove orbs that are collected or off screen
-        self.orbs = [o for o in self.orbs if not o.collected and o.y < SCREEN_HEIGHT + 100]
-        
-        # Spawn new enemies with difficulty-based positioning
-        if random.random() < self.difficulty.enemy_spawn_rate * dt * 60:
-            # Lane selection varies by difficulty
-            lane = 0
-            if hasattr(self.difficulty, 'difficulty_level'):
-                if self.difficulty.difficulty_level == "easy":
-                    # More predictable lane placement in easy mode
-                    lane = random.randint(0, LANE_COUNT-1)
-                elif self.difficulty.difficulty_level == "medium":
-                    # Sometimes spawn enemies in adjacent lanes in medium mode
-                    if len(self.enemies) > 0 and random.random() < 0.3:
-                        last_enemy = self.enemies[-1]
-                        road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
-                        last_lane = int((last_enemy.x - road_left) / LANE_WIDTH)
-                        possible_lanes = [i for i in range(LANE_COUNT) if abs(i - last_lane) == 1]
-                        if possible_lanes:
-                            lane = random.choice(possible_lanes)
-                        else:
-                            lane = random.randint(0, LANE_COUNT-1)
-                    else:
-                        lane = random.randint(0, LANE_COUNT-1)
-                elif self.difficulty.difficulty_level == "hard":
-                    # Sometimes spawn enemies in the same lane in hard mode
-                    if len(self.enemies) > 0 and random.random() < 0.4:
-                        last_enemy = self.enemies[-1]
-                        road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
-                        last_lane = int((last_enemy.x - road_left) / LANE_WIDTH)
-                        lane = last_lane  # Same lane as last enemy
-                    else:
-                        lane = random.randint(0, LANE_COUNT-1)
+        # Engine pitch follows the scroll speed
+        self.sound_manager.update_engine(self.difficulty.scroll_speed, dt)
+        
+        # Scroll the track, activating the chunks that come up
+        self.prev_track_distance = self.track_distance
+        self.track_distance += self.difficulty.scroll_speed
+        self.spawn_track_content()
+        
+        # Move, animate and collide the entities
+        self.world.run("update", dt)
+        
+        # Spawn the enemies and orbs that the spawn scheduler has due
+        for event in self.spawner.due(self.game_time):
+            if event.kind == ENEMY:
+                # No traffic inside a lane closure
+                if self.lane_closed(event.lane, -100, 60):
+                    continue
+                spawn_enemy(self.world, event.x, -100)
             else:
-                lane = random.randint(0, LANE_COUNT-1)
-            
-            road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
-            x = road_left + lane * LANE_WIDTH + (LANE_WIDTH - 40) // 2
-            color = random.choice([NEON_GREEN, NEON_BLUE, NEON_PURPLE, NEON_YELLOW, NEON_ORANGE])
-            self.enemies.append(Car(x, -100, color))
-        
-        # Spawn new orbs
-        if random.random() < self.difficulty.orb_spawn_rate * dt * 60:
-            road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
-            x = road_left + random.randint(30, ROAD_WIDTH - 30)
-            self.orbs.append(Orb(x, -30))
+                spawn_orb(self.world, event.x, -30)
         
         # Update high score
         self.high_score = max(self.high_score, self.score)
         
-        # Increase score based on time - removed to make points only increment by collecting orbs
-    
-    def draw(self):
-        # Fill background
-        self.screen.fill(BLACK)
-        
-        # Draw starfield background
-        for i in range(100):
-            x = (i * 17) % SCREEN_WIDTH
-            y = (i * 23) % SCREEN_HEIGHT
-            size = random.randint(1, 3)
-            brightness = 100 + int(math.sin(self.game_time + i) * 50)
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(self.screen, color, (x, y), size)
-        
-        # Draw road
-        road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
+        if self.autosave and not self.game_over and self.game_time >= self.next_autosave:
+            self.save_autosave()
+            self.next_autosave += AUTOSAVE_INTERVAL
         
-        # Draw road segments
-        for segment in self.road_segments:
-            self.screen.blit(segment['sprite'], (road_left, segment['y']))
+        if self.rewind is not None and not self.game_over:
+            self.rewind.push(save_game_state(self), self.game_time)
         
-        # Draw stripes
-        for stripe in self.stripes:
-            # Left stripe
-            self.screen.blit(stripe['sprite'], (road_left - 15, stripe['y']))
-            # Right stripe
-            self.screen.blit(stripe['sprite'], (road_left + ROAD_WIDTH + 5, stripe['y']))
+        if self.telemetry:
+            self.telemetry.step(self)
         
-        # Draw orbs
-        for orb in self.orbs:
-            orb.draw(self.screen)
+        # Increase score based on time - removed to make points only increment by collecting orbs
+    
+    def draw(self, alpha=1.0):
+        """Draw the game, interpolating alpha (0..1) of the way from the previous simulation step"""
+        self.render_frame(self.capture_snapshot(alpha))
+    
+    def capture_snapshot(self, alpha=1.0, detach=False):
+        """
+        Collect what the renderer needs for one frame.
+        With detach the entity pools are copied, so the snapshot stays valid
+        while the simulation moves on (pipelined rendering).
+        """
+        distance = self.prev_track_distance + (self.track_distance - self.prev_track_distance) * alpha
+        entities = self.world.snapshot() if detach else self.world.pools
         
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
+        # Get difficulty level name if available
+        difficulty_name = "MEDIUM"
+        if hasattr(self.difficulty, 'difficulty_settings') and self.difficulty.difficulty_settings:
+            difficulty_name = self.difficulty.difficulty_settings.get_difficulty_name()
         
-        # Draw player
-        self.player.draw(self.screen)
+        return FrameSnapshot(
+            alpha=alpha,
+            game_time=self.game_time,
+            entities=entities,
+            road=tuple((chunk.scaled_surface, top) for chunk, top in self.track.visible(distance)),
+            score=self.score,
+            high_score=self.high_score,
+            speed_percent=self.difficulty.get_difficulty_percentage(),
+            difficulty_name=difficulty_name,
+            frame_time=self.clock.get_time() / 1000.0,
+            game_over=self.game_over,
+            paused=self.paused,
+            captured_at=time.perf_counter()
+        )
+    
+    def render_frame(self, snapshot):
+        """
+        Draw and present a frame snapshot (on the render thread when pipelined).
+        Besides the snapshot, drawing updates the HUD, adds to the resized
+        sprite and headlight glow caches and times the render systems; the
+        main thread only reads the sprite cache, through its lock.
+        """
+        # World layer at the internal render resolution
+        self.draw_world(self.render_target.surface, snapshot, self.render_target.scale)
+        self.render_target.present()
         
         # Draw HUD
-        self.draw_hud()
+        self.draw_hud(snapshot)
         
         # Draw game over screen
-        if self.game_over:
-            self.draw_game_over()
+        if snapshot.game_over:
+            self.draw_game_over(snapshot)
         
         # Draw pause screen
-        if self.paused:
+        if snapshot.paused:
             self.draw_pause()
         
         pygame.display.flip()
     
-    def draw_hud(self):
-        # Get difficulty level name if available
-        difficulty_name = "MEDIUM"
-        if hasattr(self.difficulty, 'difficulty_settings') and self.difficulty.difficulty_settings:
-            difficulty_name = self.difficulty.difficulty_settings.get_difficulty_name()
+    def draw_world(self, surface, snapshot, scale):
+        """Draw the starfield, road and cars, with game coordinates multiplied by scale"""
+        alpha = snapshot.alpha
+        
+        # Fill background
+        surface.fill(BLACK)
+        
+        # Draw starfield background
+        for i in range(100):
+            x = (i * 17) % SCREEN_WIDTH
+            y = (i * 23) % SCREEN_HEIGHT
+            size = random.randint(1, 3)
+            brightness = 100 + int(math.sin(snapshot.game_time + i) * 50)
+            color = (brightness, brightness, brightness)
+            pygame.draw.circle(surface, color, (int(x * scale), int(y * scale)), max(1, int(size * scale)))
+        
+        # Draw the road chunks (prerendered at the render scale)
+        for sprite, y in snapshot.road:
+            surface.blit(sprite, (CHUNK_X * scale, y * scale))
+        
+        # Draw the orbs, enemies, exhaust and player
+        self.world.run("render", surface, snapshot.entities, alpha, scale)
+    
+    def draw_hud(self, snapshot):
+        difficulty_name = snapshot.difficulty_name
         
         # Use the game HUD class if available
-        try:
-            from game_hud import GameHUD
-            
-            # Create HUD if not already created
-            if not hasattr(self, 'hud'):
-                self.hud = GameHUD(self.screen, get_font)
-            
+        if self.hud is not None:
             # Update and draw HUD
-            speed_percent = self.difficulty.get_difficulty_percentage()
             self.hud.update(
-                self.clock.get_time() / 1000.0,
-                self.score,
-                self.high_score,
-                speed_percent,
+                snapshot.frame_time,
+                snapshot.score,
+                snapshot.high_score,
+                snapshot.speed_percent,
                 difficulty_name
             )
             self.hud.draw()
             
-        except ImportError:
+        else:
             # Fallback to original HUD if GameHUD is not available
             # Create a semi-transparent HUD background
             hud_surface = pygame.Surface((SCREEN_WIDTH, 60), pygame.SRCALPHA)
@@ -460,18 +632,17 @@ class Game:
             
             # Draw score
             font = get_font(24)
-            score_text = f"SCORE: {self.score}"
+            score_text = f"SCORE: {snapshot.score}"
             score_surface = font.render(score_text, True, NEON_PINK)
             self.screen.blit(score_surface, (20, 15))
             
             # Draw high score
-            high_score_text = f"HIGH SCORE: {self.high_score}"
+            high_score_text = f"HIGH SCORE: {snapshot.high_score}"
             high_score_surface = font.render(high_score_text, True, NEON_CYAN)
             self.screen.blit(high_score_surface, (SCREEN_WIDTH - 20 - high_score_surface.get_width(), 15))
             
             # Draw speed indicator
-            speed_percent = self.difficulty.get_difficulty_percentage()
-            speed_text = f"SPEED: {speed_percent}%"
+            speed_text = f"SPEED: {snapshot.speed_percent}%"
             speed_surface = font.render(speed_text, True, NEON_GREEN)
             
             # Draw difficulty level
@@ -483,7 +654,7 @@ class Game:
             self.screen.blit(speed_surface, (center_width - speed_surface.get_width() - 10, 15))
             self.screen.blit(difficulty_surface, (center_width + 10, 15))
     
-    def draw_game_over(self):
+    def draw_game_over(self, snapshot):
         # Create overlay
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 150))
@@ -507,7 +678,7 @@ class Game:
         
         # Draw final score
         font_medium = get_font(36)
-        final_score_text = f"FINAL SCORE: {self.score}"
+        final_score_text = f"FINAL SCORE: {snapshot.score}"
         final_score_surface = font_medium.render(final_score_text, True, NEON_GREEN)
         self.screen.blit(final_score_surface, 
                    (SCREEN_WIDTH // 2 - final_score_surface.get_width() // 2, 
@@ -544,36 +715,115 @@ class Game:
             button.draw(self.screen)
     
     def reset(self):
+        if self.telemetry:
+            if not self.game_over:
+                self.telemetry.end_run(self, "restart", self.player_lane())
+            self.telemetry.start_run()
         self.game_over = False
         self.paused = False
         self.score = 0
-        self.player = Car(SCREEN_WIDTH // 2 - 20, SCREEN_HEIGHT - 100, NEON_PINK, True)
-        self.enemies = []
-        self.orbs = []
+        self.orbs_collected = 0
         self.game_time = 0
+        self.next_autosave = AUTOSAVE_INTERVAL
+        if self.rewind is not None:
+            self.rewind.clear()
+        self.world.clear()
+        spawn_player(self.world, SCREEN_WIDTH // 2 - 20, SCREEN_HEIGHT - 100)
         self.difficulty.reset()
+        self.spawner.reset()
+        self.start_track()
         
         # Restart engine sound
         self.sound_manager.play("engine", -1)
     
+    def memory_stores(self):
+        """Items and bytes held by the game's data stores, for memory reports"""
+        stores = {}
+        for name, pool in self.world.pools.items():
+            arrays = list(pool.arrays.values()) + list(pool.spare.values())
+            stores["pool " + name] = (pool.count, sum(array.nbytes for array in arrays))
+        stores["sprites"] = (len(SPRITES.sprites), sum(map(surface_bytes, SPRITES.sprites)))
+        resized = SPRITES.resized_sprites()
+        stores["resized sprites"] = (len(resized), sum(map(surface_bytes, resized)))
+        stores["track chunks"] = (len(self.track.active),
+                                  sum(surface_bytes(surface) for chunk in self.track.active
+                                      for surface in (chunk.surface, chunk.scaled_surface) if surface))
+        if self.rewind is not None:
+            stores["rewind buffer"] = (len(self.rewind), self.rewind.used_bytes)
+        if self.telemetry:
+            stores["telemetry queue"] = (self.telemetry_writer.queue.qsize(), 0)
+        return stores
+    
+    def get_result(self):
+        """Result returned to the game manager when leaving the game"""
+        return {
+            "action": "menu",
+            "score": self.score,
+            "difficulty": self.difficulty.difficulty_level,
+            "duration": self.game_time,
+            "orbs": self.orbs_collected
+        }
+    
     def run(self):
-        # Main game loop
-        while self.running:
-            result = self.handle_events()
-            if result:
-                return result
+        # Main game loop: fixed-rate simulation steps, then an interpolated frame
+        self.pacer.reset()
+        pipeline = RenderPipeline(self.render_frame) if self.pipelined else None
+        gc_thresholds = tune_gc() if self.gc_tuning else None
+        allocations = AllocationMonitor()
+        allocations.start()
+        try:
+            while self.running:
+                result = self.handle_events()
+                if result:
+                    return result
                 
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+                for dt in self.pacer.steps():
+                    self.update(dt)
+                if pipeline:
+                    # The render thread draws this frame while the next one is simulated
+                    pipeline.submit(self.capture_snapshot(self.pacer.alpha, detach=True))
+                else:
+                    self.draw(self.pacer.alpha)
+                frame_time = self.pacer.tick()
+                if self.telemetry and not (self.paused or self.game_over):
+                    self.telemetry.frame(frame_time)
+                allocations.frame()
+                self.memory_reporter.poll(self.memory_stores)
+        finally:
+            allocations.stop()
+            if gc_thresholds:
+                restore_gc(gc_thresholds)
+            if pipeline:
+                pipeline.close()
+                logger.info("Render pipeline: %s", pipeline.get_stats())
+            logger.info("Frame pacing: %s", self.pacer.get_stats())
+            logger.info("Track streaming: %s", self.track.get_stats())
+            logger.info("Allocations: %s", allocations.get_stats())
+            logger.info("Systems: %s", self.world.get_stats())
+            if self.autosave_count:
+                logger.info("Autosaves: %d, %d bytes, average %.3f ms, max %.3f ms to pack",
+                            self.autosave_count, self.autosave_size,
+                            self.autosave_time / self.autosave_count * 1000, self.autosave_max_time * 1000)
+            if self.rewind is not None:
+                logger.info("Rewind buffer: %s", self.rewind.get_stats())
+            if self.telemetry:
+                if not self.game_over:
+                    self.telemetry.end_run(self, "quit" if sys.exc_info()[0] is None else "error",
+                                           self.player_lane())
+                self.telemetry_writer.close()
+                logger.info("Telemetry: %s", self.telemetry_writer.get_stats())
+            if sys.exc_info()[0] is None:
+                # Leaving normally ends the run; after an error it can still be resumed
+                self.discard_autosave()
+            self.track.close()
         
         # Return to menu by default
-        return {"action": "menu", "score": self.score}
+        return self.get_result()
 
 # Start the game if run directly
 if __name__ == "__main__":
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = create_display((SCREEN_WIDTH, SCREEN_HEIGHT), get_config_store().get("game_settings")["fullscreen"])
     pygame.display.set_caption(TITLE)
     clock = pygame.time.Clock()
     
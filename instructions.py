@@ -5,6 +5,8 @@ import random
 import os
 from pygame.locals import *
 from button import Button
+from ui_cache import crop_to_content
+from screen_registry import FirstFrameHook
 
 # Constants
 SCREEN_WIDTH = 800
@@ -22,7 +24,7 @@ NEON_YELLOW = (255, 255, 0)
 NEON_ORANGE = (255, 165, 0)
 NEON_CYAN = (0, 255, 255)
 
-class Instructions:
+class Instructions(FirstFrameHook):
     """Instructions screen showing how to play the game"""
     
     def __init__(self, screen, clock, sound_manager):
@@ -69,7 +71,8 @@ class Instructions:
                 "title": "CONTROLS",
                 "content": [
                     "LEFT/A: Move left | RIGHT/D: Move right",
-                    "P or ESC: Pause | SPACE: Restart"
+                    "P or ESC: Pause | SPACE: Restart",
+                    "Hold R: Rewind"
                 ]
             },
             {
@@ -88,6 +91,60 @@ class Instructions:
             }
         ]
     
+        # Static page content, rendered once by build_static_content()
+        self.title_surfaces = None
+        self.content_surface = None  # (surface, position)
+        self.build_static_content()
+    
+    def on_enter(self):
+        """Reset per-visit state when the screen is shown again"""
+        self.running = True
+        self.selected_button = 0
+    
+    def build_static_content(self):
+        """Render the title and the instruction text into cached surfaces"""
+        # Title and its glow layers (only their positions are animated)
+        title_text = "HOW TO PLAY"
+        self.title_surfaces = [
+            self.title_font.render(title_text, True, (*NEON_YELLOW[:3], 25 * i))
+            for i in range(6, 0, -2)
+        ]
+        self.title_surfaces.append(self.title_font.render(title_text, True, NEON_YELLOW))
+        
+        # Everything between the title and the back button
+        content = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        content.fill(BLACK)
+        
+        # Instructions sections
+        y_offset = 100
+        for section in self.instructions:
+            # Section title
+            section_surface = self.subtitle_font.render(section["title"], True, NEON_CYAN)
+            section_rect = section_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
+            content.blit(section_surface, section_rect)
+            
+            # Section content
+            y_offset += 40
+            for line in section["content"]:
+                line_surface = self.text_font.render(line, True, WHITE)
+                line_rect = line_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
+                content.blit(line_surface, line_rect)
+                y_offset += 25
+            
+            y_offset += 10
+        
+        # Keyboard navigation instructions
+        nav_text = "Press ESC or ENTER to Return to Menu"
+        nav_surface = self.small_font.render(nav_text, True, (200, 200, 200))
+        nav_rect = nav_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150))
+        content.blit(nav_surface, nav_rect)
+        
+        self.content_surface = crop_to_content(content)
+    
+    def on_exit(self):
+        """Called when the screen is left"""
+        pass
+    
     def get_font(self, size):
         """Get a font of specified size"""
         font_dir = os.path.join(os.path.dirname(__file__), "assets", "fonts")
@@ -148,14 +205,10 @@ class Instructions:
                              (int(star['x']), int(star['y'])), 
                              int(star['size']))
         
-        # Draw title
-        title_text = "HOW TO PLAY"
-        title_surface = self.title_font.render(title_text, True, NEON_YELLOW)
+        # Draw title with glow effect (surfaces are prerendered)
+        title_surface = self.title_surfaces[-1]
         title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 40))
-        
-        # Add glow effect to title
-        for i in range(6, 0, -2):
-            glow_surface = self.title_font.render(title_text, True, (*NEON_YELLOW[:3], 25 * i))
+        for i, glow_surface in zip(range(6, 0, -2), self.title_surfaces):
             glow_rect = glow_surface.get_rect(center=(
                 title_rect.centerx + random.randint(-i, i),
                 title_rect.centery + random.randint(-i, i)
@@ -165,35 +218,13 @@ class Instructions:
         # Draw main title
         self.screen.blit(title_surface, title_rect)
         
-        # Draw instructions sections
-        y_offset = 100
-        for section in self.instructions:
-            # Draw section title
-            section_title = section["title"]
-            section_surface = self.subtitle_font.render(section_title, True, NEON_CYAN)
-            section_rect = section_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
-            self.screen.blit(section_surface, section_rect)
-            
-            # Draw section content
-            y_offset += 40
-            for line in section["content"]:
-                line_surface = self.text_font.render(line, True, WHITE)
-                line_rect = line_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
-                self.screen.blit(line_surface, line_rect)
-                y_offset += 25
-            
-            y_offset += 10
+        # Draw the instructions sections and navigation text
+        self.screen.blit(*self.content_surface)
         
         # Draw car controls diagram
         # Controls diagram removed to prevent overlap
         # self.draw_controls_diagram(SCREEN_WIDTH // 2 - 150, y_offset)
         
-        # Draw keyboard navigation instructions
-        nav_text = "Press ESC or ENTER to Return to Menu"
-        nav_surface = self.small_font.render(nav_text, True, (200, 200, 200))
-        nav_rect = nav_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 150))
-        self.screen.blit(nav_surface, nav_rect)
-        
                 # Draw back button
         self.back_button.draw(self.screen)
         
@@ -209,6 +240,8 @@ class Instructions:
                 
             self.update()
             self.draw()
+            self.first_frame_drawn()
+            
             self.clock.tick(FPS)
         
         return "menu"  # Default return to menu
\ No newline at end of file
@@ -5,6 +5,7 @@ import random
 import os
 from pygame.locals import *
 from button import Button
+from screen_registry import FirstFrameHook
 
 # Constants
 SCREEN_WIDTH = 800
@@ -23,8 +24,8 @@ NEON_YELLOW = (255, 255, 0)
 NEON_ORANGE = (255, 165, 0)
 NEON_CYAN = (0, 255, 255)
 
-class MainMenu:
-    def __init__(self, screen, clock, sound_manager):
+class MainMenu(FirstFrameHook):
+    def __init__(self, screen, clock, sound_manager, on_first_frame=None):
         # Current selected button for keyboard navigation
         self.selected_button = 0
         self.screen = screen
@@ -32,6 +33,8 @@ class MainMenu:
         self.sound_manager = sound_manager
         self.running = True
         self.selected_option = None
+        # Called once after the first frame of each visit has been drawn
+        self.on_first_frame = on_first_frame
         self.animation_time = 0
         self.stars = []
         
@@ -81,12 +84,21 @@ class MainMenu:
                   border_color=NEON_PINK, sound_manager=self.sound_manager)
         ]
         
+    def on_enter(self):
+        """Reset per-visit state when the menu is shown again"""
+        self.running = True
+        self.selected_option = None
+        
         # Make sure engine sound is stopped
         self.sound_manager.stop("engine")
         
-        # Start menu music
+        # Start menu music (keeps playing if it already is)
         self.sound_manager.play_music("menu_music.mp3")
     
+    def on_exit(self):
+        """Called when the menu is left"""
+        pass
+    
     def get_font(self, size):
         """Get a font of specified size"""
         font_dir = os.path.join(os.path.dirname(__file__), "assets", "fonts")
@@ -240,6 +252,8 @@ class MainMenu:
             self.handle_events()
             self.update()
             self.draw()
+            self.first_frame_drawn()
+            
             self.clock.tick(FPS)
         
         # Return the selected option
@@ -0,0 +1,230 @@
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from game_logging import get_logger
+
+logger = get_logger("memory")
+
+# Collector thresholds while a game runs (generation 0 allocations, then
+# generation 0 and 1 collections before the next older collection). Fewer
+# young collections, and full collections only after a long run of them.
+GAME_GC_THRESHOLDS = (5000, 20, 100)
+
+# Memory reports are appended to this file
+MEMORY_REPORT_FILE = os.path.join(os.path.dirname(__file__), "memory_report.txt")
+
+# Object types and source lines listed per report
+REPORT_TYPES = 20
+REPORT_LINES = 15
+
+def tune_gc():
+    """
+    Tune the garbage collector for the game loop, after loading.
+    Collects once, then freezes every surviving object (sprites, fonts,
+    screens, modules) into the permanent generation so later collections
+    never scan them, and raises the thresholds. Returns the previous
+    thresholds for restore_gc().
+    """
+    previous = gc.get_threshold()
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(*GAME_GC_THRESHOLDS)
+    logger.debug("Froze %d objects, GC thresholds %s", gc.get_freeze_count(), GAME_GC_THRESHOLDS)
+    return previous
+
+def restore_gc(thresholds):
+    """Undo tune_gc()"""
+    gc.unfreeze()
+    gc.set_threshold(*thresholds)
+
+class AllocationMonitor:
+    """
+    Per-frame memory and collector statistics.
+    - blocks: change in allocated memory blocks over a frame (net, so steady
+      churn shows as ~0 and a leak as a positive mean)
+    - collections: collector runs per generation, with their pause times
+    With QAUTO_TRACE_ALLOC set, tracemalloc also measures the bytes
+    allocated above the frame's starting point (the transient churn),
+    at a large cost in speed.
+    """
+    def __init__(self):
+        self.trace = bool(os.environ.get("QAUTO_TRACE_ALLOC"))
+        self.frames = 0
+        self.last_blocks = None
+        self.total_blocks = 0
+        self.max_blocks = 0
+        self.collections = [0, 0, 0]
+        self.gc_time = 0.0
+        self.max_gc_pause = 0.0
+        self.gc_start = 0.0
+        self.last_traced = 0
+        self.total_peak = 0
+        self.max_peak = 0
+        self.started_tracing = False
+
+    def start(self):
+        """Start monitoring"""
+        gc.callbacks.append(self.on_gc)
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.last_blocks = sys.getallocatedblocks()
+
+    def stop(self):
+        """Stop monitoring (tracemalloc keeps running if the memory reports use it)"""
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def on_gc(self, phase, info):
+        """gc callback: time each collection"""
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.gc_start
+        self.collections[info["generation"]] += 1
+        self.gc_time += pause
+        self.max_gc_pause = max(self.max_gc_pause, pause)
+
+    def frame(self):
+        """Record the end of a frame"""
+        blocks = sys.getallocatedblocks()
+        delta = blocks - self.last_blocks
+        self.last_blocks = blocks
+        self.frames += 1
+        self.total_blocks += delta
+        self.max_blocks = max(self.max_blocks, delta)
+
+        if self.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            transient = peak - self.last_traced
+            self.last_traced = current
+            self.total_peak += transient
+            self.max_peak = max(self.max_peak, transient)
+            tracemalloc.reset_peak()
+
+    def get_stats(self):
+        """Get allocation and collector statistics"""
+        frames = max(1, self.frames)
+        stats = {
+            "frames": self.frames,
+            "average_blocks_per_frame": round(self.total_blocks / frames, 1),
+            "max_blocks_per_frame": self.max_blocks,
+            "collections": tuple(self.collections),
+            "gc_ms": round(self.gc_time * 1000, 1),
+            "max_gc_pause_ms": round(self.max_gc_pause * 1000, 2)
+        }
+        if self.trace:
+            stats["average_transient_bytes"] = round(self.total_peak / frames)
+            stats["max_transient_bytes"] = self.max_peak
+        return stats
+
+class MemoryReporter:
+    """
+    Memory accounting reports for long runs, taken on demand (F10 in game)
+    or every QAUTO_MEMORY_REPORT seconds. Each report lists the memory held
+    by the game's stores (entity pools, rewind buffer, sprites, track), the
+    live objects per type (those tracked by the collector and not frozen),
+    the frozen objects and the allocated blocks, with the change since the
+    previous report, so growth over hours stands out while a flat run
+    shows ~0 changes. There is one reporter per process (see
+    get_memory_reporter()), so reports compare across games too.
+    The first report starts tracemalloc, which then runs until exit and
+    slows the game down; later reports also list the source lines whose
+    allocations grew the most. Reports are appended to MEMORY_REPORT_FILE.
+    """
+    def __init__(self, path=MEMORY_REPORT_FILE):
+        self.path = path
+        self.interval = 0.0
+        interval = os.environ.get("QAUTO_MEMORY_REPORT")
+        if interval:
+            try:
+                self.interval = max(0.0, float(interval))
+            except ValueError:
+                logger.warning("Ignoring QAUTO_MEMORY_REPORT=%r, it is not a number of seconds", interval)
+        self.next_report = time.monotonic() + self.interval
+        self.reports = 0
+        self.snapshot = None
+        self.types = Counter()
+        self.stores = {}
+        self.blocks = 0
+        self.frozen = 0
+
+    def poll(self, stores):
+        """Report if the interval is due; stores is called for the store sizes"""
+        if self.interval and time.monotonic() >= self.next_report:
+            # Counted from now, so time spent outside the game does not queue up reports
+            self.next_report = time.monotonic() + self.interval
+            self.report(stores())
+
+    def report(self, stores, title=""):
+        """
+        Write a report. stores: {name: (items, bytes)} for the game's
+        data stores.
+        """
+        if not tracemalloc.is_tracing():
+            # Snapshots from an earlier tracing run do not compare
+            tracemalloc.start()
+            self.snapshot = None
+        gc.collect()
+        self.reports += 1
+        lines = [f"=== Memory report {self.reports}, {time.strftime('%Y-%m-%d %H:%M:%S')} {title}".rstrip()]
+
+        blocks = sys.getallocatedblocks()
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"Allocated blocks: {blocks} ({blocks - self.blocks:+d}), "
+                     f"traced: {current // 1024} KB (peak {peak // 1024} KB)")
+        self.blocks = blocks
+        frozen = gc.get_freeze_count()
+        lines.append(f"Frozen objects: {frozen} ({frozen - self.frozen:+d})")
+        self.frozen = frozen
+
+        lines.append("Stores:")
+        for name, (items, size) in stores.items():
+            previous = self.stores.get(name, (0, 0))[1]
+            lines.append(f"  {name:<24} {items:>8} items {size // 1024:>8} KB ({(size - previous) // 1024:+d} KB)")
+        self.stores = stores
+
+        types = Counter(type(obj).__name__ for obj in gc.get_objects())
+        lines.append("Objects by type:")
+        for name, count in types.most_common(REPORT_TYPES):
+            lines.append(f"  {name:<24} {count:>8} ({count - self.types.get(name, 0):+d})")
+        self.types = types
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+        if self.snapshot is not None:
+            lines.append("Allocation growth by line since the last report:")
+            for stat in snapshot.compare_to(self.snapshot, "lineno")[:REPORT_LINES]:
+                lines.append(f"  {stat.size_diff / 1024:+9.1f} KB {stat.count_diff:+7d} blocks  {stat.traceback}")
+        self.snapshot = snapshot
+
+        try:
+            with open(self.path, "a") as f:
+                f.write("\n".join(lines) + "\n\n")
+        except (IOError, OSError) as e:
+            logger.warning("Could not write the memory report: %s", e)
+            return
+        logger.warning("Memory report %d written to %s", self.reports, self.path)
+
+# Shared reporter instance
+_reporter = None
+_reporter_lock = threading.Lock()
+
+def get_memory_reporter():
+    """Get the process-wide memory reporter"""
+    global _reporter
+    if _reporter is None:
+        with _reporter_lock:
+            if _reporter is None:
+                _reporter = MemoryReporter()
+    return _reporter
@@ -0,0 +1,157 @@
+import atexit
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from game_logging import get_logger
+
+logger = get_logger("persistence")
+
+# Seconds without new changes before pending writes are flushed
+QUIET_PERIOD = 0.5
+
+# Process umask, read once at import (reading it means setting it, which is not thread-safe)
+_umask = os.umask(0)
+os.umask(_umask)
+
+def atomic_write_json(path, data):
+    """
+    Write JSON data to a file atomically.
+    The data goes to a temporary file in the same directory, which then
+    replaces the target, so a crash never leaves a truncated file.
+    """
+    _atomic_write(path, "w", lambda f: json.dump(data, f))
+
+def atomic_write_bytes(path, data):
+    """Write binary data to a file atomically"""
+    _atomic_write(path, "wb", lambda f: f.write(data))
+
+def _atomic_write(path, mode, write):
+    """Write a file through a temporary file that then replaces it"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private, keep the permissions of the file it replaces
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            file_mode = 0o666 & ~_umask
+        os.chmod(temp_path, file_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+class WriteBehindWriter:
+    """
+    Coalesces file writes and flushes them from a background thread.
+    Data is written as JSON, or as is for bytes. Scheduling a write for a
+    path replaces any pending data for it, and pending writes are flushed
+    once no change arrived for the quiet period, or right away on flush()
+    and at interpreter exit.
+    """
+    def __init__(self, quiet_period=QUIET_PERIOD):
+        self.quiet_period = quiet_period
+        self.pending = {}
+        self.deadline = 0
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.thread = None
+        self.closed = False
+
+        # Statistics
+        self.scheduled_count = 0
+        self.write_count = 0
+
+        atexit.register(self.close)
+
+    def schedule(self, path, data):
+        """Schedule data to be written to path (data must not be modified afterwards)"""
+        with self.condition:
+            self.pending[path] = data
+            self.deadline = time.monotonic() + self.quiet_period
+            self.scheduled_count += 1
+            closed = self.closed
+
+            if not closed:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name="WriteBehindWriter", daemon=True)
+                    self.thread.start()
+                self.condition.notify()
+
+        if closed:
+            # Late writes after shutdown go straight to disk
+            self.flush()
+
+    def remove(self, path):
+        """Schedule a file to be deleted (replaces a pending write)"""
+        self.schedule(path, None)
+
+    def run(self):
+        """Background thread: flush pending writes after the quiet period"""
+        while True:
+            with self.condition:
+                while not self.closed:
+                    if not self.pending:
+                        self.condition.wait()
+                        continue
+                    remaining = self.deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                if self.closed:
+                    return
+
+            self.flush()
+
+    def flush(self):
+        """Write all pending changes now"""
+        # Holding the write lock while taking the batch keeps writes in order
+        with self.write_lock:
+            with self.condition:
+                pending = self.pending
+                self.pending = {}
+
+            for path, data in pending.items():
+                try:
+                    if data is None:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    elif isinstance(data, (bytes, bytearray)):
+                        atomic_write_bytes(path, data)
+                    else:
+                        atomic_write_json(path, data)
+                    self.write_count += 1
+                except (IOError, OSError, TypeError, ValueError) as e:
+                    logger.warning("Could not save %s: %s", path, e)
+
+    def close(self):
+        """Flush pending changes and stop the background thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.flush()
+
+# Shared writer instance
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    """Get the process-wide write-behind writer"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteBehindWriter()
+    return _writer
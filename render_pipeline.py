@@ -0,0 +1,89 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from game_logging import get_logger
+
+logger = get_logger("render_pipeline")
+
+# Everything the renderer needs to draw one frame. In pipelined mode the
+# entities are detached copies, so the simulation can move on while the
+# frame is drawn.
+FrameSnapshot = namedtuple("FrameSnapshot", [
+    "alpha",            # Interpolation position between the last two simulation steps
+    "game_time",
+    "entities",         # {name: EntityPool}, in draw order
+    "road",             # tuple of (track chunk surface at the render scale, y)
+    "score",
+    "high_score",
+    "speed_percent",
+    "difficulty_name",
+    "frame_time",       # Seconds since the previous frame (HUD animation)
+    "game_over",
+    "paused",
+    "captured_at"       # perf_counter() when the snapshot was taken
+])
+
+class RenderPipeline:
+    """
+    Draws and presents frame snapshots on a render thread.
+    The queue holds one pending snapshot while another is being drawn
+    (a double buffer), so the main thread can simulate frame N+1 while
+    frame N is blitted and flipped; pygame releases the GIL in those
+    calls. submit() blocks when the renderer is a full frame behind, which
+    bounds the added latency to one frame.
+    """
+    def __init__(self, render_function):
+        self.render_function = render_function
+        self.snapshots = queue.Queue(maxsize=1)
+        self.error = None
+
+        # Statistics
+        self.frames = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.submit_wait = 0.0
+
+        self.thread = threading.Thread(target=self.run, name="RenderPipeline", daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        """Hand a snapshot to the render thread (waits if one is already pending)"""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        wait_start = time.perf_counter()
+        self.snapshots.put(snapshot)
+        self.submit_wait += time.perf_counter() - wait_start
+
+    def run(self):
+        """Render thread: draw snapshots until None is received"""
+        while True:
+            snapshot = self.snapshots.get()
+            if snapshot is None:
+                return
+            try:
+                self.render_function(snapshot)
+            except Exception as e:
+                logger.error("Render thread failed: %s", e)
+                self.error = e
+                continue
+            latency = time.perf_counter() - snapshot.captured_at
+            self.frames += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def close(self):
+        """Finish the pending frame and stop the render thread"""
+        self.snapshots.put(None)
+        self.thread.join()
+
+    def get_stats(self):
+        """Get latency and throughput statistics"""
+        return {
+            "frames": self.frames,
+            "average_latency_ms": round(self.total_latency / max(1, self.frames) * 1000, 2),
+            "max_latency_ms": round(self.max_latency * 1000, 2),
+            "submit_wait_ms": round(self.submit_wait * 1000, 1)
+        }
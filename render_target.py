@@ -0,0 +1,54 @@
+import pygame
+
+from game_logging import get_logger
+
+logger = get_logger("render_target")
+
+# Accepted internal render scales (fraction of the 800x600 game resolution).
+# Only integer upscale factors, so every world pixel becomes a crisp block.
+RENDER_SCALES = (1.0, 0.5, 0.25)
+
+class RenderTarget:
+    """
+    Internal render target for the game world.
+    At a scale below 1.0 the world is drawn onto a smaller canvas, in
+    game coordinates multiplied by the scale, and stretched onto the
+    display in a single nearest-neighbour pass (pixel-art friendly).
+    At 1.0 the world is drawn straight onto the display.
+    The HUD and overlays are drawn on the display afterwards, at full
+    resolution.
+    """
+    def __init__(self, screen, scale=1.0):
+        self.screen = screen
+        self.scale = min(RENDER_SCALES, key=lambda s: abs(s - scale))
+        self.canvas = None
+
+        if self.scale < 1.0:
+            width, height = screen.get_size()
+            self.canvas = pygame.Surface((int(width * self.scale), int(height * self.scale)))
+            self.canvas = self.canvas.convert(screen)
+            logger.debug("World render target %dx%d", *self.canvas.get_size())
+
+    @property
+    def surface(self):
+        """Surface the world is drawn onto"""
+        return self.canvas if self.canvas is not None else self.screen
+
+    def present(self):
+        """Stretch the world canvas onto the display"""
+        if self.canvas is not None:
+            pygame.transform.scale(self.canvas, self.screen.get_size(), self.screen)
+
+def create_display(size, fullscreen=False):
+    """
+    Open the display at the game resolution.
+    In fullscreen, SCALED mode lets SDL stretch the 800x600 frame to the
+    panel (nearest-neighbour, letterboxed), so the scene is never drawn at
+    the panel's native resolution.
+    """
+    if fullscreen:
+        try:
+            return pygame.display.set_mode(size, pygame.SCALED | pygame.FULLSCREEN)
+        except pygame.error as e:
+            logger.warning("Could not open scaled fullscreen display: %s", e)
+    return pygame.display.set_mode(size)
@@ -0,0 +1,173 @@
+import time
+import zlib
+from collections import deque, namedtuple
+
+import numpy as np
+
+from game_logging import get_logger
+
+logger = get_logger("rewind")
+
+# A record every this many captures is a keyframe, the others are deltas against it
+KEYFRAME_INTERVAL = 30
+
+# zlib level for the records (1 = fastest)
+COMPRESSION_LEVEL = 1
+
+# A stored state: where it is in the buffer, whether it is a keyframe,
+# its uncompressed size and the game time it was captured at
+Record = namedtuple("Record", ["start", "size", "keyframe", "raw_size", "game_time"])
+
+class RewindBuffer:
+    """
+    Ring buffer of recent game states for rewinding.
+    States are byte strings (game_state snapshots). Every
+    KEYFRAME_INTERVAL-th state is stored whole as a keyframe, the rest as
+    the XOR against the last keyframe, which is mostly zeros and compresses
+    well. All records are zlib-compressed into one preallocated bytearray;
+    the oldest records are overwritten once it is full or older than
+    max_seconds, so memory never exceeds capacity_bytes.
+    """
+    __slots__ = ("capacity", "max_seconds", "keyframe_interval", "buffer", "records", "write_pos", "keyframe",
+                 "since_keyframe", "decoded", "captures", "capture_time", "max_capture_time", "raw_bytes",
+                 "stored_bytes")
+
+    def __init__(self, capacity_bytes, max_seconds, keyframe_interval=KEYFRAME_INTERVAL):
+        self.capacity = capacity_bytes
+        self.max_seconds = max_seconds
+        self.keyframe_interval = keyframe_interval
+        self.buffer = bytearray(capacity_bytes)
+        self.records = deque()
+        self.write_pos = 0
+        self.keyframe = None            # Last keyframe (uint8 array) deltas are taken against
+        self.since_keyframe = 0
+        self.decoded = (None, None)     # (record, uint8 array) keyframe decoded while rewinding
+
+        # Statistics
+        self.captures = 0
+        self.capture_time = 0.0
+        self.max_capture_time = 0.0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def push(self, state, game_time):
+        """Store a state captured at a game time"""
+        start_time = time.perf_counter()
+        raw = np.frombuffer(state, dtype=np.uint8)
+        keyframe = (self.keyframe is None or self.since_keyframe >= self.keyframe_interval
+                    or len(raw) > len(self.keyframe))
+        if keyframe:
+            self.keyframe = raw
+            self.since_keyframe = 0
+            data = zlib.compress(state, COMPRESSION_LEVEL)
+        else:
+            # Deltas are never longer than their keyframe
+            delta = self.keyframe[:len(raw)] ^ raw
+            data = zlib.compress(delta, COMPRESSION_LEVEL)
+        self.since_keyframe += 1
+        self.store(data, keyframe, len(raw), game_time)
+
+        elapsed = time.perf_counter() - start_time
+        self.captures += 1
+        self.capture_time += elapsed
+        self.max_capture_time = max(self.max_capture_time, elapsed)
+        self.raw_bytes += len(raw)
+        self.stored_bytes += len(data)
+
+    def store(self, data, keyframe, raw_size, game_time):
+        """Write a record into the ring, dropping the records it overwrites"""
+        size = len(data)
+        if size > self.capacity:
+            logger.warning("Rewind state of %d bytes does not fit the buffer", size)
+            self.clear()
+            return
+
+        records = self.records
+        start = self.write_pos
+        if start + size > self.capacity:
+            # Wrap around: the records at the end of the buffer are the oldest
+            while records and records[0].start >= start:
+                records.popleft()
+            start = 0
+        while records and records[0].start < start + size and start < records[0].start + records[0].size:
+            records.popleft()
+
+        self.buffer[start:start + size] = data
+        self.write_pos = start + size
+        records.append(Record(start, size, keyframe, raw_size, game_time))
+        self.decoded = (None, None)
+
+        # Drop states older than max_seconds, and deltas whose keyframe is gone
+        while records and (game_time - records[0].game_time > self.max_seconds or not records[0].keyframe):
+            records.popleft()
+        if not records:
+            # The new state was a delta against an overwritten keyframe
+            self.keyframe = None
+
+    def pop(self, before=None):
+        """
+        Remove and return the most recent state, or the most recent one
+        captured before a game time (None if there is none)
+        """
+        records = self.records
+        while records and before is not None and records[-1].game_time >= before:
+            if records.pop().keyframe:
+                self.decoded = (None, None)
+        if not records:
+            return None
+        record = records.pop()
+        raw = self.decode(record)
+        if record.keyframe:
+            self.decoded = (None, None)
+        # New captures must not be deltas against a keyframe that is gone
+        self.keyframe = None
+        self.write_pos = record.start
+        return raw.tobytes()
+
+    def decode(self, record):
+        """Uncompressed state of a record"""
+        data = zlib.decompress(self.buffer[record.start:record.start + record.size])
+        raw = np.frombuffer(data, dtype=np.uint8)
+        if record.keyframe:
+            return raw
+        keyframe_record, keyframe = self.decoded
+        if keyframe_record is None:
+            # The delta's keyframe is the latest one before it
+            keyframe_record = next(r for r in reversed(self.records) if r.keyframe)
+            keyframe = self.decode(keyframe_record)
+            self.decoded = (keyframe_record, keyframe)
+        return keyframe[:len(raw)] ^ raw
+
+    def clear(self):
+        """Forget every state"""
+        self.records.clear()
+        self.write_pos = 0
+        self.keyframe = None
+        self.decoded = (None, None)
+
+    @property
+    def used_bytes(self):
+        """Bytes of the buffer holding live records"""
+        return sum(record.size for record in self.records)
+
+    @property
+    def seconds(self):
+        """Game time covered by the stored states"""
+        if not self.records:
+            return 0.0
+        return self.records[-1].game_time - self.records[0].game_time
+
+    def get_stats(self):
+        """Get memory and capture statistics"""
+        return {
+            "states": len(self.records),
+            "seconds": round(self.seconds, 1),
+            "used_kb": round(self.used_bytes / 1024, 1),
+            "capacity_kb": round(self.capacity / 1024, 1),
+            "compression": round(self.raw_bytes / max(1, self.stored_bytes), 1),
+            "average_capture_us": round(self.capture_time / max(1, self.captures) * 1e6, 1),
+            "max_capture_us": round(self.max_capture_time * 1e6, 1)
+        }
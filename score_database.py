@@ -0,0 +1,276 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from game_logging import get_logger
+
+logger = get_logger("score_database")
+
+# Default database file
+DATABASE_FILE = "scores.db"
+
+# Maximum number of queued operations written in one transaction
+BATCH_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    ended REAL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER REFERENCES sessions(id),
+    score INTEGER NOT NULL,
+    difficulty TEXT,
+    duration REAL NOT NULL DEFAULT 0,
+    orbs INTEGER NOT NULL DEFAULT 0,
+    timestamp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_stats (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (session_id, name)
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    log_offset INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_difficulty_score ON scores (difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS scores_timestamp ON scores (timestamp);
+"""
+
+# Statements used by the writer thread (sqlite3 caches them as prepared statements)
+INSERT_SESSION = "INSERT INTO sessions (started) VALUES (?)"
+END_SESSION = "UPDATE sessions SET ended = ? WHERE id = ?"
+INSERT_SCORE = ("INSERT INTO scores (session_id, score, difficulty, duration, orbs, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+ADD_STAT = ("INSERT INTO session_stats (session_id, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id, name) DO UPDATE SET value = value + excluded.value")
+MAX_STAT = ("INSERT INTO session_stats (session_id, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id, name) DO UPDATE SET value = MAX(value, excluded.value)")
+GET_LOG_OFFSET = "SELECT log_offset FROM imports WHERE source = ?"
+SET_LOG_OFFSET = "INSERT OR REPLACE INTO imports (source, log_offset, updated) VALUES (?, ?, ?)"
+ADVANCE_LOG_OFFSET = ("INSERT INTO imports (source, log_offset, updated) VALUES (?, ?, ?) "
+                      "ON CONFLICT (source) DO UPDATE SET log_offset = MAX(log_offset, excluded.log_offset), "
+                      "updated = excluded.updated")
+FIND_SCORE = ("SELECT 1 FROM scores WHERE score = ? AND difficulty IS ? AND timestamp BETWEEN ? AND ? "
+              "LIMIT 1")
+
+# Name of the JSON score log in the imports table (and of the first, one-time import in migrations)
+JSON_SCORES = "json_scores"
+
+def connect(path):
+    """Open a connection with the settings used by the score database"""
+    connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+class ScoreDatabase:
+    """
+    Optional SQLite store for scores, play sessions and per-session stats.
+    All writes are queued and done by a background thread in batched
+    transactions, so recording a score costs the main thread one queue put.
+    A session covers one run of the game (from start_session to close).
+    """
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.queue = queue.Queue()
+        self.ready = threading.Event()
+        self.error = None
+
+        # Statistics
+        self.batches_written = 0
+        self.operations_written = 0
+
+        self.thread = threading.Thread(target=self.run, name="ScoreDatabase", daemon=True)
+        self.thread.start()
+
+    def start_session(self):
+        """Start a new play session, scores recorded afterwards belong to it"""
+        self.queue.put(("start_session", time.time()))
+
+    def record_score(self, score, difficulty=None, duration=0, orbs=0, log_offset=None):
+        """
+        Queue a finished game for writing. log_offset is the score log
+        offset after the game's record, so the next import skips it.
+        """
+        self.queue.put(("score", (score, difficulty, duration, orbs, time.time(), log_offset)))
+
+    def migrate_json(self, index_file="high_scores.json", log_file="score_log.jsonl"):
+        """Queue an import of the JSON score history logged since the last import"""
+        # Later records are recorded live, with their log offsets
+        log_end = os.path.getsize(log_file) if os.path.exists(log_file) else 0
+        self.queue.put(("migrate_json", (index_file, log_file, log_end)))
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued operation is written"""
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """End the current session, write pending operations and stop the writer"""
+        self.queue.put(("end_session", time.time()))
+        self.queue.put(("close", None))
+        self.thread.join(timeout)
+
+    def run(self):
+        """Writer thread: apply queued operations in batched transactions"""
+        try:
+            connection = connect(self.path)
+            connection.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            logger.warning("Could not open score database %s: %s", self.path, e)
+            self.error = e
+            self.ready.set()
+            # Drain the queue so callers waiting on flush() are released
+            while True:
+                operation, argument = self.queue.get()
+                if operation == "flush":
+                    argument.set()
+                elif operation == "close":
+                    return
+
+        self.ready.set()
+        session_id = None
+        running = True
+
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiting = []
+            try:
+                with connection:
+                    for operation, argument in batch:
+                        if operation == "start_session":
+                            session_id = connection.execute(INSERT_SESSION, (argument,)).lastrowid
+                        elif operation == "score":
+                            self.write_score(connection, session_id, argument)
+                        elif operation == "end_session" and session_id is not None:
+                            connection.execute(END_SESSION, (argument, session_id))
+                            session_id = None
+                        elif operation == "migrate_json":
+                            self.write_migration(connection, *argument)
+                        elif operation == "flush":
+                            waiting.append(argument)
+                        elif operation == "close":
+                            running = False
+                self.batches_written += 1
+                self.operations_written += len(batch)
+            except sqlite3.Error as e:
+                logger.warning("Could not write to score database: %s", e)
+
+            for event in waiting:
+                event.set()
+
+        connection.close()
+
+    def write_score(self, connection, session_id, values):
+        """Insert a score and update the session stats"""
+        score, difficulty, duration, orbs, timestamp, log_offset = values
+        connection.execute(INSERT_SCORE, (session_id, score, difficulty, duration, orbs, timestamp))
+        if log_offset is not None:
+            connection.execute(ADVANCE_LOG_OFFSET, (JSON_SCORES, log_offset, timestamp))
+        if session_id is None:
+            return
+        connection.executemany(ADD_STAT, [
+            (session_id, "games", 1),
+            (session_id, "total_score", score),
+            (session_id, "total_duration", duration),
+            (session_id, "total_orbs", orbs)
+        ])
+        connection.execute(MAX_STAT, (session_id, "best_score", score))
+
+    def write_migration(self, connection, index_file, log_file, log_end):
+        """
+        Import the score log records up to log_end that are not in the
+        database yet. The imports table keeps the log offset imported so
+        far, which recorded scores also move past their own records, so
+        every start imports what was logged while the database was off.
+        """
+        row = connection.execute(GET_LOG_OFFSET, (JSON_SCORES,)).fetchone()
+        offset = row[0] if row else 0
+        if offset > log_end:
+            logger.warning("%s is shorter than its imported part, importing it again", log_file)
+            offset = 0
+        # Databases from before the offset was kept imported the log once, up to an unknown point
+        imported_once = row is None and connection.execute(
+            "SELECT 1 FROM migrations WHERE name = ?", (JSON_SCORES,)).fetchone() is not None
+
+        rows = []
+        if os.path.exists(log_file):
+            with open(log_file, "rb") as f:
+                f.seek(offset)
+                data = f.read(log_end - offset)
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    # Partial line from an interrupted write, imported once it is complete
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "score" in record:
+                    rows.append((None, record["score"], record.get("difficulty"),
+                                 record.get("duration", 0), record.get("orbs", 0),
+                                 record.get("timestamp", 0)))
+            if imported_once:
+                # Recorded scores are timestamped a moment after their log records
+                rows = [values for values in rows if not connection.execute(
+                    FIND_SCORE, (values[1], values[2], values[5] - 1, values[5] + 1)).fetchone()]
+        elif row is None and not imported_once and os.path.exists(index_file):
+            # Bare scores from the old high_scores.json format
+            try:
+                with open(index_file, "r") as f:
+                    scores = json.load(f).get("scores", [])
+            except (ValueError, IOError):
+                scores = []
+            rows = [(None, score, None, 0, 0, 0) for score in scores if isinstance(score, int)]
+
+        connection.executemany(INSERT_SCORE, rows)
+        connection.execute(SET_LOG_OFFSET, (JSON_SCORES, offset, time.time()))
+        if rows:
+            logger.info("Imported %d scores into the score database", len(rows))
+
+    def query(self, sql, parameters=()):
+        """Run a read-only query on a separate connection (safe while the writer runs)"""
+        self.ready.wait()
+        connection = connect(self.path)
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def top_scores(self, difficulty=None, limit=10):
+        """Get the best (score, difficulty, timestamp) rows, optionally for one difficulty"""
+        if difficulty is None:
+            return self.query("SELECT score, difficulty, timestamp FROM scores "
+                              "ORDER BY score DESC LIMIT ?", (limit,))
+        return self.query("SELECT score, difficulty, timestamp FROM scores WHERE difficulty = ? "
+                          "ORDER BY score DESC LIMIT ?", (difficulty, limit))
+
+    def scores_between(self, start, end):
+        """Get all score rows recorded between two timestamps"""
+        return self.query("SELECT session_id, score, difficulty, duration, orbs, timestamp FROM scores "
+                          "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp", (start, end))
+
+    def session_stats(self, session_id):
+        """Get the stats of a session as a dict"""
+        return dict(self.query("SELECT name, value FROM session_stats WHERE session_id = ?", (session_id,)))
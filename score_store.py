@@ -0,0 +1,197 @@
+import heapq
+import json
+import os
+import threading
+import time
+
+from game_logging import get_logger
+from persistence import get_writer
+
+logger = get_logger("score_store")
+
+# Number of scores kept per leaderboard
+LEADERBOARD_SIZE = 10
+
+# Write a new index snapshot after this many appended records
+COMPACT_INTERVAL = 20
+
+# Leaderboard holding the best scores of every difficulty
+ALL_DIFFICULTIES = "all"
+
+class ScoreStore:
+    """
+    High score storage backed by an append-only log.
+    Every finished game is appended as one JSON line to the score log,
+    so the full history is kept without rewriting files. The best scores
+    per difficulty are kept in small in-memory min-heaps (O(log K) insert),
+    and an index snapshot of those heaps plus the covered log offset is
+    written periodically, so loading only replays the tail of the log.
+    """
+    def __init__(self, index_file="high_scores.json", log_file="score_log.jsonl", size=LEADERBOARD_SIZE):
+        self.index_file = index_file
+        self.log_file = log_file
+        self.size = size
+        self.writer = get_writer()
+        self.lock = threading.Lock()
+
+        # Leaderboard heaps: difficulty -> [(score, sequence, record)]
+        self.heaps = {}
+        # Sorted leaderboards, rebuilt lazily after an insert
+        self.sorted_cache = {}
+        # Total number of records in the log and a tie-breaking counter
+        self.count = 0
+        self.sequence = 0
+        # Records appended since the last index snapshot
+        self.appended_since_compact = 0
+        # Bumped whenever the leaderboards change
+        self.version = 0
+
+        self.load()
+
+    def load(self):
+        """Load the index snapshot and replay the log written after it"""
+        index = {}
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, "r") as f:
+                    index = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            logger.warning("Could not load %s. Rebuilding from the score log.", self.index_file)
+
+        log_size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        offset = index.get("log_offset")
+
+        if isinstance(offset, int) and offset <= log_size and "leaderboards" in index:
+            # Start from the snapshot and replay only what was logged after it
+            for difficulty, records in index["leaderboards"].items():
+                for record in records:
+                    self.push(difficulty, record)
+            self.count = index.get("count", 0)
+            if self.replay(offset):
+                self.appended_since_compact += 1
+        elif log_size > 0:
+            self.replay(0)
+            self.appended_since_compact += 1
+        else:
+            # Migrate bare scores from the old high_scores.json format
+            for score in index.get("scores", []):
+                if isinstance(score, int):
+                    self.append({"score": score, "difficulty": None, "duration": 0,
+                                 "orbs": 0, "timestamp": 0})
+
+        if self.appended_since_compact:
+            self.compact()
+
+    def replay(self, offset):
+        """Apply log records starting at a byte offset, returns the number applied"""
+        applied = 0
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partial line from an interrupted write
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.apply(record)
+                    applied += 1
+        except IOError:
+            logger.warning("Could not read %s.", self.log_file)
+        return applied
+
+    def apply(self, record):
+        """Apply one log record to the in-memory leaderboards"""
+        if record.get("type") == "reset":
+            self.heaps = {}
+            self.sorted_cache = {}
+            return
+
+        self.count += 1
+        self.push(ALL_DIFFICULTIES, record)
+        if record.get("difficulty"):
+            self.push(record["difficulty"], record)
+
+    def push(self, difficulty, record):
+        """Insert a record into a leaderboard heap, keeping only the best scores"""
+        heap = self.heaps.setdefault(difficulty, [])
+        self.sequence += 1
+        # Older records win ties, so they get the larger tie-breaker
+        entry = (record["score"], -self.sequence, record)
+        if len(heap) < self.size:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+        else:
+            return
+        self.sorted_cache.pop(difficulty, None)
+        self.version += 1
+
+    def append(self, record):
+        """Append a record to the log and apply it, returns the log offset after it (None if not written)"""
+        line = json.dumps(record) + "\n"
+        offset = None
+        try:
+            with open(self.log_file, "ab") as f:
+                f.write(line.encode("utf-8"))
+                offset = f.tell()
+        except IOError:
+            logger.warning("Could not write %s.", self.log_file)
+        self.apply(record)
+        self.appended_since_compact += 1
+        return offset
+
+    def add_score(self, score, difficulty=None, duration=0, orbs=0):
+        """Record a finished game, returns the log offset after its record (None if not written)"""
+        with self.lock:
+            offset = self.append({
+                "score": score,
+                "difficulty": difficulty,
+                "duration": round(duration, 2),
+                "orbs": orbs,
+                "timestamp": round(time.time(), 3)
+            })
+            if self.appended_since_compact >= COMPACT_INTERVAL:
+                self.compact()
+            return offset
+
+    def reset(self):
+        """Clear the leaderboards (the history stays in the log)"""
+        with self.lock:
+            self.append({"type": "reset", "timestamp": round(time.time(), 3)})
+            self.version += 1
+            self.compact()
+
+    def compact(self):
+        """Write an index snapshot of the leaderboards covering the current log"""
+        log_size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        self.writer.schedule(self.index_file, {
+            # Plain scores keep the old file format readable
+            "scores": [record["score"] for record in self.leaderboard()],
+            "leaderboards": {difficulty: self.leaderboard(difficulty) for difficulty in self.heaps},
+            "log_offset": log_size,
+            "count": self.count
+        })
+        self.appended_since_compact = 0
+
+    def leaderboard(self, difficulty=ALL_DIFFICULTIES):
+        """Get the best records for a difficulty, highest score first"""
+        board = self.sorted_cache.get(difficulty)
+        if board is None:
+            heap = self.heaps.get(difficulty, [])
+            board = [entry[2] for entry in sorted(heap, reverse=True)] if heap else []
+            self.sorted_cache[difficulty] = board
+        return board
+
+    def best_score(self, difficulty=ALL_DIFFICULTIES):
+        """Get the best score for a difficulty (0 if there is none)"""
+        board = self.leaderboard(difficulty)
+        return board[0]["score"] if board else 0
+
+    def close(self):
+        """Snapshot the leaderboards if anything was appended since the last snapshot"""
+        with self.lock:
+            if self.appended_since_compact:
+                self.compact()
@@ -0,0 +1,115 @@
+import time
+from collections import deque
+
+from game_logging import get_logger
+
+logger = get_logger("screens")
+
+# Number of transition times kept per screen
+LATENCY_HISTORY = 32
+
+class FirstFrameHook:
+    """
+    Mixin for screens shown through ScreenRegistry: the registry sets
+    on_first_frame before each visit, and the screen's loop calls
+    first_frame_drawn() after every draw() to run it once.
+    """
+    # Called once after the first frame of each visit has been drawn
+    on_first_frame = None
+
+    def first_frame_drawn(self):
+        """Run the on_first_frame callback if this was the first frame of the visit"""
+        if self.on_first_frame:
+            callback = self.on_first_frame
+            self.on_first_frame = None
+            callback()
+
+class ScreenRegistry:
+    """
+    Keeps screen instances alive between visits.
+    Each screen is built by its factory the first time it is shown and
+    reused afterwards. Showing a screen calls its on_enter() hook and
+    leaving it calls on_exit(), so screens can reset their per-visit state
+    without rebuilding fonts, buttons and backgrounds. The time from
+    leaving one screen to the first frame of the next is recorded.
+    """
+    def __init__(self):
+        self.factories = {}
+        self.screens = {}
+        self.current = None
+
+        # Transition latency measurement
+        self.transition_start = None
+        self.transition_cold = False
+        self.latencies = {}
+        self.build_times = {}
+
+    def register(self, name, factory):
+        """Register a factory that builds a screen"""
+        self.factories[name] = factory
+
+    def get(self, name):
+        """Get a screen, building it on first use"""
+        screen = self.screens.get(name)
+        if screen is None:
+            build_start = time.perf_counter()
+            screen = self.factories[name]()
+            self.build_times[name] = time.perf_counter() - build_start
+            self.screens[name] = screen
+            logger.debug("Built screen %s in %.1f ms", name, self.build_times[name] * 1000)
+        return screen
+
+    def discard(self, name):
+        """Drop a screen so it is rebuilt on its next visit"""
+        self.screens.pop(name, None)
+
+    def begin_transition(self):
+        """Start timing a transition (called when the previous screen is left)"""
+        self.transition_start = time.perf_counter()
+
+    def run(self, name, on_first_frame=None):
+        """Show a screen until it returns, then return its result"""
+        if self.transition_start is None:
+            self.begin_transition()
+        self.transition_cold = name not in self.screens
+        screen = self.get(name)
+
+        def first_frame():
+            self.record_transition(name)
+            if on_first_frame:
+                on_first_frame()
+        # Run by the screen's FirstFrameHook.first_frame_drawn()
+        screen.on_first_frame = first_frame
+
+        if hasattr(screen, "on_enter"):
+            screen.on_enter()
+        self.current = name
+        try:
+            return screen.run()
+        finally:
+            if hasattr(screen, "on_exit"):
+                screen.on_exit()
+            self.current = None
+            self.begin_transition()
+
+    def record_transition(self, name):
+        """Record the time from the last screen exit to this first frame"""
+        if self.transition_start is None:
+            return
+        latency = time.perf_counter() - self.transition_start
+        self.transition_start = None
+        self.latencies.setdefault(name, deque(maxlen=LATENCY_HISTORY)).append(latency)
+        logger.debug("Transition to %s took %.1f ms (%s)", name, latency * 1000,
+                     "cold" if self.transition_cold else "warm")
+
+    def get_stats(self):
+        """Get the last and average transition latency of each screen (ms)"""
+        stats = {}
+        for name, history in self.latencies.items():
+            stats[name] = {
+                "last_ms": history[-1] * 1000,
+                "average_ms": sum(history) / len(history) * 1000,
+                "samples": len(history),
+                "build_ms": self.build_times.get(name, 0.0) * 1000
+            }
+        return stats
@@ -5,6 +5,10 @@ import random
 import os
 from pygame.locals import *
 from button import Button
+from game_logging import get_logger
+from screen_registry import FirstFrameHook
+
+logger = get_logger("settings")
 
 # Constants
 SCREEN_WIDTH = 800
@@ -22,7 +26,7 @@ NEON_YELLOW = (255, 255, 0)
 NEON_ORANGE = (255, 165, 0)
 NEON_CYAN = (0, 255, 255)
 
-class Settings:
+class Settings(FirstFrameHook):
     """Settings screen for game configuration"""
     
     def __init__(self, screen, clock, sound_manager):
@@ -52,8 +56,8 @@ class Settings:
         
         # Initialize difficulty settings
         try:
-            from difficulty_settings import DifficultySettings
-            self.difficulty_settings = DifficultySettings()
+            from difficulty_settings import get_difficulty_settings
+            self.difficulty_settings = get_difficulty_settings()
             current_difficulty = self.difficulty_settings.current_difficulty
         except ImportError:
             self.difficulty_settings = None
@@ -108,6 +112,15 @@ class Settings:
                   border_color=NEON_PINK, sound_manager=self.sound_manager)
         ]
     
+    def on_enter(self):
+        """Reset per-visit state when the screen is shown again"""
+        self.running = True
+        self.selected_button = 0
+    
+    def on_exit(self):
+        """Called when the screen is left"""
+        pass
+    
     def get_font(self, size):
         """Get a font of specified size"""
         font_dir = os.path.join(os.path.dirname(__file__), "assets", "fonts")
@@ -155,24 +168,24 @@ class Settings:
                         button.text_rect = button.text_surface.get_rect(center=button.rect.center)
                         
                         # Debug output
-                        print(f"Sound toggled in settings: {sound_enabled}")
+                        logger.debug("Sound toggled in settings: %s", sound_enabled)
                         
                         # Play a test sound if enabled
                         if sound_enabled:
-                            print("Attempting to play test sound...")
+                            logger.debug("Attempting to play test sound...")
                             # Force direct sound play for testing
                             if "click" in self.sound_manager.sounds:
                                 try:
                                     self.sound_manager.sounds["click"].play()
-                                    print("Test sound played directly")
+                                    logger.debug("Test sound played directly")
                                 except Exception as e:
-                                    print(f"Error playing test sound: {e}")
+                                    logger.warning("Error playing test sound: %s", e)
                             else:
-                                print("Click sound not found")
+                                logger.debug("Click sound not found")
                         else:
                             # Make sure all sounds are stopped
                             pygame.mixer.stop()
-                            print("Stopped all sounds")
+                            logger.debug("Stopped all sounds")
                     
                     elif i == 1:  # Music toggle
                         # Toggle music and update button text
@@ -182,7 +195,7 @@ class Settings:
                         button.text_rect = button.text_surface.get_rect(center=button.rect.center)
                         
                         # Debug output
-                        print(f"Music toggled in settings: {music_enabled}")
+                        logger.debug("Music toggled in settings: %s", music_enabled)
                         
                         # Play or stop music based on new state
                         if music_enabled:
@@ -193,18 +206,18 @@ class Settings:
                                     pygame.mixer.music.load(music_path)
                                     pygame.mixer.music.set_volume(self.sound_manager.music_volume)
                                     pygame.mixer.music.play(-1)
-                                    print("Music started directly")
+                                    logger.debug("Music started directly")
                                 else:
-                                    print("Music file not found")
+                                    logger.warning("Music file not found")
                             except Exception as e:
-                                print(f"Error playing music: {e}")
+                                logger.warning("Error playing music: %s", e)
                         else:
                             # Stop music directly
                             try:
                                 pygame.mixer.music.stop()
-                                print("Music stopped directly")
+                                logger.debug("Music stopped directly")
                             except Exception as e:
-                                print(f"Error stopping music: {e}")
+                                logger.warning("Error stopping music: %s", e)
                     
                     elif i == 2:  # Sound volume
                         # Cycle through volume levels: 100% -> 75% -> 50% -> 25% -> 0% -> 100%
@@ -247,10 +260,8 @@ class Settings:
                         button.text = f"MUSIC VOLUME: {int(self.sound_manager.music_volume * 100)}%"
                         button.text_surface = button.font.render(button.text, True, button.text_color)
                         button.text_rect = button.text_surface.get_rect(center=button.rect.center)
-                        
-                        # If music is playing, restart it to apply the new volume immediately
-                        if self.sound_manager.music_enabled and self.sound_manager.music_playing:
-                            self.sound_manager.play_music("menu_music.mp3")
+
+                        # set_music_volume applies the new volume to the playing stream
                     
                     elif i == 4:  # Difficulty setting
                         if self.difficulty_settings:
@@ -272,7 +283,7 @@ class Settings:
                             # Play sound effect
                             self.sound_manager.play("click")
                             
-                            print(f"Difficulty changed to: {new_difficulty}")
+                            logger.debug("Difficulty changed to: %s", new_difficulty)
                     
                     elif i == 5:  # Back to menu
                         self.running = False
@@ -356,6 +367,8 @@ class Settings:
                 
             self.update()
             self.draw()
+            self.first_frame_drawn()
+            
             self.clock.tick(FPS)
         
         return "menu"  # Default return to menu
\ No newline at end of file
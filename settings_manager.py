@@ -1,51 +1,42 @@
-import os
-import json
+from config_store import get_config_store, GAME_SETTINGS_SCHEMA
+
+from game_logging import get_logger
+
+logger = get_logger("settings_manager")
 
 class SettingsManager:
     """
     Manages game settings persistence between sessions.
-    Saves and loads settings to/from a JSON file.
+    Settings are kept in the shared configuration store, which loads
+    game_settings.json once and saves it back on changes.
     """
     def __init__(self):
         self.settings_file = "game_settings.json"
-        self.default_settings = {
-            "sound_enabled": True,
-            "music_enabled": True,
-            "sound_volume": 0.7,
-            "music_volume": 0.5
-        }
-        self.settings = self.load_settings()
+        self.store = get_config_store()
+        self.default_settings = {key: rule["default"] for key, rule in GAME_SETTINGS_SCHEMA.items()}
+        self.store.load("game_settings")
+    
+    @property
+    def settings(self):
+        """Read-only view of the current settings"""
+        return self.store.get("game_settings")
     
     def load_settings(self):
         """Load settings from file or use defaults if file doesn't exist"""
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, "r") as f:
-                    settings = json.load(f)
-                return settings
-            else:
-                return self.default_settings.copy()
-        except (json.JSONDecodeError, IOError):
-            print("Warning: Could not load settings file. Using defaults.")
-            return self.default_settings.copy()
+        return self.store.load("game_settings")
     
     def save_settings(self):
-        """Save current settings to file"""
-        try:
-            with open(self.settings_file, "w") as f:
-                json.dump(self.settings, f)
-        except IOError:
-            print("Warning: Could not save settings file.")
+        """Schedule the current settings to be saved to file"""
+        self.store.save("game_settings")
     
     def get_setting(self, key):
         """Get a specific setting value"""
         return self.settings.get(key, self.default_settings.get(key))
     
     def set_setting(self, key, value):
-        """Set a specific setting value and save to file"""
+        """Set a specific setting value (saved to file in the background)"""
         if key in self.default_settings:
-            self.settings[key] = value
-            self.save_settings()
+            self.store.update("game_settings", {key: value})
     
     def apply_settings_to_sound_manager(self, sound_manager):
         """Apply loaded settings to the sound manager"""
@@ -66,13 +57,16 @@ class SettingsManager:
             sound_manager.music_enabled = self.get_setting("music_enabled")
             
         # Print debug info
-        print(f"Applied settings: sound={sound_manager.sound_enabled}, music={sound_manager.music_enabled}, " +
-              f"sound_vol={sound_manager.volume}, music_vol={sound_manager.music_volume}")
+        logger.debug("Applied settings: sound=%s, music=%s, sound_vol=%s, music_vol=%s",
+                     sound_manager.sound_enabled, sound_manager.music_enabled,
+                     sound_manager.volume, sound_manager.music_volume)
     
     def update_from_sound_manager(self, sound_manager):
         """Update settings from current sound manager state"""
-        self.set_setting("sound_enabled", sound_manager.sound_enabled)
-        self.set_setting("music_enabled", sound_manager.music_enabled)
-        self.set_setting("sound_volume", sound_manager.volume)
-        self.set_setting("music_volume", sound_manager.music_volume)
-        self.save_settings()
\ No newline at end of file
+        # One update, so the changes are saved with a single (deferred) write
+        self.store.update("game_settings", {
+            "sound_enabled": sound_manager.sound_enabled,
+            "music_enabled": sound_manager.music_enabled,
+            "sound_volume": sound_manager.volume,
+            "music_volume": sound_manager.music_volume
+        })
\ No newline at end of file
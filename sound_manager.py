@@ -1,25 +1,37 @@
 import pygame
 import os
+import threading
+
+from audio_loader import AudioLoader, NullSound
+from channel_manager import ChannelManager
+import engine_synth
+from game_logging import get_logger
+
+logger = get_logger("sound_manager")
 
 class SoundManager:
     """
     Manages game sounds and music with proper error handling.
     """
-    def __init__(self):
+    def __init__(self, async_loading=True):
         # Initialize with explicit boolean values
         self.sounds = {}
+        self.async_loading = async_loading
+        # Looping sounds requested before they finished loading, and those
+        # loaded since, waiting to be started on the main thread
+        self.pending_loops = {}
+        self.loaded_loops = {}
+        self.load_lock = threading.Lock()
         self.music_playing = False
+        self.current_music = None
         self.sound_enabled = True  # Explicitly True
         self.music_enabled = True  # Explicitly True
         self.volume = 0.7
         self.music_volume = 0.5
         
         # Debug output
-        print("Sound Manager initialized:")
-        print(f"Sound enabled: {self.sound_enabled}")
-        print(f"Music enabled: {self.music_enabled}")
-        print(f"Sound volume: {self.volume}")
-        print(f"Music volume: {self.music_volume}")
+        logger.debug("Sound Manager initialized: sound=%s, music=%s, sound volume=%s, music volume=%s",
+                     self.sound_enabled, self.music_enabled, self.volume, self.music_volume)
         
         # Asset paths
         self.asset_dir = os.path.join(os.path.dirname(__file__), "assets")
@@ -33,11 +45,27 @@ class SoundManager:
             try:
                 pygame.mixer.init()
             except pygame.error:
-                print("Warning: Sound system initialization failed")
+                logger.warning("Sound system initialization failed")
                 self.sound_enabled = False
                 self.music_enabled = False
         
-        # Load sounds
+        # Channel allocation with priorities and voice stealing
+        self.channel_manager = None
+        if pygame.mixer.get_init():
+            self.channel_manager = ChannelManager()
+        
+        # Procedural engine sound that follows the speed (needs NumPy)
+        self.engine_synth = None
+        self.engine_running = False
+        self.engine_speed = 0.0
+        if self.channel_manager and self.sound_enabled and engine_synth.is_available():
+            self.engine_synth = engine_synth.EngineSynth(
+                self.channel_manager.reserved["engine"],
+                self.channel_manager.reserved["engine_crossfade"])
+            self.engine_synth.set_volume(self.volume)
+        
+        # Load sounds (in the background, with a decoded-sample cache)
+        self.loader = AudioLoader(self.sound_dir)
         self.load_sounds()
     
     def load_sounds(self):
@@ -50,51 +78,129 @@ class SoundManager:
             "hover": "hover.mp3"
         }
         
-        for sound_name, filename in sound_files.items():
-            self.load_sound(sound_name, filename)
+        if not self.sound_enabled:
+            return
+        
+        if not self.async_loading:
+            for sound_name, filename in sound_files.items():
+                self.load_sound(sound_name, filename)
+            return
+        
+        # Silent placeholders until the background loader delivers each sound
+        for sound_name in sound_files:
+            self.sounds[sound_name] = NullSound()
+        self.loader.load_async(sound_files, self.on_sound_loaded)
     
     def load_sound(self, sound_name, filename):
         """Load a single sound file with error handling"""
         if not self.sound_enabled:
             return
-            
-        filepath = os.path.join(self.sound_dir, filename)
-        try:
-            if os.path.exists(filepath):
-                self.sounds[sound_name] = pygame.mixer.Sound(filepath)
-                self.sounds[sound_name].set_volume(self.volume)
-            else:
-                print(f"Warning: Sound file not found: {filepath}")
-        except pygame.error:
-            print(f"Warning: Could not load sound: {filepath}")
+        
+        sound = self.loader.load(filename)
+        if sound is not None:
+            self.on_sound_loaded(sound_name, sound)
+    
+    def on_sound_loaded(self, sound_name, sound):
+        """Install a loaded sound (called from the loader thread when loading asynchronously)"""
+        sound.set_volume(self.volume)
+        with self.load_lock:
+            self.sounds[sound_name] = sound
+            # Looping sounds requested while the sound was loading are started by
+            # the next play() or update_engine() (the channels are not thread-safe)
+            loops = self.pending_loops.pop(sound_name, None)
+            if loops is not None:
+                self.loaded_loops[sound_name] = loops
+    
+    def start_loaded_loops(self):
+        """Start the looping sounds that finished loading after they were requested"""
+        with self.load_lock:
+            loaded_loops, self.loaded_loops = self.loaded_loops, {}
+        for sound_name, loops in loaded_loops.items():
+            self.play(sound_name, loops)
+    
+    def wait_until_loaded(self, timeout=None):
+        """Wait for background sound loading to finish"""
+        return self.loader.wait(timeout)
     
     def play(self, sound_name, loops=0):
         """Play a sound effect"""
         # Check if sound is enabled - strict check
         if self.sound_enabled is False:  # Explicit check for False
             return
+        
+        if self.loaded_loops:
+            self.start_loaded_loops()
             
+        if sound_name == "engine" and self.engine_synth:
+            self.engine_running = True
+            if self.engine_synth.start(self.engine_speed):
+                return
+            # Not synthesized yet: use the engine sample until it is
+        
         if sound_name in self.sounds:
+            sound = self.sounds[sound_name]
+            if isinstance(sound, NullSound):
+                with self.load_lock:
+                    # Still loading: remember looping sounds so they start once loaded
+                    if isinstance(self.sounds[sound_name], NullSound):
+                        if loops != 0:
+                            self.pending_loops[sound_name] = loops
+                        return
+                    sound = self.sounds[sound_name]
+            
             try:
-                # Make sure volume is set correctly before playing
-                self.sounds[sound_name].set_volume(self.volume)
-                self.sounds[sound_name].play(loops)
+                # Volume is already set on the sound by load_sound() and set_volume()
+                if self.channel_manager:
+                    channel = self.channel_manager.play(sound_name, sound, loops)
+                else:
+                    channel = sound.play(loops)
                 
                 # Debug output
-                print(f"Playing sound: {sound_name}, Sound enabled: {self.sound_enabled}, Volume: {self.volume}")
+                logger.debug("Playing sound: %s, channel: %s", sound_name, channel)
             except pygame.error as e:
-                print(f"Warning: Could not play sound: {sound_name}, Error: {e}")
+                logger.warning("Could not play sound: %s, error: %s", sound_name, e)
     
     def stop(self, sound_name):
         """Stop a specific sound"""
         if not self.sound_enabled:
             return
             
+        with self.load_lock:
+            self.pending_loops.pop(sound_name, None)
+            self.loaded_loops.pop(sound_name, None)
+        if sound_name == "engine" and self.engine_synth:
+            self.engine_running = False
+            self.engine_synth.stop()
         if sound_name in self.sounds:
             try:
+                if self.channel_manager:
+                    self.channel_manager.stop(sound_name)
                 self.sounds[sound_name].stop()
             except pygame.error:
-                print(f"Warning: Could not stop sound: {sound_name}")
+                logger.warning("Could not stop sound: %s", sound_name)
+    
+    def update_engine(self, speed, dt):
+        """Let the engine sound follow the scroll speed (call once per frame)"""
+        self.engine_speed = speed
+        if self.loaded_loops and self.sound_enabled:
+            self.start_loaded_loops()
+        if not self.engine_synth:
+            return
+        
+        # Switch from the engine sample to the synthesized engine once it is ready
+        if self.engine_running and not self.engine_synth.playing and self.sound_enabled \
+                and self.engine_synth.is_ready():
+            if "engine" in self.sounds:
+                self.sounds["engine"].stop()
+            self.engine_synth.start(speed)
+        
+        self.engine_synth.update(speed, dt)
+    
+    def get_channel_stats(self):
+        """Get statistics about played, dropped and stolen voices"""
+        if not self.channel_manager:
+            return {}
+        return self.channel_manager.get_stats()
     
     def stop_all(self):
         """Stop all sounds"""
@@ -104,12 +210,15 @@ class SoundManager:
         try:
             pygame.mixer.stop()
         except pygame.error:
-            print("Warning: Could not stop sounds")
+            logger.warning("Could not stop sounds")
     
-    def play_music(self, filename):
-        """Play background music"""
+    def play_music(self, filename, restart=False):
+        """Play background music (left running if the same file is already playing)"""
         if not self.music_enabled:
             return
+        
+        if not restart and filename == self.current_music and self.is_music_busy():
+            return
             
         filepath = os.path.join(self.sound_dir, filename)
         try:
@@ -122,10 +231,11 @@ class SoundManager:
                 pygame.mixer.music.set_volume(self.music_volume)
                 pygame.mixer.music.play(-1)  # Loop indefinitely
                 self.music_playing = True
+                self.current_music = filename
             else:
-                print(f"Warning: Music file not found: {filepath}")
+                logger.warning("Music file not found: %s", filepath)
         except pygame.error:
-            print(f"Warning: Could not play music: {filepath}")
+            logger.warning("Could not play music: %s", filepath)
     
     def stop_music(self):
         """Stop background music"""
@@ -135,8 +245,16 @@ class SoundManager:
         try:
             pygame.mixer.music.stop()
             self.music_playing = False
+            self.current_music = None
         except pygame.error:
-            print("Warning: Could not stop music")
+            logger.warning("Could not stop music")
+    
+    def is_music_busy(self):
+        """True while the music stream is playing"""
+        try:
+            return pygame.mixer.music.get_busy()
+        except pygame.error:
+            return False
     
     def set_volume(self, volume):
         """Set volume for all sound effects (0.0 to 1.0)"""
@@ -149,13 +267,11 @@ class SoundManager:
                 sound.set_volume(self.volume)
             except pygame.error:
                 pass
+        if self.engine_synth:
+            self.engine_synth.set_volume(self.volume)
                 
         # Play a test sound to demonstrate the new volume if sound is enabled
-        if self.sound_enabled and "click" in self.sounds:
-            try:
-                self.sounds["click"].play(0)
-            except pygame.error:
-                pass
+        self.play("click")
     
     def set_music_volume(self, volume):
         """Set volume for music (0.0 to 1.0)"""
@@ -178,6 +294,9 @@ class SoundManager:
             pygame.mixer.stop()
             
             # Make sure engine sound is stopped specifically
+            if self.engine_synth:
+                self.engine_running = False
+                self.engine_synth.stop()
             if "engine" in self.sounds:
                 try:
                     self.sounds["engine"].stop()
@@ -0,0 +1,140 @@
+import bisect
+import heapq
+import itertools
+import random
+from collections import namedtuple
+
+# Road layout (same as the game)
+SCREEN_WIDTH = 800
+ROAD_WIDTH = 400
+LANE_COUNT = 3
+LANE_WIDTH = ROAD_WIDTH // LANE_COUNT
+ROAD_LEFT = (SCREEN_WIDTH - ROAD_WIDTH) // 2
+
+# Enemy x position for each lane (cars are 40 pixels wide)
+LANE_X = tuple(ROAD_LEFT + lane * LANE_WIDTH + (LANE_WIDTH - 40) // 2 for lane in range(LANE_COUNT))
+
+# Spawn rates in the difficulty curves are chances per 1/60 s step
+STEPS_PER_SECOND = 60
+
+# How far ahead spawns are scheduled (seconds of game time)
+LOOKAHEAD = 2.0
+
+# Spawn kinds
+ENEMY = "enemy"
+ORB = "orb"
+
+# A scheduled spawn. lane is None for orbs.
+SpawnEvent = namedtuple("SpawnEvent", ["time", "kind", "lane", "x"])
+
+def build_lane_table(difficulty_level):
+    """
+    Cumulative lane transition table: row = lane of the previous enemy,
+    column = chance that the next enemy uses that lane (cumulative).
+    - easy: any lane
+    - medium: 30% an adjacent lane, otherwise any lane
+    - hard: 40% the same lane, otherwise any lane
+    """
+    uniform = 1.0 / LANE_COUNT
+    table = []
+    for last_lane in range(LANE_COUNT):
+        row = [uniform] * LANE_COUNT
+        if difficulty_level == "medium":
+            adjacent = [lane for lane in range(LANE_COUNT) if abs(lane - last_lane) == 1]
+            row = [0.7 * uniform + (0.3 / len(adjacent) if lane in adjacent else 0.0)
+                   for lane in range(LANE_COUNT)]
+        elif difficulty_level == "hard":
+            row = [0.6 * uniform + (0.4 if lane == last_lane else 0.0) for lane in range(LANE_COUNT)]
+        table.append(list(itertools.accumulate(row)))
+    return table
+
+# Lane tables for the built-in difficulty levels
+LANE_TABLES = {level: build_lane_table(level) for level in ("easy", "medium", "hard")}
+
+class SpawnScheduler:
+    """
+    Schedules enemy and orb spawns ahead of time.
+    Spawns follow a Poisson process whose rate comes from the difficulty
+    curves at the spawn time. Events are sampled up to LOOKAHEAD seconds
+    ahead into a heap, each enemy with its lane drawn from the lane
+    transition table of the difficulty level, so the per-frame cost is a
+    heap peek and upcoming() can show what is coming.
+    """
+    def __init__(self, difficulty_level, enemy_rate, orb_rate, rng=None, lookahead=LOOKAHEAD):
+        # enemy_rate / orb_rate: functions of game time returning the chance per step
+        self.rates = {ENEMY: enemy_rate, ORB: orb_rate}
+        self.lane_table = LANE_TABLES.get(difficulty_level) or build_lane_table(difficulty_level)
+        self.rng = rng or random.Random()
+        self.lookahead = lookahead
+        self.reset()
+
+    def reset(self, start_time=0.0):
+        """Clear the schedule and start sampling from start_time"""
+        self.heap = []
+        self.counter = itertools.count()
+        self.last_lane = None
+        # Time of the next unscheduled event of each kind
+        self.next_time = {kind: self.sample_after(kind, start_time) for kind in self.rates}
+        self.fill(start_time)
+
+    def sample_after(self, kind, t):
+        """Time of the next event of a kind after game time t"""
+        per_second = self.rates[kind](t) * STEPS_PER_SECOND
+        if per_second <= 0:
+            # Nothing spawns at this rate, look again later
+            return t + self.lookahead
+        return t + self.rng.expovariate(per_second)
+
+    def fill(self, now):
+        """Schedule events up to the lookahead horizon"""
+        horizon = now + self.lookahead
+        # Sample both kinds in time order, so enemy lanes chain in spawn order
+        while True:
+            kind = min(self.next_time, key=self.next_time.get)
+            t = self.next_time[kind]
+            if t > horizon:
+                # Game time at which the next event enters the lookahead window
+                self.fill_time = t - self.lookahead
+                return
+            if self.rates[kind](t) > 0:
+                heapq.heappush(self.heap, (t, next(self.counter), self.make_event(kind, t)))
+            self.next_time[kind] = self.sample_after(kind, t)
+
+    def make_event(self, kind, t):
+        """Build a spawn event, choosing its lane or position"""
+        if kind == ENEMY:
+            if self.last_lane is None:
+                lane = self.rng.randrange(LANE_COUNT)
+            else:
+                row = self.lane_table[self.last_lane]
+                lane = min(bisect.bisect_right(row, self.rng.random() * row[-1]), LANE_COUNT - 1)
+            self.last_lane = lane
+            return SpawnEvent(t, ENEMY, lane, LANE_X[lane])
+        return SpawnEvent(t, ORB, None, ROAD_LEFT + self.rng.randint(30, ROAD_WIDTH - 30))
+
+    def due(self, now):
+        """Pop the events due at game time now (usually none)"""
+        if now >= self.fill_time:
+            self.fill(now)
+        heap = self.heap
+        if not heap or heap[0][0] > now:
+            return ()
+        events = []
+        while heap and heap[0][0] <= now:
+            events.append(heapq.heappop(heap)[2])
+        return events
+
+    def restore(self, events, next_time, last_lane, fill_time):
+        """Restore a saved schedule (events in time order, as from upcoming())"""
+        self.heap = [(event.time, i, event) for i, event in enumerate(events)]
+        self.counter = itertools.count(len(events))
+        self.next_time = dict(next_time)
+        self.last_lane = last_lane
+        self.fill_time = fill_time
+
+    def upcoming(self, kind=None):
+        """Scheduled events in time order, optionally of one kind"""
+        events = [entry[2] for entry in sorted(self.heap)]
+        if kind is not None:
+            events = [event for event in events if event.kind == kind]
+        return events
@@ -0,0 +1,87 @@
+import importlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from game_logging import get_logger
+
+logger = get_logger("startup")
+
+# Screen modules imported in the background after the first menu frame
+WARM_MODULES = ["improved_game", "settings", "high_scores", "instructions"]
+
+class StartupProfiler:
+    """
+    Measures how long each startup phase takes.
+    The breakdown is printed when QAUTO_PROFILE_STARTUP is set and
+    logged at info level otherwise.
+    """
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.phases = []
+        self.marks = []
+        self.enabled = bool(os.environ.get("QAUTO_PROFILE_STARTUP"))
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase"""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_start))
+
+    def mark(self, name):
+        """Record the time since startup at a milestone"""
+        elapsed = time.perf_counter() - self.start_time
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    def format_report(self):
+        """Format the per-phase breakdown as text"""
+        lines = ["Startup profile:"]
+        for name, duration in self.phases:
+            lines.append(f"  {name:<28} {duration * 1000:8.1f} ms")
+        for name, elapsed in self.marks:
+            lines.append(f"  @ {name:<26} {elapsed * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def report(self):
+        """Print or log the breakdown (only once)"""
+        if self.reported:
+            return
+        self.reported = True
+        if self.enabled:
+            print(self.format_report())
+        else:
+            logger.info("%s", self.format_report())
+
+def warm_up_async(modules=WARM_MODULES, on_done=None):
+    """
+    Import screen modules and build the difficulty curve tables on a
+    background thread, so the first visit to a screen does not pay for it.
+    """
+    def run():
+        warm_start = time.perf_counter()
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                logger.warning("Could not preload %s: %s", module, e)
+
+        # Tabulate the curves of every difficulty preset
+        from difficulty_curve import build_curve_set
+        from difficulty_settings import get_difficulty_settings
+        for preset in get_difficulty_settings().difficulty_presets.values():
+            build_curve_set(preset["curves"])
+
+        duration = time.perf_counter() - warm_start
+        logger.info("Background warm-up took %.1f ms", duration * 1000)
+        if on_done:
+            on_done(duration)
+
+    thread = threading.Thread(target=run, name="WarmUp", daemon=True)
+    thread.start()
+    return thread
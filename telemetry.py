@@ -0,0 +1,291 @@
+import atexit
+import gzip
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from game_logging import get_logger
+
+logger = get_logger("telemetry")
+
+# Telemetry files: <session>-<part>.jsonl.gz, one JSON record per line
+# (session: start time, process id and session number in the process)
+TELEMETRY_DIR = os.path.join(os.path.dirname(__file__), "telemetry")
+
+# Records waiting for the writer; more are dropped (and counted), never waited for
+QUEUE_SIZE = 1024
+
+# Uncompressed bytes per file before starting the next part
+ROTATE_BYTES = 4 * 1024 * 1024
+
+# Oldest files are deleted beyond this many
+MAX_FILES = 500
+
+# Seconds a closed writer may take at exit to write what is still queued
+EXIT_TIMEOUT = 2.0
+
+# Record format version, stored in the session record
+FORMAT_VERSION = 1
+
+# Frame times kept per second (later frames overwrite the oldest)
+MAX_FRAMES = 1024
+
+# Horizontal gap (pixels) within which a passing enemy counts as a near miss
+NEAR_MISS_DISTANCE = 20
+
+# Sessions started by this process, so two games in the same second get different names
+_session_numbers = itertools.count(1)
+
+class TelemetryWriter:
+    """
+    Writes telemetry records from a background thread.
+    emit() only puts the record into a bounded queue: if the writer falls
+    behind and the queue is full, the record is dropped and counted. The
+    writer thread appends the records as JSON lines to gzip files, starting
+    a new part every ROTATE_BYTES, and flushes after every batch so a
+    killed game loses at most the records still queued. close() does not
+    wait either: the writer finishes in the background, and at exit the
+    process waits up to EXIT_TIMEOUT for it.
+    """
+    def __init__(self, directory=TELEMETRY_DIR, queue_size=QUEUE_SIZE, rotate_bytes=ROTATE_BYTES,
+                 max_files=MAX_FILES):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self.max_files = max_files
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopping = threading.Event()
+        self.session = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}-{next(_session_numbers)}"
+        self.thread = None
+        self.file = None
+        self.part = 0
+        self.file_bytes = 0
+
+        # Statistics
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+
+    def emit(self, record):
+        """Queue a record (a JSON-serializable dict) without waiting"""
+        if self.stopping.is_set():
+            self.dropped += 1
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="TelemetryWriter", daemon=True)
+            self.thread.start()
+        try:
+            self.queue.put_nowait(record)
+            self.emitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Stop the writer once it has written the queued records (without waiting for it)"""
+        if self.thread is None or self.stopping.is_set():
+            return
+        self.stopping.set()
+        try:
+            # Wakes the writer if it waits for records; with a full queue it is
+            # busy and sees stopping once the queue is empty
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        atexit.register(self.finish)
+
+    def finish(self, timeout=EXIT_TIMEOUT):
+        """Wait for a closed writer to finish (at exit)"""
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def run(self):
+        """Writer thread: write queued records in batches"""
+        running = True
+        while running:
+            if self.stopping.is_set() and self.queue.empty():
+                break
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                batch.remove(None)
+                running = False
+
+            try:
+                self.write(batch)
+            except (IOError, OSError) as e:
+                logger.warning("Could not write telemetry: %s", e)
+                self.close_file()
+
+        self.close_file()
+        atexit.unregister(self.finish)
+
+    def write(self, records):
+        """Append records to the current file"""
+        if not records:
+            return
+        if self.file is None:
+            self.open_file()
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        self.file.write(data.encode("utf-8"))
+        # A sync point, so everything written so far can be read back even if the game is killed
+        self.file.flush(zlib.Z_SYNC_FLUSH)
+        self.written += len(records)
+        self.file_bytes += len(data)
+        if self.file_bytes >= self.rotate_bytes:
+            self.close_file()
+
+    def open_file(self):
+        """Start the next part of the session"""
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            self.part += 1
+            path = os.path.join(self.directory, f"{self.session}-{self.part:03d}.jsonl.gz")
+            try:
+                # Never truncate an existing file
+                self.file = gzip.open(path, "xb")
+                break
+            except FileExistsError:
+                continue
+        self.file_bytes = 0
+        self.files += 1
+        self.prune()
+
+    def close_file(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except (IOError, OSError) as e:
+                logger.warning("Could not close telemetry file: %s", e)
+            self.file = None
+
+    def prune(self):
+        """Delete the oldest files beyond max_files"""
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith(".jsonl.gz"))
+        for name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def get_stats(self):
+        """Get queue and write statistics"""
+        return {
+            "emitted": self.emitted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "queued": self.queue.qsize(),
+            "files": self.files
+        }
+
+class SessionTelemetry:
+    """
+    Collects what happens in a game session and emits one record per
+    second of game time, plus records when a run starts and ends.
+    Records (the "type" field):
+    - session: start of a session (one Game), with the format version
+    - run: a run starts (game start or restart), with its difficulty
+    - second: speed, score, entity counts per pool, near misses and
+      steering input changes during the second, and the frame time
+      percentiles of the frames drawn during it
+    - end: a run ends, with its cause (enemy, closure, restart, quit),
+      game time, score, player lane and total entity count
+    """
+    __slots__ = ("writer", "difficulty_level", "run", "next_second", "near_misses", "inputs", "steering",
+                 "frame_times", "frames")
+
+    def __init__(self, writer, difficulty_level):
+        self.writer = writer
+        self.difficulty_level = difficulty_level
+        self.run = 0
+        self.next_second = 1.0
+        self.near_misses = 0
+        self.inputs = 0
+        self.steering = 0
+        self.frame_times = np.zeros(MAX_FRAMES)
+        self.frames = 0
+        writer.emit({"type": "session", "session": writer.session, "version": FORMAT_VERSION,
+                     "time": time.time(), "difficulty": difficulty_level})
+
+    def start_run(self):
+        """A new run starts at game time 0"""
+        self.run += 1
+        self.next_second = 1.0
+        self.near_misses = 0
+        self.inputs = 0
+        self.frames = 0
+        self.writer.emit({"type": "run", "run": self.run, "time": time.time(),
+                          "difficulty": self.difficulty_level})
+
+    def input(self, steering):
+        """Steering direction of a simulation step (-1, 0 or 1); changes are counted"""
+        if steering != self.steering:
+            self.steering = steering
+            self.inputs += 1
+
+    def near_miss(self, count):
+        self.near_misses += count
+
+    def seek(self, game_time):
+        """Continue from a game time (after rewinding or resuming a game)"""
+        self.next_second = float(int(game_time) + 1)
+
+    def frame(self, frame_time):
+        """Time of a drawn frame, in seconds"""
+        self.frame_times[self.frames % MAX_FRAMES] = frame_time
+        self.frames += 1
+
+    def step(self, game):
+        """After a simulation step: emit the second's record once it is over"""
+        if game.game_time < self.next_second:
+            return
+        self.next_second += 1.0
+
+        frame_times = self.frame_times[:min(self.frames, MAX_FRAMES)] * 1000
+        if len(frame_times):
+            p50, p95, p99 = np.percentile(frame_times, (50, 95, 99))
+            frame_ms = {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2),
+                        "max": round(float(frame_times.max()), 2)}
+        else:
+            frame_ms = None
+        self.writer.emit({
+            "type": "second",
+            "run": self.run,
+            "t": round(game.game_time, 3),
+            "speed": round(game.difficulty.scroll_speed, 3),
+            "enemy_speed": round(game.difficulty.enemy_speed, 3),
+            "score": game.score,
+            "orbs": game.orbs_collected,
+            "entities": {name: pool.count for name, pool in game.world.pools.items()},
+            "near_misses": self.near_misses,
+            "inputs": self.inputs,
+            "frames": self.frames,
+            "frame_ms": frame_ms
+        })
+        self.near_misses = 0
+        self.inputs = 0
+        self.frames = 0
+
+    def end_run(self, game, cause, lane):
+        """A run ends (crash, restart or leaving the game)"""
+        self.writer.emit({
+            "type": "end",
+            "run": self.run,
+            "cause": cause,
+            "t": round(game.game_time, 3),
+            "score": game.score,
+            "orbs": game.orbs_collected,
+            "lane": lane,
+            "difficulty": self.difficulty_level,
+            "entities": sum(pool.count for pool in game.world.pools.values())
+        })
@@ -0,0 +1,216 @@
+"""
+Summarize the telemetry files written by the game (telemetry.py).
+
+Streams every session file of a directory, collects the records into
+NumPy columns and answers:
+- survival: median game time until a crash, per difficulty
+- crashes: where crashes happen, by lane and game time
+- frame times: frame time p99 by entity count on screen
+
+The files are read in parallel processes when there are many of them.
+Prints the tables, and with --csv also writes them as CSV files.
+
+    python telemetry_analysis.py [directory] [--csv out_dir] [--processes N] [--time-bin 10] [--entity-bin 10]
+"""
+import argparse
+import csv
+import glob
+import gzip
+import json
+import multiprocessing
+import os
+import zlib
+
+import numpy as np
+
+from telemetry import TELEMETRY_DIR
+
+# Use worker processes from this many files on (below it, starting them costs more)
+PARALLEL_MIN_FILES = 8
+
+# Run end causes that are crashes (the others are restarts and leaving the game)
+CRASH_CAUSES = ("enemy", "closure")
+
+# Column types of the collected records
+END_DTYPE = np.dtype([("session", "i4"), ("run", "i4"), ("difficulty", "i2"), ("crash", "?"),
+                      ("lane", "i1"), ("t", "f4"), ("score", "i4")])
+SECOND_DTYPE = np.dtype([("entities", "i4"), ("p99", "f4"), ("frames", "i4")])
+
+def session_name(path):
+    """Session a file belongs to (<session>-<part>.jsonl.gz)"""
+    return os.path.basename(path).rsplit("-", 1)[0]
+
+def read_records(path):
+    """Yield the records of a file, up to where it is truncated or corrupt"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except (EOFError, OSError, zlib.error):
+        # A file still being written, or cut short when the game was killed
+        return
+
+def read_file(path):
+    """
+    Collect the end and second records of a file into column arrays.
+    Returns (session, difficulties, end rows, second rows); end rows
+    refer to the difficulties by index.
+    """
+    difficulties = []
+    ends = []
+    seconds = []
+    for record in read_records(path):
+        kind = record.get("type")
+        if kind == "second":
+            frame_ms = record.get("frame_ms")
+            if frame_ms:
+                seconds.append((sum(record["entities"].values()), frame_ms["p99"], record["frames"]))
+        elif kind == "end":
+            difficulty = record.get("difficulty")
+            if difficulty not in difficulties:
+                difficulties.append(difficulty)
+            ends.append((0, record["run"], difficulties.index(difficulty), record["cause"] in CRASH_CAUSES,
+                         record["lane"], record["t"], record["score"]))
+    return (session_name(path), difficulties, np.array(ends, dtype=END_DTYPE),
+            np.array(seconds, dtype=SECOND_DTYPE))
+
+def load(paths, processes):
+    """
+    Read all files into (difficulty names, end rows, second rows).
+    Only the last end of each run is kept (a rewind can continue a run
+    after a crash).
+    """
+    if processes > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(read_file, paths, chunksize=max(1, len(paths) // (processes * 4)))
+    else:
+        results = [read_file(path) for path in paths]
+
+    difficulties = []
+    sessions = {}
+    end_parts = []
+    second_parts = []
+    for session, file_difficulties, ends, seconds in results:
+        # Renumber sessions and difficulties across files
+        remap = []
+        for difficulty in file_difficulties:
+            if difficulty not in difficulties:
+                difficulties.append(difficulty)
+            remap.append(difficulties.index(difficulty))
+        if len(ends):
+            ends["difficulty"] = np.array(remap, dtype=np.int16)[ends["difficulty"]]
+            ends["session"] = sessions.setdefault(session, len(sessions))
+            end_parts.append(ends)
+        second_parts.append(seconds)
+
+    ends = np.concatenate(end_parts) if end_parts else np.zeros(0, END_DTYPE)
+    seconds = np.concatenate(second_parts) if second_parts else np.zeros(0, SECOND_DTYPE)
+
+    # Files are read in order, so the last row of a (session, run) is its last end
+    keys = ends["session"].astype(np.int64) << 32 | ends["run"].astype(np.int64)
+    _, last = np.unique(keys[::-1], return_index=True)
+    ends = ends[np.sort(len(ends) - 1 - last)]
+    return difficulties, ends, seconds
+
+def group_median(groups, values, count):
+    """Median of the values in each group 0..count-1 (NaN for empty groups)"""
+    order = np.argsort(groups, kind="stable")
+    groups = groups[order]
+    values = values[order]
+    bounds = np.searchsorted(groups, np.arange(count + 1))
+    return np.array([np.median(values[start:end]) if end > start else np.nan
+                     for start, end in zip(bounds[:-1], bounds[1:])])
+
+def survival_table(difficulties, ends):
+    """Rows of (difficulty, runs, crashes, median survival s, mean survival s, best score)"""
+    count = len(difficulties)
+    crashed = ends[ends["crash"]]
+    runs = np.bincount(ends["difficulty"], minlength=count)
+    crashes = np.bincount(crashed["difficulty"], minlength=count)
+    medians = group_median(crashed["difficulty"], crashed["t"], count)
+    totals = np.bincount(crashed["difficulty"], weights=crashed["t"], minlength=count)
+    best = np.zeros(count, dtype=np.int64)
+    np.maximum.at(best, ends["difficulty"], ends["score"])
+    return [(difficulties[i], int(runs[i]), int(crashes[i]), round(float(medians[i]), 1),
+             round(float(totals[i] / max(1, crashes[i])), 1), int(best[i])) for i in range(count)]
+
+def crash_table(ends, time_bin):
+    """Rows of (game time bin start, crashes in lane 0, 1, 2)"""
+    crashed = ends[ends["crash"]]
+    if not len(crashed):
+        return []
+    bins = (crashed["t"] // time_bin).astype(np.int64)
+    lanes = crashed["lane"].astype(np.int64)
+    bin_count = int(bins.max()) + 1
+    counts = np.bincount(bins * 3 + lanes, minlength=bin_count * 3).reshape(bin_count, 3)
+    return [(i * time_bin, *map(int, counts[i])) for i in range(bin_count)]
+
+def frame_time_table(seconds, entity_bin):
+    """Rows of (entity count bin start, seconds, frames, median p99 ms, p99 of p99 ms, max p99 ms)"""
+    if not len(seconds):
+        return []
+    bins = seconds["entities"] // entity_bin
+    order = np.argsort(bins, kind="stable")
+    bins = bins[order]
+    p99 = seconds["p99"][order]
+    frames = seconds["frames"][order]
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], len(bins)]
+    return [(int(bins[start]) * entity_bin, int(end - start), int(frames[start:end].sum()),
+             round(float(np.median(p99[start:end])), 2), round(float(np.percentile(p99[start:end], 99)), 2),
+             round(float(p99[start:end].max()), 2)) for start, end in zip(starts, ends)]
+
+def print_table(title, header, rows):
+    print(f"\n{title}")
+    if not rows:
+        print("  (no data)")
+        return
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  " + "  ".join(f"{value!s:>{width}}" for value, width in zip(row, widths)))
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default=TELEMETRY_DIR)
+    parser.add_argument("--csv", metavar="DIR", help="also write the tables as CSV files to a directory")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--time-bin", type=float, default=10.0, help="seconds of game time per crash bin")
+    parser.add_argument("--entity-bin", type=int, default=10, help="entities per frame time bin")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.jsonl.gz")))
+    if not paths:
+        parser.exit(1, f"No telemetry files in {args.directory}\n")
+    difficulties, ends, seconds = load(paths, args.processes)
+    print(f"{len(paths)} files, {len(ends)} runs, {len(seconds)} seconds of play")
+
+    tables = [
+        ("survival", "Survival time by difficulty (crashed runs)",
+         ("difficulty", "runs", "crashes", "median_s", "mean_s", "best_score"),
+         survival_table(difficulties, ends)),
+        ("crashes", f"Crashes by lane and game time ({args.time_bin:g} s bins)",
+         ("time_s", "lane_0", "lane_1", "lane_2"),
+         crash_table(ends, args.time_bin)),
+        ("frame_times", f"Frame time p99 by entity count ({args.entity_bin} entity bins, per-second p99s)",
+         ("entities", "seconds", "frames", "median_p99_ms", "p99_p99_ms", "max_p99_ms"),
+         frame_time_table(seconds, args.entity_bin))
+    ]
+    for name, title, header, rows in tables:
+        print_table(title, header, rows)
+        if args.csv:
+            os.makedirs(args.csv, exist_ok=True)
+            write_csv(os.path.join(args.csv, name + ".csv"), header, rows)
+    if args.csv:
+        print(f"\nCSV files written to {args.csv}")
+
+if __name__ == "__main__":
+    main()
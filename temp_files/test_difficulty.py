@@ -1,5 +1,6 @@
 import json
 import os
+from difficulty_curve import build_curve_set
 from difficulty_settings import DifficultySettings
 
 print("Testing difficulty settings functionality...")
@@ -23,6 +24,20 @@ class MockDifficultyManager:
         self.orb_spawn_rate = 0
         self.difficulty_level = ""
         self.game_time = 0
+        self.curves = None
+    
+    def set_curves(self, curves):
+        # Same as DifficultyManager.set_curves: precompute the curve tables and reset
+        self.curves = build_curve_set(curves)
+        self.initial_enemy_speed = self.curves["enemy_speed"].initial_value
+        self.initial_scroll_speed = self.curves["scroll_speed"].initial_value
+        self.initial_enemy_spawn_rate = self.curves["enemy_spawn_rate"].initial_value
+        self.initial_orb_spawn_rate = self.curves["orb_spawn_rate"].initial_value
+        self.enemy_speed = self.initial_enemy_speed
+        self.scroll_speed = self.initial_scroll_speed
+        self.enemy_spawn_rate = self.initial_enemy_spawn_rate
+        self.orb_spawn_rate = self.initial_orb_spawn_rate
+        self.game_time = 0
 
 # Test 1: Check if difficulty settings file exists
 print("\nTest 1: Checking if difficulty_settings.json exists...")
@@ -56,6 +71,9 @@ for diff in difficulties:
     print(f"Current difficulty: {difficulty_settings.current_difficulty}")
     print(f"Difficulty name: {difficulty_settings.get_difficulty_name()}")
     
+    # Saves are written behind on a background thread, write them now
+    difficulty_settings.store.flush()
+    
     # Check if the file was updated
     with open("difficulty_settings.json", "r") as f:
         content = json.load(f)
@@ -82,14 +100,29 @@ for diff in difficulties:
     print(f"Orb spawn rate: {mock_manager.orb_spawn_rate}")
     print(f"Difficulty level: {mock_manager.difficulty_level}")
     
-    # Verify settings match the expected values
-    expected_settings = difficulty_settings.difficulty_presets[diff]
-    if (mock_manager.enemy_speed == expected_settings["initial_enemy_speed"] and
-        mock_manager.scroll_speed == expected_settings["initial_scroll_speed"] and
+    # Verify settings match the expected values: the speeds start at the first
+    # control point of the preset's curves
+    expected_curves = difficulty_settings.difficulty_presets[diff]["curves"]
+    if (mock_manager.enemy_speed == expected_curves["enemy_speed"][0][1] and
+        mock_manager.scroll_speed == expected_curves["scroll_speed"][0][1] and
         mock_manager.difficulty_level == diff):
         print(f"PASS: {diff} settings applied correctly")
     else:
         print(f"FAIL: {diff} settings not applied correctly")
+    
+    # The curve tables must follow the control points and hold the last value after them
+    tables_ok = True
+    for name, points in expected_curves.items():
+        curve = mock_manager.curves[name]
+        for t, value in points:
+            if abs(curve.value_at(t) - value) > 1e-9:
+                tables_ok = False
+        if abs(curve.value_at(points[-1][0] + 1000) - points[-1][1]) > 1e-9:
+            tables_ok = False
+    if tables_ok:
+        print(f"PASS: {diff} curve tables match the control points")
+    else:
+        print(f"FAIL: {diff} curve tables do not match the control points")
 
 # Reset to medium difficulty for game
 difficulty_settings.set_difficulty("medium")
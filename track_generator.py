@@ -0,0 +1,313 @@
+import math
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from game_logging import get_logger
+
+logger = get_logger("track_generator")
+
+# Road layout (same as the game)
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+ROAD_WIDTH = 400
+LANE_COUNT = 3
+LANE_WIDTH = ROAD_WIDTH // LANE_COUNT
+ROAD_LEFT = (SCREEN_WIDTH - ROAD_WIDTH) // 2
+
+# Chunk size: one screen of road plus the shoulders with the side stripes
+CHUNK_HEIGHT = SCREEN_HEIGHT
+SHOULDER = 30
+CHUNK_X = ROAD_LEFT - SHOULDER
+
+# Side stripes: 30 pixels of stripe every 70 pixels of track
+STRIPE_LENGTH = 30
+STRIPE_PERIOD = 70
+
+# Largest sideways shift of the shoulders on a curved chunk (pixels)
+CURVE_AMPLITUDE = 12
+
+# Chunks prerendered ahead on the worker thread, and chunks kept active
+AHEAD_CHUNKS = 3
+ACTIVE_CHUNKS = 3
+
+# The first chunks are left empty so a new game does not start in traffic
+CALM_CHUNKS = 2
+
+# Chance of each kind of content per chunk, by difficulty
+CHUNK_STYLES = {
+    "easy": {"closure": 0.15, "max_closures": 1, "formation": 0.15, "orb_pattern": 0.5, "curvature": 0.5},
+    "medium": {"closure": 0.3, "max_closures": 1, "formation": 0.3, "orb_pattern": 0.4, "curvature": 0.8},
+    "hard": {"closure": 0.45, "max_closures": 2, "formation": 0.45, "orb_pattern": 0.3, "curvature": 1.0}
+}
+
+ROAD_COLOR = (50, 50, 50)
+LANE_LINE_COLOR = (255, 255, 255)
+STRIPE_COLOR = (255, 255, 255)
+CLOSURE_COLOR = (255, 165, 0)
+TRANSPARENT = (0, 0, 0)
+
+class TrackChunk:
+    """
+    One screen of track. Offsets are measured from the top of the chunk.
+    - closures: (lane, start offset, end offset) blocked road sections
+    - orbs: (x, offset) orb positions
+    - formation: (lane, offset) enemy cars
+    - curvature: -1..1, bends the shoulders left or right
+    """
+    __slots__ = ("index", "closures", "orbs", "formation", "curvature", "surface", "scaled_surface")
+
+    def __init__(self, index, closures, orbs, formation, curvature):
+        self.index = index
+        self.closures = closures
+        self.orbs = orbs
+        self.formation = formation
+        self.curvature = curvature
+        # Prerendered road, at full size and at the render scale
+        self.surface = None
+        self.scaled_surface = None
+
+    @property
+    def track_end(self):
+        """Track position of the top of the chunk"""
+        return (self.index + 1) * CHUNK_HEIGHT
+
+    def closure_rects(self, top):
+        """Screen rects of the closures when the chunk top is at screen y top"""
+        return [pygame.Rect(ROAD_LEFT + lane * LANE_WIDTH, int(top + start), LANE_WIDTH, end - start)
+                for lane, start, end in self.closures]
+
+def generate_chunk(seed, index, difficulty_level):
+    """Generate the content of a chunk (deterministic for a seed and index)"""
+    rng = random.Random(f"{seed}:{index}")
+    style = CHUNK_STYLES.get(difficulty_level, CHUNK_STYLES["medium"])
+    curvature = rng.uniform(-style["curvature"], style["curvature"])
+    if index < CALM_CHUNKS:
+        return TrackChunk(index, [], [], [], curvature)
+
+    # Lane closures, never all lanes at once
+    closures = []
+    closed_lanes = []
+    for _ in range(style["max_closures"]):
+        if rng.random() < style["closure"]:
+            lane = rng.choice([l for l in range(LANE_COUNT) if l not in closed_lanes])
+            start = rng.randrange(50, CHUNK_HEIGHT - 250, 10)
+            closures.append((lane, start, start + rng.randrange(120, 240, 10)))
+            closed_lanes.append(lane)
+    open_lanes = [lane for lane in range(LANE_COUNT) if lane not in closed_lanes]
+
+    # Enemy formation in the open lanes
+    formation = []
+    if rng.random() < style["formation"]:
+        kind = rng.choice(("column", "pair", "stagger"))
+        if kind == "column":
+            lane = rng.choice(open_lanes)
+            formation = [(lane, offset) for offset in (100, 260, 420)]
+        elif kind == "pair" and len(open_lanes) == LANE_COUNT:
+            # Two cars side by side, leaving one lane free
+            free = rng.randrange(LANE_COUNT)
+            formation = [(lane, 200) for lane in range(LANE_COUNT) if lane != free]
+        else:
+            lanes = open_lanes if len(open_lanes) > 1 else list(range(LANE_COUNT))
+            formation = [(lanes[i % len(lanes)], 80 + i * 160) for i in range(3)
+                         if lanes[i % len(lanes)] in open_lanes]
+
+    # Orb pattern
+    orbs = []
+    if rng.random() < style["orb_pattern"]:
+        lane = rng.choice(open_lanes)
+        center = ROAD_LEFT + lane * LANE_WIDTH + LANE_WIDTH // 2
+        kind = rng.choice(("line", "zigzag", "arc"))
+        for i in range(5):
+            offset = 60 + i * 90
+            if kind == "line":
+                x = center
+            elif kind == "zigzag":
+                x = center + (25 if i % 2 else -25)
+            else:
+                x = center + int(35 * math.sin(math.pi * i / 4))
+            orbs.append((x, offset))
+
+    return TrackChunk(index, closures, orbs, formation, curvature)
+
+def shoulder_offset(chunk, offset):
+    """Sideways shift of the shoulders at an offset (zero at both chunk ends)"""
+    return chunk.curvature * CURVE_AMPLITUDE * math.sin(math.pi * offset / CHUNK_HEIGHT)
+
+def render_chunk(chunk):
+    """Prerender the road surface of a chunk"""
+    width = ROAD_WIDTH + 2 * SHOULDER
+    surface = pygame.Surface((width, CHUNK_HEIGHT))
+    surface.fill(TRANSPARENT)
+
+    # Road and lane markings
+    pygame.draw.rect(surface, ROAD_COLOR, (SHOULDER, 0, ROAD_WIDTH, CHUNK_HEIGHT))
+    for lane in range(1, LANE_COUNT):
+        x = SHOULDER + lane * LANE_WIDTH
+        pygame.draw.line(surface, LANE_LINE_COLOR, (x, 0), (x, CHUNK_HEIGHT), 2)
+
+    # Lane closures: orange and white hatching
+    for lane, start, end in chunk.closures:
+        rect = pygame.Rect(SHOULDER + lane * LANE_WIDTH + 4, start, LANE_WIDTH - 8, end - start)
+        pygame.draw.rect(surface, CLOSURE_COLOR, rect)
+        for y in range(start, end, 24):
+            pygame.draw.line(surface, LANE_LINE_COLOR, (rect.left, y), (rect.right - 1, min(end - 1, y + 16)), 4)
+
+    # Side stripes, phased on the track position so they continue across chunks
+    # (a stripe that ends just below the chunk starts inside it)
+    track_top = chunk.track_end
+    for offset in range(CHUNK_HEIGHT + STRIPE_LENGTH):
+        if (track_top - offset) % STRIPE_PERIOD != 0:
+            continue
+        shift = int(shoulder_offset(chunk, offset))
+        for x in (SHOULDER - 15 + shift, SHOULDER + ROAD_WIDTH + 5 + shift):
+            pygame.draw.rect(surface, STRIPE_COLOR, (x, offset - STRIPE_LENGTH, 10, STRIPE_LENGTH))
+
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    surface.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+    return surface
+
+def chunk_contents(seed, difficulty_level, start_index=0):
+    """Endless stream of generated chunks"""
+    index = start_index
+    while True:
+        yield generate_chunk(seed, index, difficulty_level)
+        index += 1
+
+def prerendered(chunks, render_scale=1.0):
+    """Attach prerendered surfaces to a stream of chunks"""
+    for chunk in chunks:
+        chunk.surface = render_chunk(chunk)
+        chunk.scaled_surface = chunk.surface
+        if render_scale != 1.0:
+            width, height = chunk.surface.get_size()
+            chunk.scaled_surface = pygame.transform.scale(
+                chunk.surface, (round(width * render_scale), round(height * render_scale)))
+        yield chunk
+
+class TrackStreamer:
+    """
+    Streams track chunks to the game as the road scrolls.
+    A worker thread pulls chunks through the generate -> prerender
+    pipeline into a bounded queue, AHEAD_CHUNKS ahead of the player. The
+    game keeps at most ACTIVE_CHUNKS chunks, so memory stays constant
+    however long the session is. seek() jumps to another position (rewind,
+    resume); the worker then restarts from there when the next chunk is
+    needed.
+    """
+    def __init__(self, seed, difficulty_level, render_scale=1.0, start_index=0):
+        # start_index: first chunk to stream (resuming a saved game)
+        self.seed = seed
+        self.difficulty_level = difficulty_level
+        self.render_scale = render_scale
+        self.active = deque(maxlen=ACTIVE_CHUNKS)
+
+        # Statistics
+        self.generated = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.seeks = 0
+
+        self.thread = None
+        self.start_worker(start_index)
+
+    def start_worker(self, start_index):
+        """Start a worker thread streaming chunks from an index"""
+        self.ready = queue.Queue(maxsize=AHEAD_CHUNKS)
+        self.stopping = threading.Event()
+        pipeline = prerendered(chunk_contents(self.seed, self.difficulty_level, start_index), self.render_scale)
+        self.thread = threading.Thread(target=self.produce, args=(pipeline, self.ready, self.stopping),
+                                       name="TrackStreamer", daemon=True)
+        self.thread.start()
+
+    def produce(self, pipeline, ready, stopping):
+        """Worker thread: keep the ready queue full"""
+        for chunk in pipeline:
+            while not stopping.is_set():
+                try:
+                    ready.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stopping.is_set():
+                return
+            self.generated += 1
+
+    def next_chunk(self):
+        """Take the next chunk from the worker (waits only if it fell behind)"""
+        if self.thread is None:
+            # After a seek: continue after the last active chunk
+            self.start_worker(self.active[-1].index + 1)
+        try:
+            return self.ready.get_nowait()
+        except queue.Empty:
+            wait_start = time.perf_counter()
+            chunk = self.ready.get()
+            self.stalls += 1
+            self.stall_time += time.perf_counter() - wait_start
+            logger.debug("Waited %.1f ms for track chunk %d",
+                         (time.perf_counter() - wait_start) * 1000, chunk.index)
+            return chunk
+
+    def advance(self, distance):
+        """
+        Activate the chunks that come within a chunk of the top of the screen
+        at a track distance, returns the newly activated chunks.
+        """
+        activated = []
+        while not self.active or self.active[-1].track_end <= distance + SCREEN_HEIGHT + CHUNK_HEIGHT:
+            chunk = self.next_chunk()
+            self.active.append(chunk)
+            activated.append(chunk)
+        return activated
+
+    def seek(self, first_chunk, distance):
+        """
+        Make the chunks from first_chunk the active ones at a track distance,
+        without returning them as newly activated (their content is already
+        in the game). Active chunks are reused; missing ones are generated
+        on this thread. The queued chunks no longer follow on, so the worker
+        is stopped and restarted when the next chunk is needed.
+        """
+        if self.active and self.active[0].index == first_chunk:
+            return
+        self.seeks += 1
+        reusable = {chunk.index: chunk for chunk in self.active}
+        self.active.clear()
+        index = first_chunk
+        while not self.active or self.active[-1].track_end <= distance + SCREEN_HEIGHT + CHUNK_HEIGHT:
+            chunk = reusable.get(index)
+            if chunk is None:
+                chunk = next(prerendered([generate_chunk(self.seed, index, self.difficulty_level)],
+                                         self.render_scale))
+            self.active.append(chunk)
+            index += 1
+
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread = None
+
+    def visible(self, distance):
+        """(chunk, screen y of its top) for the active chunks at a track distance"""
+        return [(chunk, SCREEN_HEIGHT - (chunk.track_end - distance)) for chunk in self.active]
+
+    def close(self):
+        """Stop the worker thread"""
+        if self.thread is not None:
+            self.stopping.set()
+
+    def get_stats(self):
+        """Get streaming statistics"""
+        return {
+            "generated": self.generated,
+            "queued": self.ready.qsize(),
+            "active": len(self.active),
+            "stalls": self.stalls,
+            "seeks": self.seeks,
+            "stall_ms": round(self.stall_time * 1000, 1)
+        }
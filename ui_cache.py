@@ -0,0 +1,18 @@
+import pygame
+
+# Colour that is left transparent on prerendered page surfaces
+TRANSPARENT_KEY = (0, 0, 0)
+
+def crop_to_content(surface, colorkey=TRANSPARENT_KEY):
+    """
+    Prepare a prerendered full-screen surface for fast blitting.
+    The surface is drawn on a black background; black becomes its colorkey
+    (text is antialiased against black, so it blends the same over the
+    dark screen backgrounds), and it is cropped to the area that has
+    content. Returns (surface, position) for screen.blit(*result).
+    """
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    surface.set_colorkey(colorkey, pygame.RLEACCEL)
+    rect = surface.get_bounding_rect()
+    return surface.subsurface(rect).copy(), rect.topleft